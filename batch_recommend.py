@@ -0,0 +1,265 @@
+"""
+Module for recommending breeds to large files of preferences in the Puppy Picker
+"""
+
+import csv
+import io
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from filters import FilterIndex
+from sharded_scoring import top_rows
+
+
+class BatchRecommender:
+    """
+    Finds the matching breeds of every row of a preference file, as
+    PuppyPickerModel.find_matching_breeds would for each of them.
+
+    The file is read in chunks. A chunk is validated with the rules of the
+    preference page, column by column: six weights from 0 to 3 and a size.
+    Valid rows are encoded as one profile number out of 4**6 weight
+    combinations times 4 sizes, and a profile is scored the first time it is
+    seen, by a block matrix product over the breeds of its size. Later rows
+    with the same profile reuse its top-k, so a file of millions of rows costs
+    at most a few thousand scorings, and its output text is formatted once.
+    Results are appended to the output file chunk by chunk, so memory does not
+    grow with the length of the file.
+    """
+    SIZES = ['all', 'small', 'medium', 'big']
+    WEIGHTS = ['0', '1', '2', '3']
+    SIZE_COLUMN = 'size'
+    ID_COLUMN = 'id'
+    CHUNK_ROWS = 100000
+    # Largest (profiles, breeds) score block computed at once
+    BLOCK_CELLS = 1 << 22
+    REASONS = ['missing', 'invalid_weight', 'invalid_size']
+
+    def __init__(self, model, k=5, chunk_rows=None, scorer=None):
+        """
+        Prepares the breeds of the current data of a model.
+        :param model: PuppyPickerModel giving the breeds and the weighted columns.
+        :param k: Number of breeds recommended per row.
+        :param chunk_rows: Number of rows read at once.
+        :param scorer: Optional ShardedScorer of the model's data scoring new
+            profiles on several processes.
+        """
+        snapshot = model.store.current()
+        self.columns = list(model.COLUMNS)
+        self.k = k
+        self.chunk_rows = chunk_rows or self.CHUNK_ROWS
+        self.scorer = scorer
+        self.matrix = snapshot.matrix(self.columns)
+        self.names = np.append(np.asarray(snapshot.columns['breed'], dtype=object), '')
+        index = FilterIndex.for_snapshot(snapshot)
+        self.size_rows = [np.arange(len(snapshot)) if size == 'all'
+                          else index.equals('size_category', size).rows()
+                          for size in self.SIZES]
+        self.combinations = len(self.WEIGHTS) ** len(self.columns)
+        profiles = len(self.SIZES) * self.combinations
+        self.top = np.full((profiles, k), -1, dtype=np.int64)
+        self.top_scores = np.full((profiles, k), -np.inf)
+        self.scored = np.zeros(profiles, dtype=bool)
+        # Output text of every profile, formatted by run
+        self.texts = np.full(profiles, None, dtype=object)
+        self.place_values = len(self.WEIGHTS) ** np.arange(len(self.columns) - 1, -1, -1)
+
+    def read_chunks(self, path):
+        """
+        Yields the rows of a CSV or JSON lines file in chunks of text values.
+        """
+        if path.endswith(('.jsonl', '.json')):
+            reader = pd.read_json(path, lines=True, chunksize=self.chunk_rows, dtype=False)
+        else:
+            reader = pd.read_csv(path, chunksize=self.chunk_rows, dtype=str)
+        for chunk in reader:
+            missing = [column for column in self.columns + [self.SIZE_COLUMN]
+                       if column not in chunk.columns]
+            if missing:
+                raise ValueError(f'Missing columns: {", ".join(missing)}')
+            yield chunk
+
+    def validate(self, chunk):
+        """
+        Returns the profile number of every row of a chunk, -1 for a rejected
+        row, and the reason of every rejection (an index in REASONS, -1 if valid).
+        """
+        rows = len(chunk)
+        reasons = np.full(rows, -1, dtype=np.int8)
+        weights = np.empty((rows, len(self.columns)), dtype=np.int64)
+        missing = np.zeros(rows, dtype=bool)
+        for position, column in enumerate(self.columns + [self.SIZE_COLUMN]):
+            values = chunk[column]
+            missing |= values.isna().to_numpy()
+            if pd.api.types.is_numeric_dtype(values.dtype) and column != self.SIZE_COLUMN:
+                # Numbers of JSON files, floats when the column has nulls
+                numbers = values.to_numpy(dtype=np.float64)
+                valid = np.isin(numbers, np.arange(len(self.WEIGHTS)))
+                weights[:, position] = np.where(valid, np.nan_to_num(numbers), -1)
+                continue
+            categories = self.SIZES if column == self.SIZE_COLUMN else self.WEIGHTS
+            codes = pd.Categorical(values, categories=categories).codes.astype(np.int64)
+            unknown = np.flatnonzero((codes < 0) & ~missing)
+            if len(unknown):
+                # Only the few values not matching as read are stripped of spaces
+                text = values.iloc[unknown].astype(str).str.strip()
+                missing[unknown] |= (text == '').to_numpy()
+                codes[unknown] = pd.Categorical(text, categories=categories).codes
+            if column == self.SIZE_COLUMN:
+                sizes = codes
+            else:
+                weights[:, position] = codes
+        reasons[(sizes < 0)] = self.REASONS.index('invalid_size')
+        reasons[(weights < 0).any(axis=1)] = self.REASONS.index('invalid_weight')
+        reasons[missing] = self.REASONS.index('missing')
+        codes = sizes * self.combinations + weights @ self.place_values
+        codes[reasons >= 0] = -1
+        return codes, reasons
+
+    def score_profiles(self, codes):
+        """
+        Computes the top-k of the profiles not scored yet.
+        """
+        new = np.unique(codes[codes >= 0])
+        new = new[~self.scored[new]]
+        if len(new) == 0:
+            return
+        sizes = new // self.combinations
+        weights = (new[:, None] % self.combinations // self.place_values) % len(self.WEIGHTS)
+        weights = weights.astype(np.float64)
+        if self.scorer is not None:
+            rows, scores = self.scorer.top_k(weights, [self.SIZES[size] for size in sizes],
+                                             self.k)
+            self.top[new], self.top_scores[new] = rows, scores
+        else:
+            for size in np.unique(sizes):
+                profiles = new[sizes == size]
+                rows = self.size_rows[size]
+                features = self.matrix[rows].T
+                block = max(1, self.BLOCK_CELLS // max(len(rows), 1))
+                for start in range(0, len(profiles), block):
+                    batch = profiles[start:start + block]
+                    scores = weights[sizes == size][start:start + block] @ features
+                    best, best_scores = top_rows(scores, self.k)
+                    self.top[batch] = np.where(best >= 0, rows[np.maximum(best, 0)], -1)
+                    self.top_scores[batch] = best_scores
+        self.scored[new] = True
+
+    def profile_text(self, code, json_lines):
+        """
+        Returns the breeds and scores of a profile as the end of an output line.
+        """
+        places = self.top[code] >= 0
+        breeds = self.names[self.top[code][places]].tolist()
+        scores = self.top_scores[code][places].tolist()
+        if json_lines:
+            return f'"breeds": {json.dumps(breeds)}, "scores": {json.dumps(scores)}}}\n'
+        missing = self.k - len(breeds)
+        text = io.StringIO()
+        csv.writer(text, lineterminator='\n').writerow(breeds + [''] * missing
+                                                       + scores + [''] * missing)
+        return text.getvalue()
+
+    def lines(self, chunk, codes, first_row, json_lines):
+        """
+        Returns the output lines of the valid rows of a chunk: the row number,
+        the id if the file has one, then the breeds and scores of its profile.
+        The breeds and scores are formatted once per profile.
+        """
+        for code in np.unique(codes[codes >= 0]):
+            if self.texts[code] is None:
+                self.texts[code] = self.profile_text(code, json_lines)
+        valid = np.flatnonzero(codes >= 0)
+        texts = self.texts[codes[valid]].tolist()
+        rows = (valid + first_row).tolist()
+        if self.ID_COLUMN not in chunk.columns:
+            if json_lines:
+                return [f'{{"row": {row}, {text}' for row, text in zip(rows, texts)]
+            return [f'{row},{text}' for row, text in zip(rows, texts)]
+        ids = chunk[self.ID_COLUMN].to_numpy()[valid].tolist()
+        if json_lines:
+            return [f'{{"row": {row}, "id": {json.dumps(value)}, {text}'
+                    for row, value, text in zip(rows, ids, texts)]
+        if all(isinstance(value, str) for value in ids) \
+                and not any(character in ''.join(ids) for character in ',"\n\r'):
+            # Usual case: plain ids, written as they are
+            return [f'{row},{value},{text}' for row, value, text in zip(rows, ids, texts)]
+        return [f'{row},{self.csv_field(value)},{text}'
+                for row, value, text in zip(rows, ids, texts)]
+
+    @staticmethod
+    def csv_field(value):
+        """
+        Returns a value as a CSV field, quoted if needed.
+        """
+        if isinstance(value, float) and value != value:
+            return ''
+        value = str(value)
+        if any(character in value for character in ',"\n\r'):
+            return '"' + value.replace('"', '""') + '"'
+        return value
+
+    def header(self, chunk):
+        """
+        Returns the header line of a CSV output.
+        """
+        columns = ['row'] + ([self.ID_COLUMN] if self.ID_COLUMN in chunk.columns else [])
+        columns += [f'breed_{place + 1}' for place in range(self.k)]
+        columns += [f'score_{place + 1}' for place in range(self.k)]
+        return ','.join(columns) + '\n'
+
+    def run(self, input_path, output_path, rejected_path=None):
+        """
+        Recommends breeds for every row of the input file and writes them to the
+        output file, CSV or JSON lines depending on its extension. Rejected rows
+        are written with their reason to rejected_path if given.
+        Returns a report with the row counts and the throughput.
+        """
+        start = time.perf_counter()
+        json_lines = output_path.endswith(('.jsonl', '.json'))
+        self.texts = np.full(len(self.scored), None, dtype=object)
+        counts = np.zeros(len(self.REASONS), dtype=np.int64)
+        total = 0
+        rejected_file = open(rejected_path, 'w', encoding='utf-8') if rejected_path else None
+        try:
+            with open(output_path, 'w', encoding='utf-8', newline='') as output:
+                for chunk in self.read_chunks(input_path):
+                    codes, reasons = self.validate(chunk)
+                    self.score_profiles(codes)
+                    if total == 0 and not json_lines:
+                        output.write(self.header(chunk))
+                    output.writelines(self.lines(chunk, codes, total, json_lines))
+                    counts += np.bincount(reasons[reasons >= 0], minlength=len(self.REASONS))
+                    if rejected_file is not None and (reasons >= 0).any():
+                        rejected = chunk[reasons >= 0].copy()
+                        rejected.insert(0, 'row', np.flatnonzero(reasons >= 0) + total)
+                        rejected['reason'] = np.array(self.REASONS)[reasons[reasons >= 0]]
+                        rejected.to_csv(rejected_file, header=rejected_file.tell() == 0,
+                                        index=False, lineterminator='\n')
+                    total += len(chunk)
+        finally:
+            if rejected_file is not None:
+                rejected_file.close()
+        seconds = time.perf_counter() - start
+        return {'rows': total, 'accepted': int(total - counts.sum()),
+                'rejected': int(counts.sum()),
+                'rejected_by_reason': dict(zip(self.REASONS, counts.tolist())),
+                'profiles_scored': int(self.scored.sum()), 'seconds': seconds,
+                'rows_per_second': total / seconds if seconds > 0 else 0.0,
+                'output': os.path.abspath(output_path)}
+
+    @staticmethod
+    def format_report(report):
+        """
+        Returns the report as text.
+        """
+        lines = [f'{report["rows"]} rows in {report["seconds"]:.1f} s, '
+                 f'{report["rows_per_second"]:,.0f} rows/s',
+                 f'Accepted {report["accepted"]}, rejected {report["rejected"]}'
+                 + ''.join(f', {reason} {count}'
+                           for reason, count in report['rejected_by_reason'].items() if count),
+                 f'Scored {report["profiles_scored"]} distinct profiles',
+                 f'Recommendations written to {report["output"]}']
+        return '\n'.join(lines)
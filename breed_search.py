@@ -0,0 +1,142 @@
+"""
+Module for searching breed names as they are typed in the Puppy Picker
+"""
+
+import re
+from bisect import bisect_left
+import numpy as np
+
+
+class BreedSearch:
+    """
+    Index of the breed names for search-as-you-type.
+
+    Names are kept sorted by their normalized form, so the names starting with
+    the typed text are one range found with two binary searches. A second
+    sorted list holds every name from each of its later words, so "retr" also
+    finds "Golden Retriever". Names with a typo are found by the trigrams they
+    share with the typed text. Results are ranked name prefixes first, then word
+    prefixes, then the closest trigram matches, and capped at a limit.
+    """
+    LIMIT = 20
+    # Trigram matches need this share of the typed text's trigrams
+    MIN_SIMILARITY = 0.5
+
+    def __init__(self, names):
+        """
+        Builds the indexes of a sequence of breed names, repeated names are kept once.
+        """
+        entries = sorted({(self.normalize(name), name) for name in names if isinstance(name, str)})
+        self.keys = [key for key, _ in entries]
+        self.names = [name for _, name in entries]
+
+        words = []
+        for position, key in enumerate(self.keys):
+            for match in re.finditer(r' (?=\S)', key):
+                words.append((key[match.end():], position))
+        words.sort()
+        self.word_keys = [key for key, _ in words]
+        self.word_positions = [position for _, position in words]
+
+        postings = {}
+        self.gram_counts = np.zeros(len(self.keys), dtype=np.int64)
+        for position, key in enumerate(self.keys):
+            grams = self.trigrams(key)
+            self.gram_counts[position] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: np.array(positions, dtype=np.int64)
+                         for gram, positions in postings.items()}
+
+    @classmethod
+    def for_snapshot(cls, snapshot):
+        """
+        Returns the index of the breed names of a snapshot, built once per snapshot.
+        """
+        return snapshot.derived('breed_search', lambda data: cls(data.columns['breed']))
+
+    @staticmethod
+    def normalize(text):
+        """
+        Returns text in lower case with every run of other characters than
+        letters and digits replaced by one space.
+        """
+        return ' '.join(re.sub(r'[^0-9a-z]+', ' ', str(text).lower()).split())
+
+    @staticmethod
+    def trigrams(key):
+        """
+        Returns the set of three letter sequences of a normalized text, padded
+        so the start and end of the text count as well.
+        """
+        padded = f'  {key} '
+        return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+    @staticmethod
+    def prefix_range(keys, prefix):
+        """
+        Returns the start and stop of the keys starting with prefix in a sorted list.
+        """
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + '\uffff')
+
+    def search(self, text, limit=None):
+        """
+        Returns at most limit breed names matching the typed text, best first.
+        Empty text gives the first names in alphabetical order, the others are
+        found by typing, so a combobox never holds the whole catalog.
+        """
+        query = self.normalize(text)
+        limit = limit or self.LIMIT
+        if not query:
+            return self.names[:limit]
+        found = []
+        seen = set()
+
+        def add(positions):
+            """
+            Appends the positions not found yet, up to the limit.
+            """
+            for position in positions:
+                if len(found) == limit:
+                    return
+                if position not in seen:
+                    seen.add(position)
+                    found.append(position)
+
+        start, stop = self.prefix_range(self.keys, query)
+        add(range(start, stop))
+        if len(found) < limit:
+            start, stop = self.prefix_range(self.word_keys, query)
+            add(sorted(self.word_positions[start:stop]))
+        if len(found) < limit:
+            add(self.similar(query))
+        return [self.names[position] for position in found]
+
+    def similar(self, query):
+        """
+        Returns the positions of the names holding enough of the trigrams of a
+        normalized query, most similar first. The share of the query's trigrams
+        found in the name ranks first, so a word typed with a typo still matches
+        a long name, then the Jaccard similarity favours names close in length.
+        """
+        grams = self.trigrams(query)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.keys))
+        contained = shared / len(grams)
+        jaccard = shared / (len(grams) + self.gram_counts - shared)
+        positions = np.flatnonzero(contained >= self.MIN_SIMILARITY)
+        order = np.lexsort((positions, -jaccard[positions], -contained[positions]))
+        return positions[order].tolist()
+
+    def resolve(self, text):
+        """
+        Returns the breed name typed, written as in the data, or None for an unknown name.
+        Case, spaces and punctuation of the typed text are ignored.
+        """
+        query = self.normalize(text)
+        position = bisect_left(self.keys, query)
+        if query and position < len(self.keys) and self.keys[position] == query:
+            return self.names[position]
+        return None
@@ -0,0 +1,188 @@
+"""
+Module for opening several breed catalogs in one Puppy Picker process
+"""
+
+import threading
+from collections import OrderedDict
+from graph_manage import GraphManage
+from snapshot import SnapshotStore
+
+
+DEFAULT_CATALOG = 'breeds'
+
+
+class Catalog:
+    """
+    A named breed dataset, for example a regional catalog or a catalog of cat
+    breeds with the same columns.
+
+    The file is read the first time the catalog is used. The model and the
+    graphs of a catalog share its SnapshotStore, so every index and cache built
+    from its data stays with its snapshots and is freed with the catalog.
+    """
+    def __init__(self, name, path):
+        """
+        Initializes a catalog, its file is read on first use.
+        :param name: Name the catalog is opened by.
+        :param path: Path of the CSV file of the catalog.
+        """
+        self.name = name
+        self.path = path
+        self.store = None
+        self._model = None
+        self._graph_manage = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        """
+        Whether the data of the catalog is in memory.
+        """
+        return self.store is not None
+
+    def load(self):
+        """
+        Reads the data of the catalog if it is not loaded yet.
+        """
+        with self._lock:
+            if self.store is None:
+                df, summary = GraphManage.load_data_with_summary(self.path)
+                self.store = SnapshotStore(df, copy=False)
+                # Statistics computed while reading, for the loaded version of the data
+                summary.attach(self.store.current())
+        return self
+
+    def unload(self):
+        """
+        Drops the data of the catalog, it is read again on next use.
+        Models and graphs still held by callers keep working on their snapshot.
+        """
+        with self._lock:
+            self.store = None
+            self._model = None
+            self._graph_manage = None
+
+    def memory_usage(self):
+        """
+        Returns the bytes held by the data of the catalog and everything built
+        from it: indexes, sketches, similarity and neighbour structures and graph
+        data, for every version of the data still in use. 0 when not loaded.
+        """
+        store = self.store
+        return 0 if store is None else store.memory_usage()
+
+    @property
+    def df(self):
+        """
+        The current breed data of the catalog, loaded on first use.
+        """
+        return self.load().store.current().df
+
+    @property
+    def model(self):
+        """
+        The PuppyPickerModel of the catalog, created on first use.
+        """
+        store = self.load().store
+        if self._model is None:
+            from model import PuppyPickerModel  # pylint: disable=import-outside-toplevel
+            self._model = PuppyPickerModel(store=store)
+        return self._model
+
+    @property
+    def graph_manage(self):
+        """
+        The GraphManage drawing the graphs of the catalog, created on first use.
+        """
+        store = self.load().store
+        if self._graph_manage is None:
+            self._graph_manage = GraphManage(store=store)
+        return self._graph_manage
+
+
+class CatalogRegistry:
+    """
+    Opens breed catalogs by name on demand and keeps the most recently used
+    ones in memory.
+
+    Catalogs are registered with a name and a file and loaded the first time
+    they are opened. When the loaded catalogs take more than the memory
+    budget, the least recently used ones are unloaded until they fit; the
+    catalog being opened is always kept. A catalog's memory covers its data and
+    every index, cache and graph data built from it, measured again when a new
+    version of its data is published, see SnapshotStore.memory_usage.
+    """
+    def __init__(self, budget_bytes=None):
+        """
+        Initializes an empty registry.
+        :param budget_bytes: Memory allowed for the loaded catalogs, None for no limit.
+        """
+        self.budget_bytes = budget_bytes
+        self.catalogs = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, name, path):
+        """
+        Adds a catalog, replacing a previous catalog of the same name.
+        """
+        with self._lock:
+            previous = self.catalogs.get(name)
+            if previous is not None:
+                self._recent.pop(name, None)
+                previous.unload()
+            self.catalogs[name] = Catalog(name, path)
+
+    def names(self):
+        """
+        Returns the names of the registered catalogs in alphabetical order.
+        """
+        return sorted(self.catalogs)
+
+    def open(self, name=DEFAULT_CATALOG):
+        """
+        Returns a loaded catalog, reading its file if needed, and evicts the
+        least recently used catalogs beyond the memory budget.
+        """
+        catalog = self.catalogs.get(name)
+        if catalog is None:
+            raise KeyError(f'Unknown catalog: {name}')
+        catalog.load()
+        with self._lock:
+            self._recent[name] = catalog
+            self._recent.move_to_end(name)
+            self._evict(keep=name)
+        return catalog
+
+    def _evict(self, keep):
+        """
+        Unloads the least recently used catalogs while over budget. Called with the lock held.
+        """
+        if self.budget_bytes is None:
+            return
+        usage = {name: catalog.memory_usage() for name, catalog in self._recent.items()}
+        for name in list(self._recent):
+            if sum(usage.values()) <= self.budget_bytes:
+                break
+            if name != keep:
+                self._recent.pop(name).unload()
+                usage.pop(name)
+
+    def memory_usage(self):
+        """
+        Returns the bytes held by the loaded catalogs, their data and the
+        indexes, caches and graph data built from it.
+        """
+        return sum(catalog.memory_usage() for catalog in self._recent.values())
+
+    def loaded(self):
+        """
+        Returns the names of the loaded catalogs, least recently used first.
+        """
+        with self._lock:
+            return list(self._recent)
+
+
+# Catalogs of the process, breeds.csv unless configured otherwise
+catalogs = CatalogRegistry()
+catalogs.register(DEFAULT_CATALOG, 'breeds.csv')
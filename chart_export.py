@@ -0,0 +1,171 @@
+"""
+Module for exporting the graphs of every breed to image files in the Puppy Picker
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import matplotlib
+from catalog import catalogs
+from graph_manage import GraphManage
+from render_pool import RenderPool, worker_graph
+
+
+COMPARE_LIST = ['all_around_friendliness', 'trainability',
+                'health_grooming', 'exercise_needs', 'adaptability']
+
+BREED_CHARTS = ['char_bar', 'male_bar', 'female_bar']
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def slugify(name):
+    """
+    Turns a breed name into a file name.
+    """
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def export_chart(method, args, paths):
+    """
+    Renders one graph in a worker process and saves it in every requested format.
+    Returns the content hash of each written file.
+    """
+    # Fixed ids and no dates keep SVG output identical between runs
+    matplotlib.rcParams['svg.hashsalt'] = 'puppy-picker'
+    fig = getattr(worker_graph(), method)(*args)
+    hashes = {}
+    for path in paths:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fig.savefig(path, metadata={'Date': None} if path.endswith('.svg') else None)
+        with open(path, 'rb') as file:
+            hashes[path] = hashlib.sha256(file.read()).hexdigest()
+    fig.clear()
+    return hashes
+
+
+class ChartExporter:
+    """
+    Renders the breed graphs to PNG or SVG files on all cores.
+
+    A manifest in the output directory records, for every file, a hash of the
+    inputs of its graph (the breed rows, the graph parameters and the data schema)
+    and a hash of its content. Graphs whose inputs did not change since the last
+    run are skipped.
+    """
+    def __init__(self, output_dir, df=None, formats=('png',), workers=None):
+        """
+        Initializes the exporter.
+        :param output_dir: Directory receiving the images and the manifest.
+        :param df: Breed data, the default catalog when not given.
+        :param formats: Image formats to write, 'png' and/or 'svg'.
+        :param workers: Number of worker processes, defaults to the number of cores.
+        """
+        self.output_dir = output_dir
+        self.df = catalogs.open().df if df is None else df
+        self.formats = list(formats)
+        self.workers = workers
+        # Graphs only depend on their own rows, so a change to one breed
+        # only invalidates that breed's files. The schema covers the rest.
+        self.schema = GraphManage.fingerprint(self.df.head(0))
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    def select_breeds(self, breeds=None, breed_group=None, size=None):
+        """
+        Returns the breeds to export, all of them unless filtered.
+        """
+        selected = self.df
+        if breeds:
+            selected = selected[selected['breed'].isin(breeds)]
+        if breed_group:
+            selected = selected[selected['breed_group'] == breed_group]
+        if size:
+            selected = selected[selected['size_category'] == size]
+        return selected['breed'].tolist()
+
+    def jobs(self, breeds, compare_pairs=()):
+        """
+        Lists the graphs to render as (name, method, args, input hash).
+        :param compare_pairs: Groups of two or more breeds compared in one graph.
+        """
+        rows = self.df.set_index('breed', drop=False)
+        jobs = []
+        for breed in breeds:
+            for chart in BREED_CHARTS:
+                name = f'{slugify(breed)}/{chart}'
+                jobs.append((name, chart, (breed,), self.input_hash(rows, [breed], chart, ())))
+        for compared in compare_pairs:
+            compared = list(compared)
+            name = 'compare/' + '__'.join(slugify(breed) for breed in compared)
+            jobs.append((name, 'compare_bar', (compared, COMPARE_LIST),
+                         self.input_hash(rows, compared, 'compare_bar', COMPARE_LIST)))
+        return jobs
+
+    def input_hash(self, rows, breeds, chart, parameters):
+        """
+        Hashes everything a graph is drawn from.
+        """
+        key = {'rows': [rows.loc[breed].astype(str).to_dict() for breed in breeds],
+               'chart': chart, 'parameters': list(parameters), 'formats': self.formats,
+               'schema': self.schema, 'matplotlib': matplotlib.__version__}
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def load_manifest(self):
+        """
+        Returns the manifest of the previous run, or an empty one.
+        """
+        try:
+            with open(self.manifest_path, encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'charts': {}}
+
+    def export(self, breeds=None, compare_pairs=(), force=False):
+        """
+        Renders every graph whose inputs changed and updates the manifest.
+        Returns the number of rendered and skipped graphs and the elapsed time.
+        """
+        start = time.perf_counter()
+        known = set(self.df['breed'])
+        unknown = [breed for pair in compare_pairs for breed in pair if breed not in known]
+        if unknown:
+            raise ValueError(f'Unknown breeds: {", ".join(unknown)}')
+        if breeds is None:
+            breeds = self.select_breeds()
+        manifest = self.load_manifest()
+        previous = manifest.get('charts', {})
+        charts = {}
+        todo = []
+        jobs = self.jobs(breeds, compare_pairs)
+        for name, method, args, input_hash in jobs:
+            paths = [os.path.join(self.output_dir, f'{name}.{fmt}') for fmt in self.formats]
+            entry = previous.get(name)
+            if not force and entry is not None and entry['input_hash'] == input_hash \
+                    and all(os.path.exists(path) for path in paths):
+                charts[name] = entry
+            else:
+                todo.append((name, method, args, input_hash, paths))
+
+        if todo:
+            pool = RenderPool(self.df, workers=self.workers, start_method=None)
+            try:
+                futures = [(name, input_hash, pool.run(export_chart, method, args, paths))
+                           for name, method, args, input_hash, paths in todo]
+                for name, input_hash, future in futures:
+                    hashes = future.result()
+                    charts[name] = {'input_hash': input_hash,
+                                    'files': {os.path.relpath(path, self.output_dir): digest
+                                              for path, digest in hashes.items()}}
+            finally:
+                pool.close()
+
+        # Keep entries of graphs that were not part of this run
+        for name, entry in previous.items():
+            charts.setdefault(name, entry)
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as file:
+            json.dump({'schema': self.schema, 'charts': charts}, file, indent=2, sort_keys=True)
+        return {'rendered': len(todo), 'skipped': len(jobs) - len(todo),
+                'seconds': time.perf_counter() - start}
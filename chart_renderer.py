@@ -0,0 +1,198 @@
+"""
+Module for rendering graphs off the Tk main thread in the Puppy Picker
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from render_pool import take_pixels
+
+
+def rasterize_rgba(fig, size=None, allocate=None):
+    """
+    Draws a matplotlib figure with the Agg renderer and returns its width,
+    height and raw RGBA pixels. The figure is cleared afterwards.
+    :param size: Optional (width, height) in pixels the figure is resized to.
+    :param allocate: Optional function returning a writable buffer of at least
+        a number of bytes. The pixels are copied into it and it is returned
+        instead of a bytes copy.
+    """
+    if size is not None:
+        fig.set_size_inches(size[0] / fig.dpi, size[1] / fig.dpi)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    # Copy the pixels so the figure can be released right away
+    source = canvas.buffer_rgba().cast('B')
+    if allocate is None:
+        pixels = bytes(source)
+    else:
+        pixels = allocate(len(source))
+        pixels[:len(source)] = source
+    fig.clear()
+    return width, height, pixels
+
+
+def rasterize(fig, size=None):
+    """
+    Draws a matplotlib figure with the Agg renderer and returns it as a PIL image.
+    :param size: Optional (width, height) in pixels the figure is resized to.
+    """
+    width, height, pixels = rasterize_rgba(fig, size)
+    return Image.frombuffer('RGBA', (width, height), pixels, 'raw', 'RGBA', 0, 1)
+
+
+class ChartRenderer:
+    """
+    Builds and rasterizes graphs on a pool of worker threads.
+
+    Requests are grouped in slots, one per place in the window where a graph is
+    shown. Bursts of requests for the same slot are debounced, and every request
+    gets a generation number so results of superseded requests are dropped.
+    Finished images are handed back to the Tk thread through after().
+
+    Requests marked as parallel are sent to a RenderPool of worker processes
+    when one is given, so the graphs of a page render on several cores.
+    """
+    def __init__(self, root, max_workers=2, debounce_ms=150, poll_ms=20, process_pool=None):
+        """
+        Initializes the renderer.
+        :param root: Tk widget used to schedule callbacks on the Tk thread.
+        :param max_workers: Number of worker threads.
+        :param debounce_ms: Requests for a slot within this time are coalesced.
+        :param poll_ms: How often finished renders are checked for.
+        :param process_pool: Optional RenderPool used for parallel requests.
+        """
+        self.root = root
+        self.process_pool = process_pool
+        self.debounce_ms = debounce_ms
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='puppy-picker-render')
+        self.generations = {}
+        self._pending = {}
+        self._results = queue.Queue()
+        self._outstanding = 0
+        self._polling = False
+        self._lock = threading.Lock()
+
+    def request(self, slot, on_ready, build, *args, size=None, on_error=None,
+                debounce=True, parallel=False):
+        """
+        Schedules build(*args) to be rendered for a slot.
+        :param on_ready: Called on the Tk thread with the rendered PIL image.
+        :param build: Function returning a matplotlib Figure, run on a worker thread.
+            Parallel requests must use a GraphManage method.
+        :param size: Optional (width, height) in pixels of the image.
+        :param on_error: Called on the Tk thread with the exception if rendering fails.
+        :param debounce: Wait for more requests of the slot before rendering.
+        :param parallel: Render in a worker process if a process pool is available.
+        """
+        with self._lock:
+            generation = self.generations.get(slot, 0) + 1
+            self.generations[slot] = generation
+        after_id = self._pending.pop(slot, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+        self._pending[slot] = self.root.after(
+            self.debounce_ms if debounce else 0, self._submit, slot, generation,
+            on_ready, on_error, build, args, size, parallel)
+
+    def cancel(self, slot=None):
+        """
+        Drops the pending and running requests of a slot, or of every slot.
+        """
+        slots = list(self.generations) if slot is None else [slot]
+        with self._lock:
+            for each in slots:
+                self.generations[each] = self.generations.get(each, 0) + 1
+        for each in slots:
+            after_id = self._pending.pop(each, None)
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+
+    def is_current(self, slot, generation):
+        """
+        Returns whether a request is still the latest one of its slot.
+        """
+        with self._lock:
+            return self.generations.get(slot) == generation
+
+    def idle(self):
+        """
+        Returns whether no request is waiting or being rendered.
+        """
+        return not self._pending and self._outstanding == 0
+
+    def _submit(self, slot, generation, on_ready, on_error, build, args, size, parallel):
+        """
+        Sends a debounced request to the worker threads or processes.
+        """
+        self._pending.pop(slot, None)
+        if not self.is_current(slot, generation):
+            return
+        future = None
+        if parallel and self.process_pool is not None:
+            try:
+                future = self.process_pool.submit(build.__name__, args, size)
+            except OSError:
+                # No shared memory on this system, render on the threads from now on
+                self.process_pool = None
+        if future is None:
+            future = self.executor.submit(self._render, slot, generation, build, args, size)
+        future.add_done_callback(
+            lambda done: self._results.put((slot, generation, on_ready, on_error, done)))
+        self._outstanding += 1
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+
+    def _render(self, slot, generation, build, args, size):
+        """
+        Builds and rasterizes a graph on a worker thread.
+        """
+        if not self.is_current(slot, generation):
+            return None
+        return rasterize(build(*args), size)
+
+    def _drain(self):
+        """
+        Delivers finished images on the Tk thread, skipping superseded ones.
+        """
+        while True:
+            try:
+                slot, generation, on_ready, on_error, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if future.cancelled():
+                continue
+            error = future.exception()
+            result = future.result() if error is None else None
+            if isinstance(result, tuple):
+                # Pixels shared by a worker process, their block is released even if superseded
+                result = take_pixels(*result)
+            if not self.is_current(slot, generation):
+                continue
+            if error is not None:
+                if on_error is None:
+                    self.root.report_callback_exception(type(error), error, error.__traceback__)
+                else:
+                    on_error(error)
+            elif result is not None:
+                on_ready(result)
+        if self._outstanding > 0:
+            self.root.after(self.poll_ms, self._drain)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        """
+        Stops the worker threads.
+        """
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.process_pool is not None:
+            self.process_pool.close()
@@ -1,8 +1,8 @@
 """ Controller for Puppy Picker """
 
 from view import PuppyPickerView
-from model import PuppyPickerModel
-from graph_manage import GraphManage
+from headless_view import HeadlessView
+from catalog import DEFAULT_CATALOG, catalogs
 
 
 class PuppyPickerController:
@@ -10,15 +10,25 @@ class PuppyPickerController:
     Controller for the Puppy Picker application.
     Handle user interactions between the PuppyPickerModel and PuppyPickerView.
     """
-    def __init__(self):
+    # Keys that move in a combobox list rather than change the typed text
+    NAVIGATION_KEYS = {'Up', 'Down', 'Left', 'Right', 'Return', 'Escape', 'Tab'}
+
+    def __init__(self, profiler=None, headless=False, catalog=DEFAULT_CATALOG):
         """
         Initialize the PuppyPickerController.
         Create instances of the PuppyPickerModel and PuppyPickerView, establishing the
         controller's connection with the model and view components.
+        :param profiler: Optional HandlerProfiler that records slow handlers.
+        :param headless: Use a view stand-in without a window that renders graphs off-screen.
+        :param catalog: Name of the breed catalog shown, see catalog.catalogs.
         """
-        self.model = PuppyPickerModel()
-        self.view = PuppyPickerView(self)
-        self.graph_manage = GraphManage()
+        if profiler is not None:
+            profiler.install(self)
+        self.catalog = catalogs.open(catalog)
+        self.model = self.catalog.model
+        self.graph_manage = self.catalog.graph_manage
+        self.view = HeadlessView(self) if headless else PuppyPickerView(self)
+        self.live_ranking = None
 
     def next_button_handler(self, page):
         """
@@ -31,25 +41,108 @@ class PuppyPickerController:
             self.view.find_breeds_page3()
         elif page == 3:
             prefer_list = self.view.get_user_prefer()
-            allowed_values = {'0', '1', '2', '3', 'small', 'medium', 'big', 'all'}
-            correct_value = True
-            for item in prefer_list:
-                if item not in allowed_values:
-                    correct_value = False
-            if '' in prefer_list:
-                self.view.report_error('Please complete all required fields')
-            elif 'Select' in prefer_list:
-                self.view.report_error('Please select a size')
-            elif not correct_value:
-                self.view.report_error('Please enter only 0-3')
+            error = self.preference_error(prefer_list)
+            if error:
+                self.view.report_error(error)
             else:
                 top_name, top_score = self.model.find_matching_breeds(prefer_list)
                 self.view.find_breeds_page4(top_name, top_score)
-        elif page == 4:
-            if self.view.selected_breed_combo.get() != 'Select':
-                self.view.dog_info_page()
-            else:
-                self.view.report_error('Please Select Dog Breed')
+        elif page == 'live':
+            if self.live_ranking is not None:
+                self.view.find_breeds_page4(*self.live_ranking.top())
+        elif page in (4, 'skyline'):
+            # Both pages pick a breed from the same combobox
+            self.show_info_handler()
+
+    @staticmethod
+    def preference_error(prefer_list):
+        """
+        Returns the error message of invalid preferences of page 3, None if they are valid.
+        """
+        allowed_values = {'0', '1', '2', '3', 'small', 'medium', 'big', 'all'}
+        correct_value = True
+        for item in prefer_list:
+            if item not in allowed_values:
+                correct_value = False
+        if '' in prefer_list:
+            return 'Please complete all required fields'
+        if 'Select' in prefer_list:
+            return 'Please select a size'
+        if not correct_value:
+            return 'Please enter only 0-3'
+        return None
+
+    def skyline_handler(self):
+        """
+        Shows the breeds with the best trade-offs between the characteristics
+        rated above 0 on page 3: no other breed of the size is at least as good
+        on all of them and better on one.
+        """
+        prefer_list = self.view.get_user_prefer()
+        error = self.preference_error(prefer_list)
+        if error:
+            self.view.report_error(error)
+            return
+        criteria = {column: 'max' for column, value in zip(self.model.COLUMNS, prefer_list)
+                    if value != '0'}
+        if not criteria:
+            self.view.report_error('Please rate at least one characteristic')
+            return
+        self.view.skyline_page(self.model.skyline_breeds(criteria, prefer_list[6]))
+
+    def live_mode_handler(self):
+        """
+        Replaces the preference entries with sliders that re-rank the breeds while they move.
+        """
+        self.view.live_ranking_page()
+        self.live_size_handler(None)
+
+    def live_size_handler(self, event):
+        """
+        Ranks the breeds of the selected size with the current slider values.
+        """
+        self.live_ranking = self.model.live_ranking(self.view.get_live_weights(),
+                                                    self.view.selected_size.get())
+        self.view.show_live_ranking(*self.live_ranking.top())
+
+    def live_weights_handler(self):
+        """
+        Updates the ranking of the live mode after a slider moved.
+        """
+        if self.live_ranking is None:
+            return
+        self.live_ranking.set_weights(self.view.get_live_weights())
+        self.view.show_live_ranking(*self.live_ranking.top())
+
+    def breed_search_handler(self, event):
+        """
+        Lists the breeds matching the text typed in a breed combobox.
+        """
+        if event.keysym in self.NAVIGATION_KEYS:
+            return
+        self.view.show_breed_suggestions(event.widget, self.suggest_breeds(event.widget.get()))
+
+    def suggest_breeds(self, text=''):
+        """
+        Returns the breeds offered in a breed combobox for the typed text,
+        the first breeds in alphabetical order when nothing is typed.
+        """
+        return self.model.search_breeds(text)
+
+    def selected_breed(self, variable, placeholder):
+        """
+        Returns the breed picked or typed in a combobox, None if there is none.
+        A typed name is replaced by the name as written in the data.
+        Raises ValueError for a name that is not a known breed.
+        """
+        text = variable.get().strip()
+        if text in ('', placeholder):
+            return None
+        breed = self.model.resolve_breed(text)
+        if breed is None:
+            raise ValueError(f'Unknown dog breed: {text}')
+        variable.set(breed)
+        return breed
 
     def story_combobox_handler(self, event):
         """
@@ -63,7 +156,12 @@ class PuppyPickerController:
         """
         Displays detailed information for a selected dog breed.
         """
-        if self.view.selected_breed_combo.get() != 'Select':
+        try:
+            breed = self.selected_breed(self.view.selected_breed_combo, 'Select')
+        except ValueError as error:
+            self.view.report_error(str(error))
+            return
+        if breed is not None:
             self.view.dog_info_page()
         else:
             self.view.report_error('Please Select Dog Breed')
@@ -74,7 +172,6 @@ class PuppyPickerController:
         updating the graphical display accordingly.
         """
         breed = self.view.selected_breed_combo.get()
-        self.view.canvas_widget_gender.destroy()
         selected_gender = self.view.selected_gender_combo.get()
         if selected_gender == 'Male':
             self.view.draw_male_graph(breed)
@@ -99,20 +196,69 @@ class PuppyPickerController:
                     self.view.draw_explore_hist()
                 else:
                     self.view.report_error('Please Select attributes')
+            elif page == 'correlation':
+                if self.view.selected1_explore.get() != 'Select Method' \
+                        and self.view.selected2_explore.get() != 'Select Attributes':
+                    self.view.draw_explore_corr()
+                else:
+                    self.view.report_error('Please Select attributes')
         else:
             self.view.report_error('Please Select attributes')
 
+    def compare_combobox_handler(self, event):
+        """
+        Suggests the breeds most similar to the first breed
+        selected on the comparison page.
+        """
+        try:
+            breed = self.selected_breed(self.view.selected1_breed_compare, 'Select Dog Breed')
+        except ValueError as error:
+            self.view.report_error(str(error))
+            return
+        if breed is not None:
+            self.view.show_similar_breeds(breed, self.model.most_similar_breeds(breed))
+
     def show_compare_handler(self):
         """
-        Handles the comparison of characteristics between
-        two selected dog breeds using a multiple bar graph.
+        Handles the comparison of characteristics between the selected
+        dog breeds using a multiple bar graph.
         """
-        if self.view.selected1_breed_compare.get() != 'Select Dog Breed' \
-                and self.view.selected2_breed_compare.get() != 'Select Dog Breed':
-            self.view.draw_compare_graph()
+        try:
+            breed1 = self.selected_breed(self.view.selected1_breed_compare, 'Select Dog Breed')
+            breed2 = self.selected_breed(self.view.selected2_breed_compare, 'Select Dog Breed')
+        except ValueError as error:
+            self.view.report_error(str(error))
+            return
+        breeds = [breed1]
+        for breed in self.view.compare_breeds + [breed2]:
+            if breed is not None and breed not in breeds:
+                breeds.append(breed)
+        if breed1 is not None and len(breeds) >= 2:
+            self.view.draw_compare_graph(breeds)
         else:
             self.view.report_error('Please Select Dog Breed')
 
+    def add_compare_breed_handler(self):
+        """
+        Adds the breed selected in the second combobox to the comparison,
+        so more than two breeds can be compared.
+        """
+        try:
+            breed = self.selected_breed(self.view.selected2_breed_compare, 'Select Dog Breed')
+        except ValueError as error:
+            self.view.report_error(str(error))
+            return
+        if breed is not None:
+            self.view.add_compare_breed(breed)
+        else:
+            self.view.report_error('Please Select Dog Breed')
+
+    def compare_shortlist_handler(self):
+        """
+        Compares every breed matching the user's preferences.
+        """
+        self.view.comparison_page(self.view.shortlist)
+
     def run(self):
         """
         Run the program by running PuppyPickerView
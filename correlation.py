@@ -0,0 +1,170 @@
+"""
+Module for the correlations between breed attributes in the Puppy Picker
+"""
+
+import numpy as np
+import pandas as pd
+from snapshot import DatasetSnapshot
+
+
+class CorrelationService:
+    """
+    Keeps the correlation matrices of every numeric attribute of the breed data.
+
+    The Pearson matrix comes from running co-moments (count, means and the
+    sums of products of deviations), so adding or removing rows updates it
+    without another pass over the data. The Spearman matrix needs ranks over
+    all complete rows, it is computed once per data version when first asked for.
+    Any pair or sub-matrix is then a lookup.
+    """
+    METHODS = ['pearson', 'spearman']
+
+    def __init__(self, df, columns=None):
+        """
+        Computes the co-moments of the numeric columns of df.
+        :param columns: Columns to correlate, every numeric column by default.
+        """
+        if columns is None:
+            columns = [column for column in df.columns
+                       if pd.api.types.is_numeric_dtype(df[column].dtype)
+                       and not isinstance(df[column].dtype, pd.CategoricalDtype)]
+        self.columns = list(columns)
+        self.positions = {column: position for position, column in enumerate(self.columns)}
+        size = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.comoment = np.zeros((size, size))
+        self.version = 0
+        self.data = df
+        self._spearman = None
+        self._spearman_version = None
+        self.add_rows(df)
+
+    def _values(self, rows):
+        """
+        Returns the attribute values of rows as a matrix, without incomplete rows.
+        """
+        values = rows[self.columns].to_numpy(dtype=np.float64)
+        return values[~np.isnan(values).any(axis=1)]
+
+    def add_rows(self, rows):
+        """
+        Merges the co-moments of new rows into the running co-moments.
+        """
+        values = self._values(rows)
+        count = len(values)
+        if count == 0:
+            return
+        mean = values.mean(axis=0)
+        deviations = values - mean
+        comoment = deviations.T @ deviations
+        total = self.count + count
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.mean += delta * (count / total)
+        self.count = total
+        self.version += 1
+
+    def remove_rows(self, rows):
+        """
+        Removes rows that were added before from the running co-moments.
+        """
+        values = self._values(rows)
+        count = len(values)
+        if count == 0:
+            return
+        if count >= self.count:
+            self.count = 0
+            self.mean[:] = 0
+            self.comoment[:] = 0
+        else:
+            mean = values.mean(axis=0)
+            deviations = values - mean
+            remaining = self.count - count
+            remaining_mean = (self.mean * self.count - mean * count) / remaining
+            delta = mean - remaining_mean
+            self.comoment -= deviations.T @ deviations + \
+                np.outer(delta, delta) * (remaining * count / self.count)
+            self.mean = remaining_mean
+            self.count = remaining
+        self.version += 1
+
+    @classmethod
+    def for_snapshot(cls, snapshot):
+        """
+        Returns the correlation service of a snapshot, built once per snapshot.
+        When the snapshot only changed some rows of a snapshot whose service
+        was built, that service's co-moments are carried forward: the old
+        values of the rows are removed and their new values added.
+        """
+        def build(data):
+            previous = data.carried('correlations')
+            if previous is None:
+                return cls(data.df)
+            service = previous.copy()
+            service.remove_rows(data.previous_rows)
+            service.add_rows(data.df.iloc[data.changed_rows])
+            service.replace_data(data.df)
+            return service
+        return snapshot.derived('correlations', build)
+
+    def copy(self):
+        """
+        Returns a service with the same co-moments that can be updated separately.
+        """
+        service = CorrelationService.__new__(CorrelationService)
+        service.__dict__.update(self.__dict__)
+        service.mean = self.mean.copy()
+        service.comoment = self.comoment.copy()
+        return service
+
+    def replace_data(self, df):
+        """
+        Gives the current rows of the data, used for the Spearman ranks.
+        Call it together with add_rows or remove_rows when the data changes.
+        """
+        self.data = df
+
+    def pearson(self):
+        """
+        Returns the full Pearson correlation matrix.
+        """
+        deviation = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = self.comoment / np.outer(deviation, deviation)
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+    def spearman(self):
+        """
+        Returns the full Spearman correlation matrix, computed once per data version.
+        Like the Pearson matrix, it uses the rows where no attribute is missing.
+        """
+        if self._spearman_version != self.version:
+            ranks = self.data[self.columns].dropna().rank()
+            self._spearman = CorrelationService(ranks, self.columns).pearson()
+            self._spearman_version = self.version
+        return self._spearman
+
+    def matrix(self, method='pearson', columns=None):
+        """
+        Returns the correlation matrix of some columns, all of them by default.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f'Unknown correlation method: {method}')
+        full = self.pearson() if method == 'pearson' else self.spearman()
+        if columns is None:
+            return full
+        return full.loc[columns, columns]
+
+    def pair(self, column1, column2, method='pearson'):
+        """
+        Returns the correlation between two columns.
+        """
+        if method == 'pearson':
+            first, second = self.positions[column1], self.positions[column2]
+            return float(self.comoment[first, second] /
+                         np.sqrt(self.comoment[first, first] * self.comoment[second, second]))
+        return float(self.matrix(method).loc[column1, column2])
+
+
+DatasetSnapshot.carry_forward('correlations')
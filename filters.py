@@ -0,0 +1,258 @@
+"""
+Module for filtering breeds on several attributes in the Puppy Picker
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+
+
+# Number of set bits of every byte value
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+
+class Bitmap:
+    """
+    Set of row positions stored one bit per row, combined with bitwise operators.
+    """
+    def __init__(self, words, size):
+        """
+        :param words: Packed bits as a uint8 array, first row in the highest bit.
+        :param size: Number of rows.
+        """
+        self.words = words
+        self.size = size
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        Returns the set of the rows where a boolean array is True.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask), len(mask))
+
+    @classmethod
+    def from_rows(cls, rows, size):
+        """
+        Returns the set of some row positions out of size rows.
+        """
+        mask = np.zeros(size, dtype=bool)
+        mask[rows] = True
+        return cls.from_mask(mask)
+
+    @classmethod
+    def full(cls, size):
+        """
+        Returns the set of all the rows.
+        """
+        return cls.from_mask(np.ones(size, dtype=bool))
+
+    def __and__(self, other):
+        """
+        Returns the rows in both sets.
+        """
+        return Bitmap(self.words & other.words, self.size)
+
+    def __or__(self, other):
+        """
+        Returns the rows in either set.
+        """
+        return Bitmap(self.words | other.words, self.size)
+
+    def __invert__(self):
+        """
+        Returns the rows not in the set.
+        """
+        words = ~self.words
+        if self.size % 8:
+            # Bits past the last row stay cleared
+            words[-1] &= np.uint8(0xFF << (8 - self.size % 8) & 0xFF)
+        return Bitmap(words, self.size)
+
+    def count(self):
+        """
+        Returns the number of rows in the set.
+        """
+        return int(POPCOUNT[self.words].sum())
+
+    def mask(self):
+        """
+        Returns the set as a boolean array with one value per row.
+        """
+        return np.unpackbits(self.words, count=self.size).astype(bool)
+
+    def rows(self):
+        """
+        Returns the positions of the rows in the set, in increasing order.
+        """
+        return np.flatnonzero(np.unpackbits(self.words, count=self.size))
+
+
+class FilterIndex:
+    """
+    Indexes of the breed data for filters combining several attributes, such as
+    "Herding or Working dogs under 50 lb living at least 12 years".
+
+    Categorical columns get one bitmap per value. Numeric columns get a sorted
+    index, so a range predicate is two binary searches and a bitmap of the
+    matching rows. Every predicate gives a bitmap and predicates are combined
+    with bitwise AND. Indexes are built the first time a column is filtered on
+    and are kept with the snapshot of the data they were built from.
+    """
+    # Columns computed from others, filtered like stored columns
+    VIRTUAL_COLUMNS = {'average_weight': ['min_weight_male', 'max_weight_male',
+                                          'min_weight_female', 'max_weight_female']}
+
+    def __init__(self, snapshot):
+        """
+        Initializes the index of a snapshot, indexes are built on demand.
+        """
+        self.snapshot = snapshot
+        self.size = len(snapshot)
+        self.bitmaps = {}
+        self.sorted = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_snapshot(cls, snapshot):
+        """
+        Returns the index of a snapshot, created once per snapshot.
+        """
+        return snapshot.derived('filter_index', cls)
+
+    def values(self, column):
+        """
+        Returns the values of a stored or virtual column.
+        """
+        if column in self.VIRTUAL_COLUMNS:
+            return self.snapshot.matrix(self.VIRTUAL_COLUMNS[column]).mean(axis=1)
+        if column not in self.snapshot.columns:
+            raise ValueError(f'Unknown column: {column}')
+        return self.snapshot.columns[column]
+
+    def category_bitmaps(self, column):
+        """
+        Returns the bitmap of every value of a categorical column.
+        """
+        with self._lock:
+            if column not in self.bitmaps:
+                values = self.values(column)
+                if isinstance(values, pd.Categorical):
+                    codes, categories = values.codes, values.categories
+                else:
+                    codes, categories = pd.factorize(values)
+                self.bitmaps[column] = {category: Bitmap.from_mask(codes == code)
+                                        for code, category in enumerate(categories)}
+            return self.bitmaps[column]
+
+    def is_numeric(self, column):
+        """
+        Returns whether a column holds numbers rather than categories or names.
+        """
+        values = self.values(column)
+        return not isinstance(values, pd.Categorical) and np.asarray(values).dtype.kind in 'biuf'
+
+    def sorted_index(self, column):
+        """
+        Returns the rows of a numeric column sorted by value, their sorted values
+        and the number of rows without a value, which come last. Float columns
+        keep their own type, so bounds are compared in the precision the values
+        were stored in.
+        """
+        with self._lock:
+            if column not in self.sorted:
+                values = np.asarray(self.values(column))
+                if values.dtype.kind != 'f':
+                    values = values.astype(np.float64)
+                order = np.argsort(values, kind='stable')
+                ordered = values[order]
+                self.sorted[column] = (order, ordered, int(np.isnan(ordered).sum()))
+            return self.sorted[column]
+
+    def equals(self, column, wanted):
+        """
+        Returns the rows whose value is one of the wanted values.
+        """
+        if isinstance(wanted, str) or not hasattr(wanted, '__iter__'):
+            wanted = [wanted]
+        result = Bitmap(np.zeros((self.size + 7) // 8, dtype=np.uint8), self.size)
+        if self.is_numeric(column):
+            for value in wanted:
+                result = result | self.between(column, value, value)
+            return result
+        bitmaps = self.category_bitmaps(column)
+        for value in wanted:
+            if value in bitmaps:
+                result = result | bitmaps[value]
+        return result
+
+    def missing(self, column):
+        """
+        Returns the rows without a value in a column.
+        """
+        if self.is_numeric(column):
+            order, _, missing = self.sorted_index(column)
+            return Bitmap.from_rows(order[len(order) - missing:], self.size)
+        return Bitmap.from_mask(pd.isna(self.values(column)))
+
+    def between(self, column, low=None, high=None, include_low=True, include_high=True):
+        """
+        Returns the rows whose numeric value lies between low and high,
+        either bound can be None. Rows without a value never match.
+        """
+        order, ordered, missing = self.sorted_index(column)
+        valid = ordered[:len(ordered) - missing]
+        # A bound given as 8.8 must match the value 8.8 stored as float32
+        if low is not None:
+            low = self._bound(low, valid.dtype)
+        if high is not None:
+            high = self._bound(high, valid.dtype)
+        start = 0 if low is None else \
+            np.searchsorted(valid, low, side='left' if include_low else 'right')
+        stop = len(valid) if high is None else \
+            np.searchsorted(valid, high, side='right' if include_high else 'left')
+        return Bitmap.from_rows(order[start:max(start, stop)], self.size)
+
+    @staticmethod
+    def _bound(value, dtype):
+        """
+        Returns a bound in the type of the values it is compared with, unless
+        the conversion would overflow.
+        """
+        with np.errstate(over='ignore'):
+            converted = dtype.type(value)
+        return converted if np.isfinite(converted) or not np.isfinite(value) else value
+
+    def predicate(self, column, operator, value):
+        """
+        Returns the rows matching one predicate such as ('average_lifespan', '>=', 12).
+        """
+        if operator == '==' or operator == 'in':
+            return self.equals(column, value)
+        if operator == '!=':
+            # Rows without a value are not different from anything
+            return ~(self.equals(column, value) | self.missing(column))
+        if operator == '<':
+            return self.between(column, high=value, include_high=False)
+        if operator == '<=':
+            return self.between(column, high=value)
+        if operator == '>':
+            return self.between(column, low=value, include_low=False)
+        if operator == '>=':
+            return self.between(column, low=value)
+        if operator == 'between':
+            return self.between(column, *value)
+        raise ValueError(f'Unknown operator: {operator}')
+
+    def select(self, predicates):
+        """
+        Returns the rows matching every predicate, all rows for no predicate.
+        :param predicates: List of (column, operator, value), operators are
+            '==', '!=', 'in' for any column and '<', '<=', '>', '>=',
+            'between' (value is a (low, high) pair) for numeric columns.
+            Rows without a value in a column match no predicate on it.
+        """
+        result = Bitmap.full(self.size)
+        for column, operator, value in predicates:
+            result = result & self.predicate(column, operator, value)
+        return result
@@ -2,10 +2,17 @@
 Module for managing data visualization in the Puppy Picker
 """
 
+import hashlib
+import os
+import sys
 import pandas as pd
 import seaborn as sns
 import numpy as np
+from matplotlib.colors import LinearSegmentedColormap
 from matplotlib.figure import Figure
+from correlation import CorrelationService
+from filters import FilterIndex
+from snapshot import SnapshotStore
 
 
 class GraphManage:
@@ -13,16 +20,107 @@ class GraphManage:
     Manages data loading, processing, and visualization
     for the Puppy Picker.
     """
-    def __init__(self):
-        self.df = self.load_data('breeds.csv')
+    # Scatter plots of more rows than this are drawn as a density grid
+    SCATTER_LOD_ROWS = 5000
+    DENSITY_BINS = 60
+    # Histograms and group means of more rows than this come from the loading summary
+    SUMMARY_ROWS = 5000
+    # Files larger than this are loaded in chunks by ingest.StreamingLoader
+    STREAMING_BYTES = 64 * 1024 * 1024
+
+    # Column types of the compact in-memory representation
+    SCORE_COLUMNS = ['adaptability', 'all_around_friendliness', 'health_grooming',
+                     'trainability', 'exercise_needs', 'min_life_expectancy',
+                     'max_life_expectancy']
+    MEASUREMENT_COLUMNS = ['max_height_male', 'max_height_female', 'max_weight_male',
+                           'max_weight_female', 'min_height_male', 'min_height_female',
+                           'min_weight_male', 'min_weight_female',
+                           'average_lifespan', 'average_size']
+    CATEGORY_COLUMNS = ['breed_group', 'size_category']
+    NAME_COLUMNS = ['breed']
+
+    # Bar colors of the breeds of a comparison, in order
+    COMPARE_COLORS = ['#D1E1A4', '#6DCDBC', '#CDC673', '#9C661F', '#66CDAA',
+                      '#EEB4B4', '#8DB6CD', '#CD8162', '#B4CDCD', '#D8BFD8']
+
+    # Groups of columns offered on the correlation exploration page
+    CORRELATION_GROUPS = {
+        'all': None,
+        'characteristics': ['adaptability', 'all_around_friendliness', 'health_grooming',
+                            'trainability', 'exercise_needs', 'average_lifespan', 'average_size'],
+        'measurements': ['min_height_male', 'max_height_male', 'min_height_female',
+                         'max_height_female', 'min_weight_male', 'max_weight_male',
+                         'min_weight_female', 'max_weight_female', 'average_size'],
+        'lifespan': ['min_life_expectancy', 'max_life_expectancy', 'average_lifespan',
+                     'average_size', 'max_height_male', 'max_weight_male'],
+    }
+
+    def __init__(self, df=None, store=None):
+        """
+        Initializes GraphManage with the breed data.
+        :param df: Breed data, the default catalog when neither df nor store is given.
+        :param store: SnapshotStore shared with other users of the same data.
+        """
+        if store is None:
+            if df is None:
+                from catalog import catalogs  # pylint: disable=import-outside-toplevel
+                store = catalogs.open().store
+            else:
+                store = SnapshotStore(df)
+        self.store = store
+
+    @property
+    def df(self):
+        """
+        The current immutable snapshot of the breed data as a DataFrame.
+        Methods read it once and use the same snapshot until they return.
+        """
+        return self.store.current().df
+
+    @df.setter
+    def df(self, df):
+        self.store.replace(df)
 
     @staticmethod
-    def load_data(filepath):
+    def load_data(filepath, compact=True, chunk_rows=None):
         """
         Load and preprocess data from a CSV file, enhancing the dataset
         with calculated fields like average lifespan and size category for detailed analysis.
+        Unless compact is False, columns are stored with the compact types of compact_types.
+        Large files, or any file when chunk_rows is given, are read in chunks of rows
+        so only one chunk is held in the CSV's own types at a time.
+        A JSON file is the spec of several sources merged by merge_sources.SourceMerger.
+        """
+        return GraphManage.load_data_with_summary(filepath, compact, chunk_rows)[0]
+
+    @staticmethod
+    def load_data_with_summary(filepath, compact=True, chunk_rows=None):
+        """
+        Same as load_data, also returns the ingest.IngestSummary of the data,
+        computed while it is read.
+        """
+        from ingest import IngestSummary, StreamingLoader  # pylint: disable=import-outside-toplevel
+        if filepath.endswith('.json'):
+            from merge_sources import SourceMerger  # pylint: disable=import-outside-toplevel
+            df = GraphManage.derive_columns(SourceMerger(filepath).load())
+        elif compact and (chunk_rows is not None
+                          or os.path.getsize(filepath) > GraphManage.STREAMING_BYTES):
+            loader = StreamingLoader(filepath, chunk_rows)
+            return loader.load(), loader.summary
+        else:
+            df = GraphManage.derive_columns(pd.read_csv(filepath))
+        summary = IngestSummary()
+        summary.update(df)
+        if compact:
+            df = GraphManage.compact_types(df)
+        return df, summary
+
+    @staticmethod
+    def derive_columns(df):
+        """
+        Adds the average lifespan, average size and size category of every row.
+        Each row only depends on itself, so chunks of a file can be derived separately.
         """
-        df = pd.read_csv(filepath)
         df['average_lifespan'] = (df['min_life_expectancy'] + df['max_life_expectancy']) / 2
 
         df['average_size'] = (df['max_height_male'] + df['max_weight_male'] + df['min_height_male'] +
@@ -35,6 +133,87 @@ class GraphManage:
                                      include_lowest=True)
         return df
 
+    @staticmethod
+    def compact_types(df):
+        """
+        Converts the breed data to compact column types: int8 for scores and
+        life expectancies, float32 for measurements, categoricals for groups and
+        interned strings for breed names. Columns with missing or out of range
+        values keep a type that can hold them.
+        """
+        df = df.copy()
+        for column in GraphManage.SCORE_COLUMNS:
+            if column not in df:
+                continue
+            values = df[column]
+            if values.notna().all() and (values == values.round()).all() \
+                    and values.between(-128, 127).all():
+                df[column] = values.astype(np.int8)
+            else:
+                df[column] = values.astype(np.float32)
+        for column in GraphManage.MEASUREMENT_COLUMNS:
+            if column in df:
+                df[column] = df[column].astype(np.float32)
+        for column in GraphManage.CATEGORY_COLUMNS:
+            if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+        for column in GraphManage.NAME_COLUMNS:
+            if column in df:
+                df[column] = pd.Series([sys.intern(name) if isinstance(name, str) else name
+                                        for name in df[column]], index=df.index, dtype=object)
+        return df
+
+    def summary(self, snapshot=None):
+        """
+        Returns the IngestSummary kept with a snapshot, the current one by default,
+        when its data is large enough to be summarized rather than scanned.
+        None for small data and for data changed since it was loaded.
+        """
+        from ingest import IngestSummary  # pylint: disable=import-outside-toplevel
+        snapshot = snapshot or self.store.current()
+        if len(snapshot) <= self.SUMMARY_ROWS:
+            return None
+        return IngestSummary.of(snapshot)
+
+    @staticmethod
+    def memory_report(df):
+        """
+        Returns the memory used by each column of the data and in total, in bytes.
+        """
+        report = {column: {'dtype': str(df[column].dtype),
+                           'bytes': GraphManage.column_bytes(df[column])}
+                  for column in df.columns}
+        report['total'] = {'dtype': '', 'bytes': sum(entry['bytes'] for entry in report.values())}
+        return report
+
+    @staticmethod
+    def column_bytes(series):
+        """
+        Returns the memory used by a column, with the objects of object columns.
+        Unlike memory_usage(deep=True), it works on the read-only arrays of snapshots.
+        """
+        if series.dtype == object:
+            values = series.to_numpy()
+            return int(values.nbytes + sum(map(sys.getsizeof, values)))
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return int(series.cat.codes.nbytes
+                       + series.cat.categories.memory_usage(deep=True))
+        return int(series.memory_usage(index=False))
+
+    @staticmethod
+    def fingerprint(df, columns=None):
+        """
+        Returns a hash identifying the content of the data, optionally limited to
+        some columns. Caches built from the data are keyed by this value.
+        """
+        if columns is not None:
+            df = df[columns]
+        digest = hashlib.sha256()
+        digest.update(repr([(column, str(dtype)) for column, dtype in df.dtypes.items()])
+                      .encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
     def create_histogram(self, selected_var, size):
         """
         Creates a histogram figure of the specified variable
@@ -43,7 +222,7 @@ class GraphManage:
         if size == 'small':
             fig = Figure(figsize=(4, 3))
             ax = fig.add_subplot(111)
-            self.df.hist(column=selected_var, ax=ax, color='#CDC673')
+            self.draw_histogram(ax, selected_var)
             ax.set_title(f'{selected_var} Histogram', fontsize=6)
             ax.set_xlabel(selected_var, fontsize=6)
             ax.set_ylabel('Frequency', fontsize=6)
@@ -53,7 +232,7 @@ class GraphManage:
         elif size == 'big':
             fig = Figure(figsize=(5.5, 3.5))
             ax = fig.add_subplot(111)
-            self.df.hist(column=selected_var, ax=ax, color='#CDC673')
+            self.draw_histogram(ax, selected_var)
             ax.set_title(f'{selected_var} Histogram', fontsize=8)
             ax.set_xlabel(selected_var, fontsize=8)
             ax.set_ylabel('Frequency', fontsize=8)
@@ -62,6 +241,59 @@ class GraphManage:
             fig.tight_layout()
             return fig
 
+    def draw_histogram(self, ax, column):
+        """
+        Draws the histogram of a column, from the counts kept while loading large data.
+        """
+        summary = self.summary()
+        if summary is not None and column in summary.histograms:
+            histogram = summary.histograms[column]
+            ax.stairs(histogram.counts, histogram.edges, fill=True, color='#CDC673')
+            ax.grid(True)
+        else:
+            self.df.hist(column=column, ax=ax, color='#CDC673')
+
+    def group_means(self, group_column, column):
+        """
+        Returns the mean of a column per group from the loading summary of large
+        data, None when there is no summary holding it.
+        """
+        summary = self.summary()
+        if summary is None or group_column not in summary.groups \
+                or column not in summary.groups[group_column].columns:
+            return None
+        return summary.groups[group_column].means()[column]
+
+    def density_grid(self, x_axis, y_axis):
+        """
+        Returns the counts of rows in a grid of x and y bins and the bin edges.
+        Grids are cached per pair of attributes with the current data snapshot.
+        """
+        def build(snapshot):
+            # The column arrays themselves, no (rows, 2) copy is kept with the snapshot
+            x_values = np.asarray(snapshot.columns[x_axis], dtype=np.float64)
+            y_values = np.asarray(snapshot.columns[y_axis], dtype=np.float64)
+            valid = ~(np.isnan(x_values) | np.isnan(y_values))
+            return np.histogram2d(x_values[valid], y_values[valid], bins=self.DENSITY_BINS)
+        return self.store.current().derived(('density', x_axis, y_axis), build)
+
+    def scatter_or_density(self, ax, x_axis, y_axis, color):
+        """
+        Draws a scatter plot of two attributes, or a density grid when there are
+        too many rows for individual markers, so drawing time stays constant.
+        """
+        df = self.df
+        if len(df) <= self.SCATTER_LOD_ROWS:
+            sns.scatterplot(data=df, x=x_axis, y=y_axis, ax=ax, color=color)
+            return
+        counts, x_edges, y_edges = self.density_grid(x_axis, y_axis)
+        colormap = LinearSegmentedColormap.from_list('density', ['#FFFFFF', color])
+        image = ax.imshow(np.ma.masked_equal(counts.T, 0), origin='lower', aspect='auto',
+                          extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+                          cmap=colormap, interpolation='nearest')
+        colorbar = ax.figure.colorbar(image, ax=ax)
+        colorbar.ax.tick_params(labelsize=6)
+
     def story_scatter(self):
         """
         Creates a scatter plot comparing average size and lifespan across
@@ -70,8 +302,7 @@ class GraphManage:
         fig = Figure(figsize=(2.5, 2))
         ax = fig.add_subplot(111)
 
-        sns.scatterplot(data=self.df, x='average_size',
-                        y='average_lifespan', ax=ax, color='#9370DB')
+        self.scatter_or_density(ax, 'average_size', 'average_lifespan', '#9370DB')
 
         ax.set_title('Size vs. Lifespan Scatter plot', fontsize=6)
         ax.set_xlabel('Average Size (Height and Weight Combined)', fontsize=6)
@@ -90,8 +321,8 @@ class GraphManage:
         fig = Figure(figsize=(2.5, 2))
         ax = fig.add_subplot(111)
 
-        selected_columns = self.df[['average_lifespan', 'average_size']]
-        correlation_matrix = selected_columns.corr()
+        correlation_matrix = self.correlations().matrix('pearson',
+                                                        ['average_lifespan', 'average_size'])
 
         sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f",
                     linewidths=.5, cbar_kws={"shrink": .8}, ax=ax)
@@ -103,24 +334,55 @@ class GraphManage:
 
         return fig
 
+    def correlations(self):
+        """
+        Returns the correlation service of the current data, created once
+        per data snapshot and updated incrementally when only rows change.
+        """
+        return CorrelationService.for_snapshot(self.store.current())
+
+    def explore_correlation(self, method, column_group):
+        """
+        Creates a heatmap of the correlations between a group of attributes
+        for exploratory data analysis.
+        """
+        columns = self.CORRELATION_GROUPS[column_group]
+        correlation_matrix = self.correlations().matrix(method, columns)
+
+        fig = Figure(figsize=(5.5, 3.7))
+        ax = fig.add_subplot(111)
+        annotate = len(correlation_matrix) <= 9
+        sns.heatmap(correlation_matrix, annot=annotate, cmap='coolwarm', fmt=".2f",
+                    vmin=-1, vmax=1, linewidths=.5, annot_kws={"fontsize": 6}, ax=ax)
+
+        ax.set_title(f'{method.capitalize()} correlation of {column_group} attributes',
+                     fontsize=8)
+        ax.tick_params(axis='both', which='major', labelsize=6)
+        fig.tight_layout()
+
+        return fig
+
     def story_bar(self):
         """
         Creates a bar graph showing the average lifespan of dog breeds
         categorized by size. This plot is used on the storytelling page
         """
-        self.df['size_category'] = pd.Categorical(self.df['size_category'],
-                                                  categories=['small', 'medium', 'big'],
-                                                  ordered=True)
-
+        order = ['small', 'medium', 'big']
+        colors = ['#27408B', '#008080', '#71C671']
         fig = Figure(figsize=(2, 2))
         ax = fig.add_subplot(111)
 
-        bar_plot = sns.barplot(x='size_category', y='average_lifespan', data=self.df,
-                               order=['small', 'medium', 'big'], ax=ax)
-
-        colors = ['#27408B', '#008080', '#71C671']
-        for i, each_bar in enumerate(bar_plot.patches):
-            each_bar.set_color(colors[i % len(colors)])
+        means = self.group_means('size_category', 'average_lifespan')
+        if means is not None:
+            # Means kept while loading, no pass over the rows
+            means = means.reindex(order)
+            ax.bar(order, means.to_numpy(), color=colors)
+        else:
+            df = self.df
+            size_category = pd.Categorical(df['size_category'], categories=order, ordered=True)
+            bar_plot = sns.barplot(x=size_category, y=df['average_lifespan'], order=order, ax=ax)
+            for i, each_bar in enumerate(bar_plot.patches):
+                each_bar.set_color(colors[i % len(colors)])
         ax.set_title('Average Lifespan by Size Category', fontsize=6)
         ax.set_xlabel('Size Category', fontsize=6)
         ax.set_ylabel('Average Lifespan (Years)', fontsize=6)
@@ -134,12 +396,13 @@ class GraphManage:
         Creates a bar graph displaying scores of various characteristics
         for a specific dog breed. This plot is used on the Statistical Information page
         """
+        df = self.df
 
         selected_breeds = [breed]
         characteristics = ['all_around_friendliness', 'trainability',
                            'health_grooming', 'exercise_needs', 'adaptability']
 
-        selected_data = self.df[self.df['breed'].isin(selected_breeds)][['breed'] + characteristics]
+        selected_data = df[df['breed'].isin(selected_breeds)][['breed'] + characteristics]
 
         fig = Figure(figsize=(3.5, 3.5))
         ax = fig.add_subplot(111)
@@ -190,11 +453,12 @@ class GraphManage:
         Creates a bar graph illustrating physical measurements
         for male dogs of a selected breed.
         """
+        df = self.df
         x_axis = ['Min height', 'Max Height', 'Min Weight', 'Max Weight']
-        min_height_m = self.df[self.df['breed'] == breed]['min_height_male'].iloc[0]
-        max_height_m = self.df[self.df['breed'] == breed]['max_height_male'].iloc[0]
-        min_weight_m = self.df[self.df['breed'] == breed]['min_weight_male'].iloc[0]
-        max_weight_m = self.df[self.df['breed'] == breed]['max_weight_male'].iloc[0]
+        min_height_m = df[df['breed'] == breed]['min_height_male'].iloc[0]
+        max_height_m = df[df['breed'] == breed]['max_height_male'].iloc[0]
+        min_weight_m = df[df['breed'] == breed]['min_weight_male'].iloc[0]
+        max_weight_m = df[df['breed'] == breed]['max_weight_male'].iloc[0]
         y_axis = [min_height_m, max_height_m, min_weight_m, max_weight_m]
 
         fig = Figure(figsize=(3, 3.3))
@@ -218,11 +482,12 @@ class GraphManage:
         Creates a bar graph illustrating physical measurements
         for female dogs of a selected breed.
         """
+        df = self.df
         x_axis = ['Min height', 'Max Height', 'Min Weight', 'Max Weight']
-        min_height_f = self.df[self.df['breed'] == breed]['min_height_female'].iloc[0]
-        max_height_f = self.df[self.df['breed'] == breed]['max_height_female'].iloc[0]
-        min_weight_f = self.df[self.df['breed'] == breed]['min_weight_female'].iloc[0]
-        max_weight_f = self.df[self.df['breed'] == breed]['max_weight_female'].iloc[0]
+        min_height_f = df[df['breed'] == breed]['min_height_female'].iloc[0]
+        max_height_f = df[df['breed'] == breed]['max_height_female'].iloc[0]
+        min_weight_f = df[df['breed'] == breed]['min_weight_female'].iloc[0]
+        max_weight_f = df[df['breed'] == breed]['max_weight_female'].iloc[0]
         y_axis = [min_height_f, max_height_f, min_weight_f, max_weight_f]
 
         fig = Figure(figsize=(3, 3.3))
@@ -248,7 +513,11 @@ class GraphManage:
         fig = Figure(figsize=(5.5, 3.5))
         ax = fig.add_subplot(111)
 
-        sns.barplot(data=self.df, x=x_axis, y=y_axis, ax=ax, color='#E88989')
+        means = self.group_means(x_axis, y_axis)
+        if means is not None:
+            ax.bar(means.index.astype(str), means.to_numpy(), color='#E88989')
+        else:
+            sns.barplot(data=self.df, x=x_axis, y=y_axis, ax=ax, color='#E88989')
 
         ax.set_title(f'{x_axis} vs. {y_axis}', fontsize=8)
         ax.set_xlabel(x_axis, fontsize=8)
@@ -267,7 +536,7 @@ class GraphManage:
         fig = Figure(figsize=(5.5, 3.5))
         ax = fig.add_subplot(111)
 
-        sns.scatterplot(data=self.df, x=x_axis, y=y_axis, ax=ax, color='#E694C7')
+        self.scatter_or_density(ax, x_axis, y_axis, '#E694C7')
 
         ax.set_title(f'{x_axis} vs. {y_axis}', fontsize=8)
         ax.set_xlabel(x_axis, fontsize=8)
@@ -284,7 +553,9 @@ class GraphManage:
         Creates a histogram for a selected breed group and attribute,
         aiding in detailed data exploration.
         """
-        filtered_df = self.df[self.df['breed_group'] == selected_group]
+        snapshot = self.store.current()
+        rows = FilterIndex.for_snapshot(snapshot).equals('breed_group', selected_group).rows()
+        filtered_df = snapshot.df.iloc[rows]
         fig = Figure(figsize=(5.5, 3.5))
         ax = fig.add_subplot(111)
         filtered_df.hist(column=selected_attribute, ax=ax, color='#CDC673')
@@ -297,24 +568,65 @@ class GraphManage:
 
         return fig
 
-    def compare_bar(self, breed1, breed2, compare):
+    @staticmethod
+    def breed_positions(snapshot):
+        """
+        Returns the row of every breed name of a snapshot, built once per snapshot.
+        """
+        def build(snapshot):
+            names = snapshot.columns['breed']
+            # Reversed so the first row of a repeated name wins
+            return dict(zip(reversed(names), range(len(names) - 1, -1, -1)))
+        return snapshot.derived('breed_positions', build)
+
+    def gather(self, breeds, columns):
+        """
+        Returns the values of some numeric columns for some breeds as a small
+        (breeds, columns) float block, read in a single indexed gather.
+        """
+        snapshot = self.store.current()
+        positions = self.breed_positions(snapshot)
+        unknown = [breed for breed in breeds if breed not in positions]
+        if unknown:
+            raise ValueError(f'Unknown breeds: {", ".join(unknown)}')
+        rows = np.array([positions[breed] for breed in breeds], dtype=np.int64)
+        block = np.empty((len(rows), len(columns)))
+        for position, column in enumerate(columns):
+            block[:, position] = np.asarray(snapshot.columns[column])[rows]
+        return block
+
+    def breed_info(self, breed, columns):
+        """
+        Returns the values of some columns of a breed in the current data as a
+        dictionary, found through the breed name index.
+        Raises ValueError for an unknown breed.
+        """
+        snapshot = self.store.current()
+        row = self.breed_positions(snapshot).get(breed)
+        if row is None:
+            raise ValueError(f'Unknown breeds: {breed}')
+        return {column: snapshot.columns[column][row] for column in columns}
+
+    def compare_bar(self, breeds, compare):
         """
         Creates a comparison bar graph showing characteristics
-        of two selected dog breeds side by side.
+        of selected dog breeds side by side.
         """
-        breed1_data = [self.df.loc[self.df['breed'] == breed1, comp].iloc[0] for comp in compare]
-        breed2_data = [self.df.loc[self.df['breed'] == breed2, comp].iloc[0] for comp in compare]
+        block = self.gather(breeds, compare)
 
         fig = Figure(figsize=(5.5, 3.7))
         ax = fig.add_subplot(111)
         x_axis = np.arange(len(compare))
-        ax.bar(x_axis - 0.2, breed1_data, 0.4, label=breed1, color='#D1E1A4')
-        ax.bar(x_axis + 0.2, breed2_data, 0.4, label=breed2, color='#6DCDBC')
+        width = 0.8 / max(len(breeds), 1)
+        for position, breed in enumerate(breeds):
+            offset = (position - (len(breeds) - 1) / 2) * width
+            ax.bar(x_axis + offset, block[position], width, label=breed,
+                   color=self.COMPARE_COLORS[position % len(self.COMPARE_COLORS)])
 
         ax.set_xlabel('Characteristics', fontsize=8)
         ax.set_ylabel('Scores', fontsize=8)
         ax.set_title('Comparison of Dog Breed Characteristics', fontsize=9.5)
-        ax.legend(fontsize=8)
+        ax.legend(fontsize=8 if len(breeds) <= 3 else 6)
         ax.set_xticks(x_axis)
         ax.set_yticks([0, 1, 2, 3, 4, 5])
         ax.set_xticklabels(compare, rotation=45)
@@ -322,3 +634,31 @@ class GraphManage:
         fig.tight_layout(pad=1.5)
 
         return fig
+
+    def compare_multiples(self, breeds, compare):
+        """
+        Creates one small bar graph per breed with the same axes,
+        for comparing more breeds than grouped bars can show.
+        """
+        block = self.gather(breeds, compare)
+        columns = min(len(breeds), 5)
+        rows = -(-len(breeds) // columns)
+
+        fig = Figure(figsize=(5.5, 3.7))
+        axes = fig.subplots(rows, columns, sharex=True, sharey=True, squeeze=False)
+        y_axis = np.arange(len(compare))
+        for position, ax in enumerate(axes.flat):
+            if position >= len(breeds):
+                ax.set_visible(False)
+                continue
+            ax.barh(y_axis, block[position],
+                    color=self.COMPARE_COLORS[position % len(self.COMPARE_COLORS)])
+            ax.set_title(breeds[position], fontsize=7)
+            ax.set_xlim(0, 5)
+            ax.set_yticks(y_axis)
+            ax.set_yticklabels(compare, fontsize=6)
+            ax.tick_params(axis='x', which='major', labelsize=6)
+        fig.suptitle('Comparison of Dog Breed Characteristics', fontsize=9.5)
+        fig.tight_layout(pad=1)
+
+        return fig
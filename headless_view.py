@@ -0,0 +1,450 @@
+"""
+Module for running the Puppy Picker without a window
+"""
+
+from chart_renderer import rasterize
+from chart_export import COMPARE_LIST
+from view import PuppyPickerView
+
+
+class HeadlessVariable:
+    """
+    Stand-in for a Tk variable or a combobox.
+    """
+    def __init__(self, value=''):
+        """
+        Initializes the variable with a value.
+        """
+        self.value = value
+
+    def get(self):
+        """
+        Returns the value.
+        """
+        return self.value
+
+    def set(self, value):
+        """
+        Replaces the value.
+        """
+        self.value = value
+
+
+class HeadlessEntry:
+    """
+    Stand-in for a Tk entry.
+    """
+    def __init__(self):
+        """
+        Initializes an empty entry.
+        """
+        self.value = ''
+
+    def get(self):
+        """
+        Returns the text of the entry.
+        """
+        return self.value
+
+    def delete(self, first, last=None):
+        """
+        Clears the entry, the only deletion the view makes.
+        """
+        self.value = ''
+
+    def insert(self, index, text):
+        """
+        Inserts text at a position.
+        """
+        self.value = self.value[:index] + text + self.value[index:]
+
+
+class ImmediateRenderer:
+    """
+    Renders graphs right away on the calling thread with the Agg renderer,
+    with the same interface as ChartRenderer.
+    """
+    def request(self, slot, on_ready, build, *args, size=None, on_error=None,
+                debounce=True, parallel=False):
+        """
+        Builds, rasterizes and delivers a graph before returning.
+        """
+        try:
+            image = rasterize(build(*args), size)
+        except Exception as error:  # pylint: disable=broad-except
+            if on_error is None:
+                raise
+            on_error(error)
+        else:
+            on_ready(image)
+
+    def cancel(self, slot=None):
+        """
+        Nothing is ever pending.
+        """
+
+    def idle(self):
+        """
+        Returns True, graphs are delivered before request returns.
+        """
+        return True
+
+    def shutdown(self):
+        """
+        Nothing to stop, there are no workers.
+        """
+
+
+class HeadlessView:
+    """
+    Stand-in for PuppyPickerView that keeps the state of the window without
+    creating one, so the controller can run in automated tests and load runs.
+
+    Every page does the same data work as the real one and renders its graphs
+    off-screen; the last image of every graph slot is kept in charts and the
+    messages the user would see are kept in errors.
+    """
+    def __init__(self, controller):
+        """
+        Initializes the view stand-in.
+        :param controller: The PuppyPickerController driving this view.
+        """
+        self.controller = controller
+        self.graph_manage = controller.graph_manage
+        self.chart_renderer = ImmediateRenderer()
+        self.charts = {}
+        self.errors = []
+        self.similar_text = ''
+        self.page = 'welcome'
+        self.descriptive_stat = None
+        self.breed_list = []
+        self.breed_info = {}
+        # Find Matching Breed
+        self.page_find_breeds = 0
+        self.selected_story_combo = HeadlessVariable()
+        self.selected_size = HeadlessVariable()
+        self.entry_adapt = HeadlessEntry()
+        self.entry_friendly = HeadlessEntry()
+        self.entry_health = HeadlessEntry()
+        self.entry_train = HeadlessEntry()
+        self.entry_exercise = HeadlessEntry()
+        self.entry_life = HeadlessEntry()
+        self.live_weights = []
+        self.live_ranking = ([], [])
+        self.skyline = []
+        # Statistical Information
+        self.selected_breed_combo = HeadlessVariable()
+        self.selected_gender_combo = HeadlessVariable()
+        # Data exploration
+        self.explore_page = 0
+        self.selected1_explore = HeadlessVariable()
+        self.selected2_explore = HeadlessVariable()
+        # Characteristic Comparison
+        self.selected1_breed_compare = HeadlessVariable()
+        self.selected2_breed_compare = HeadlessVariable()
+        self.combobox_breed_cp1 = self.selected1_breed_compare
+        self.combobox_breed_cp2 = self.selected2_breed_compare
+        self.compare_breeds = []
+        self.shortlist = []
+
+    def show_chart(self, slot, master, build, *args, size=None, parallel=False, **pack_options):
+        """
+        Renders a graph off-screen and keeps the image of its slot.
+        """
+        self.chart_renderer.request(slot, lambda image: self.charts.__setitem__(slot, image),
+                                    build, *args, size=size)
+
+    def clear_right_frame(self):
+        """
+        Forgets the graphs of the previous page.
+        """
+        self.chart_renderer.cancel()
+        self.charts.clear()
+
+    def update(self):
+        """
+        No events to process without a window.
+        """
+
+    # Find Matching Breeds
+    def find_breeds_page1(self):
+        """
+        First page of "Find Matching Breeds".
+        """
+        self.page = 'find_breeds'
+        self.page_find_breeds = 1
+        self.clear_right_frame()
+
+    def find_breeds_page2(self, data):
+        """
+        Storytelling page with its four graphs.
+        """
+        self.page_find_breeds = 2
+        self.clear_right_frame()
+        self.descriptive_stat = data
+        self.selected_story_combo.set('Select Histogram')
+        self.show_chart('story_hist', None, self.graph_manage.create_histogram,
+                        'max_life_expectancy', 'small', size=(240, 210), parallel=True)
+        self.show_chart('story_bar', None, self.graph_manage.story_bar, parallel=True)
+        self.show_chart('story_scatter', None, self.graph_manage.story_scatter, parallel=True)
+        self.show_chart('story_heatmap', None, self.graph_manage.story_heatmap, parallel=True)
+
+    def update_hist(self, selected_var):
+        """
+        Updates the storytelling histogram.
+        """
+        self.show_chart('story_hist', None, self.graph_manage.create_histogram,
+                        selected_var, 'small', size=(240, 210))
+
+    def find_breeds_page3(self):
+        """
+        Preference page with empty entries.
+        """
+        self.clear_right_frame()
+        self.page_find_breeds = 3
+        for entry in [self.entry_adapt, self.entry_friendly, self.entry_health,
+                      self.entry_train, self.entry_exercise, self.entry_life]:
+            entry.delete(0, 'end')
+        self.selected_size.set('Select')
+
+    def live_ranking_page(self):
+        """
+        Live mode with every slider at 1 and all sizes.
+        """
+        self.clear_right_frame()
+        self.page_find_breeds = 'live'
+        self.live_weights = [HeadlessVariable(1.0) for _ in PuppyPickerView.LIVE_TRAITS]
+        self.selected_size.set('all')
+
+    def schedule_live_update(self, _value=None):
+        """
+        Re-ranks right away, there are no frames to wait for.
+        """
+        self.controller.live_weights_handler()
+
+    def get_live_weights(self):
+        """
+        Returns the weight of every slider.
+        """
+        return [weight.get() for weight in self.live_weights]
+
+    def show_live_ranking(self, name_list, score_list):
+        """
+        Keeps the best matches of the live mode.
+        """
+        self.live_ranking = (list(name_list), list(score_list))
+
+    def skyline_page(self, name_list):
+        """
+        Breeds with the best trade-offs.
+        """
+        self.clear_right_frame()
+        self.page_find_breeds = 'skyline'
+        self.skyline = list(name_list)
+        self.selected_breed_combo.set('Select')
+
+    def find_breeds_page4(self, name_list, score_list):
+        """
+        Matching breeds and their score graph.
+        """
+        self.clear_right_frame()
+        self.page_find_breeds = 4
+        self.shortlist = list(name_list)
+        if name_list:
+            self.show_chart('score', None, self.graph_manage.score_bar, name_list, score_list,
+                            parallel=True)
+        self.selected_breed_combo.set('Select')
+
+    def get_user_prefer(self):
+        """
+        Returns the user's preferences from the entries.
+        """
+        return [self.entry_adapt.get(), self.entry_friendly.get(), self.entry_health.get(),
+                self.entry_train.get(), self.entry_exercise.get(), self.entry_life.get(),
+                self.selected_size.get()]
+
+    # Statistical Information
+    def statistical_page(self):
+        """
+        Breed selection of "Statistical Information".
+        """
+        self.page = 'statistical'
+        self.clear_right_frame()
+        self.breed_list = self.controller.suggest_breeds()
+        self.selected_breed_combo.set('Select')
+
+    def dog_info_page(self):
+        """
+        Information and graphs of the selected breed.
+        """
+        self.clear_right_frame()
+        breed = self.selected_breed_combo.get()
+        self.breed_info = self.graph_manage.breed_info(
+            breed, ['breed_group', 'size_category', 'min_life_expectancy', 'max_life_expectancy'])
+        self.selected_gender_combo.set('Select Gender')
+        self.show_chart('gender', None, self.graph_manage.male_bar, breed, parallel=True)
+        self.show_chart('char_bar', None, self.graph_manage.char_bar, breed, parallel=True)
+
+    def draw_male_graph(self, breed):
+        """
+        Height and weight graph of the males of a breed.
+        """
+        self.show_chart('gender', None, self.graph_manage.male_bar, breed)
+
+    def draw_female_graph(self, breed):
+        """
+        Height and weight graph of the females of a breed.
+        """
+        self.show_chart('gender', None, self.graph_manage.female_bar, breed)
+
+    # Data Exploration
+    def data_exploration_page(self):
+        """
+        Data exploration page, starting with the bar graph.
+        """
+        self.clear_right_frame()
+        self.explore_bar_page()
+
+    def explore_bar_page(self):
+        """
+        Bar graph exploration with its default graph.
+        """
+        self.explore_page = 'bar'
+        self.selected1_explore.set('Select Attribute (x)')
+        self.selected2_explore.set('Select Attribute (y)')
+        self.show_chart('explore', None, self.graph_manage.explore_bar,
+                        'breed_group', 'adaptability')
+
+    def explore_scatter_page(self):
+        """
+        Scatter plot exploration with its default graph.
+        """
+        self.explore_page = 'scatter'
+        self.selected1_explore.set('Select Attribute (x)')
+        self.selected2_explore.set('Select Attribute (y)')
+        self.show_chart('explore', None, self.graph_manage.explore_scatter,
+                        'max_height_male', 'average_lifespan')
+
+    def explore_hist_page(self):
+        """
+        Histogram exploration with its default graph.
+        """
+        self.explore_page = 'histogram'
+        self.selected1_explore.set('Select Group')
+        self.selected2_explore.set('Select Attribute')
+        self.show_chart('explore', None, self.graph_manage.create_histogram,
+                        'max_height_male', 'big')
+
+    def explore_corr_page(self):
+        """
+        Correlation exploration with its default heatmap.
+        """
+        self.explore_page = 'correlation'
+        self.selected1_explore.set('Select Method')
+        self.selected2_explore.set('Select Attributes')
+        self.show_chart('explore', None, self.graph_manage.explore_correlation,
+                        'pearson', 'characteristics')
+
+    def draw_explore_corr(self):
+        """
+        Correlation heatmap of the selected options.
+        """
+        self.show_chart('explore', None, self.graph_manage.explore_correlation,
+                        self.selected1_explore.get(), self.selected2_explore.get())
+
+    def draw_explore_bar(self):
+        """
+        Bar graph of the selected attributes.
+        """
+        self.show_chart('explore', None, self.graph_manage.explore_bar,
+                        self.selected1_explore.get(), self.selected2_explore.get())
+
+    def draw_explore_scatter(self):
+        """
+        Scatter plot of the selected attributes.
+        """
+        self.show_chart('explore', None, self.graph_manage.explore_scatter,
+                        self.selected1_explore.get(), self.selected2_explore.get())
+
+    def draw_explore_hist(self):
+        """
+        Histogram of the selected group and attribute.
+        """
+        if self.selected1_explore.get() == 'all':
+            self.show_chart('explore', None, self.graph_manage.create_histogram,
+                            self.selected2_explore.get(), 'big')
+        else:
+            self.show_chart('explore', None, self.graph_manage.explore_breed_group_histgram,
+                            self.selected1_explore.get(), self.selected2_explore.get())
+
+    # Characteristic Comparison
+    def comparison_page(self, breeds=None):
+        """
+        Comparison page with the given breeds or its default graph.
+        """
+        self.page = 'comparison'
+        self.clear_right_frame()
+        self.similar_text = ''
+        self.breed_list = self.controller.suggest_breeds()
+        self.selected1_breed_compare.set('Select Dog Breed')
+        self.selected2_breed_compare.set('Select Dog Breed')
+        self.compare_breeds = []
+        if breeds:
+            self.selected1_breed_compare.set(breeds[0])
+            for breed in breeds[1:]:
+                self.add_compare_breed(breed)
+            self.draw_compare_graph(list(breeds))
+        else:
+            # Default graph of the first two breeds of the open catalog
+            defaults = self.controller.suggest_breeds()[:2]
+            if defaults:
+                self.draw_compare_graph(defaults)
+
+    def add_compare_breed(self, breed):
+        """
+        Adds a breed to the comparison.
+        """
+        if breed not in self.compare_breeds and breed != self.selected1_breed_compare.get():
+            self.compare_breeds.append(breed)
+        self.selected2_breed_compare.set('Select Dog Breed')
+
+    def draw_compare_graph(self, breeds):
+        """
+        Comparison graph of the selected breeds.
+        """
+        if len(breeds) <= PuppyPickerView.GROUPED_COMPARE_BREEDS:
+            build = self.graph_manage.compare_bar
+        else:
+            build = self.graph_manage.compare_multiples
+        self.show_chart('compare', None, build, breeds, COMPARE_LIST)
+
+    def show_breed_suggestions(self, combobox, names):
+        """
+        Keeps the breeds offered for the typed text.
+        """
+        self.breed_list = list(names)
+
+    def show_similar_breeds(self, breed, similar_breeds):
+        """
+        Keeps the similar breeds and preselects the closest one.
+        """
+        self.similar_text = f'Most similar to {breed}: {", ".join(similar_breeds)}'
+        if similar_breeds and self.selected2_breed_compare.get() == 'Select Dog Breed':
+            self.combobox_breed_cp2.set(similar_breeds[0])
+
+    def report_error(self, inform_text):
+        """
+        Keeps an error message the user would see.
+        """
+        self.errors.append(inform_text)
+
+    def destroy(self):
+        """
+        Stops the renderer.
+        """
+        self.chart_renderer.shutdown()
+
+    def run(self):
+        """
+        Nothing to run without a window.
+        """
@@ -0,0 +1,340 @@
+"""
+Module for loading large breed CSV files in chunks in the Puppy Picker
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from graph_manage import GraphManage
+from sketches import ColumnSketch
+
+
+class RunningStats:
+    """
+    Count, mean, variance, minimum and maximum of a column, updated one chunk at a time.
+    """
+    def __init__(self):
+        """
+        Initializes the statistics of an empty column.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def update(self, values):
+        """
+        Adds the non-missing values of a chunk.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.squares += float(np.dot(values, values))
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    def merge(self, other):
+        """
+        Adds the values seen by another RunningStats.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def mean(self):
+        """
+        Mean of the values, NaN when there is none.
+        """
+        return self.total / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        """
+        Sample standard deviation of the values, NaN with fewer than two.
+        """
+        if self.count < 2:
+            return np.nan
+        variance = (self.squares - self.total * self.total / self.count) / (self.count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+
+class StreamingHistogram:
+    """
+    Histogram counts over fixed bin edges, values outside the edges fall in the outer bins.
+    """
+    def __init__(self, edges):
+        """
+        Initializes empty counts.
+        :param edges: Increasing bin edges.
+        """
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    def update(self, values):
+        """
+        Counts the non-missing values of a chunk.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = np.clip(values[~np.isnan(values)], self.edges[0], self.edges[-1])
+        self.counts += np.histogram(values, bins=self.edges)[0]
+
+    def merge(self, other):
+        """
+        Adds the counts of another histogram with the same edges.
+        """
+        self.counts += other.counts
+
+
+class GroupAggregates:
+    """
+    Row count, and sum and count of present values of numeric columns, for
+    every value of a categorical column.
+    """
+    def __init__(self, group_column, columns):
+        """
+        Initializes empty aggregates.
+        :param group_column: Categorical column the rows are grouped by.
+        :param columns: Numeric columns summed per group.
+        """
+        self.group_column = group_column
+        self.columns = list(columns)
+        self.counts = {}
+        self.sums = {}
+        self.present = {}
+
+    def update(self, chunk):
+        """
+        Adds the rows of a chunk.
+        """
+        grouped = chunk.groupby(chunk[self.group_column].astype(object),
+                                observed=True)[self.columns]
+        for group, sums in grouped.sum(min_count=0).iterrows():
+            self.sums[group] = self.sums.get(group, 0) + sums.to_numpy(dtype=np.float64)
+        for group, present in grouped.count().iterrows():
+            self.present[group] = self.present.get(group, 0) + present.to_numpy(dtype=np.int64)
+        for group, count in grouped.size().items():
+            self.counts[group] = self.counts.get(group, 0) + int(count)
+
+    def means(self):
+        """
+        Returns the mean of the present values of every column per group as a DataFrame.
+        """
+        groups = sorted(self.counts, key=str)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rows = [self.sums[group] / self.present[group] for group in groups]
+        return pd.DataFrame(rows, index=pd.Index(groups, name=self.group_column),
+                            columns=self.columns)
+
+
+class ColumnStore:
+    """
+    Appends chunks of breed data column by column in compact types.
+
+    Scores are kept as int8 until a chunk holds a value int8 cannot represent,
+    then the column moves to float32. Measurements are float32, categorical
+    columns are small integer codes and breed names are interned strings,
+    the same types as GraphManage.compact_types.
+    """
+    def __init__(self):
+        """
+        Initializes an empty store.
+        """
+        self.chunks = {}
+        self.categories = {}
+        self.ordered = {}
+        self.rows = 0
+
+    def append(self, chunk):
+        """
+        Adds the rows of a chunk with derived columns.
+        """
+        for column in chunk.columns:
+            values = chunk[column]
+            if column in GraphManage.SCORE_COLUMNS:
+                stored = self._score_values(column, values)
+            elif column in GraphManage.MEASUREMENT_COLUMNS:
+                stored = values.to_numpy(dtype=np.float32)
+            elif column in GraphManage.CATEGORY_COLUMNS:
+                stored = self._category_codes(column, values)
+            elif column in GraphManage.NAME_COLUMNS:
+                stored = np.array([sys.intern(name) if isinstance(name, str) else name
+                                   for name in values], dtype=object)
+            else:
+                stored = values.to_numpy()
+            self.chunks.setdefault(column, []).append(stored)
+        self.rows += len(chunk)
+
+    def _score_values(self, column, values):
+        """
+        Returns the values of a score column as int8, or float32 once a value does not fit.
+        """
+        previous = self.chunks.get(column)
+        if (previous is None or previous[0].dtype == np.int8) and values.notna().all() \
+                and (values == values.round()).all() and values.between(-128, 127).all():
+            return values.to_numpy(dtype=np.int8)
+        if previous and previous[0].dtype == np.int8:
+            self.chunks[column] = [part.astype(np.float32) for part in previous]
+        return values.to_numpy(dtype=np.float32)
+
+    def _category_codes(self, column, values):
+        """
+        Returns the codes of a categorical column, adding the new categories.
+        """
+        if column not in self.categories:
+            self.categories[column] = {}
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                for category in values.cat.categories:
+                    self.categories[column][category] = len(self.categories[column])
+                self.ordered[column] = values.cat.ordered
+        known = self.categories[column]
+        values = values.astype(object)
+        for category in pd.unique(values[values.notna()]):
+            known.setdefault(category, len(known))
+        codes = values.map(known).fillna(-1).to_numpy()
+        return codes.astype(np.int8 if len(known) < 128 else np.int32)
+
+    def to_frame(self):
+        """
+        Returns the stored rows as a DataFrame, releasing the chunks one column at a time.
+        """
+        columns = {}
+        for column in list(self.chunks):
+            values = np.concatenate(self.chunks.pop(column))
+            if column in self.categories:
+                categories = list(self.categories[column])
+                if not self.ordered.get(column, False):
+                    # Same category order as astype('category') on the whole file
+                    order = sorted(range(len(categories)), key=lambda code: categories[code])
+                    remap = np.empty(len(categories) + 1, dtype=values.dtype)
+                    remap[np.array(order, dtype=np.int64)] = np.arange(len(order))
+                    remap[-1] = -1
+                    values = remap[values]
+                    categories = [categories[code] for code in order]
+                values = pd.Categorical.from_codes(
+                    values, dtype=pd.CategoricalDtype(categories, self.ordered.get(column, False)))
+            columns[column] = values
+        return pd.DataFrame(columns, copy=False)
+
+
+class IngestSummary:
+    """
+    Column statistics, histograms, quantile and frequency sketches and group
+    aggregates of breed data, updated one chunk at a time while it is loaded.
+
+    The summary is kept with the snapshot of the loaded data, so graphs and
+    statistics of large catalogs are served from it without another pass over
+    the rows. Snapshots made by later updates do not have it.
+    """
+    KEY = 'ingest_summary'
+
+    # Fixed bin edges of the histograms kept while loading
+    HISTOGRAM_EDGES = {
+        'average_lifespan': np.arange(0, 31, 1),
+        'max_life_expectancy': np.arange(0, 31, 1),
+        'max_height_male': np.arange(0, 42, 2),
+        'max_height_female': np.arange(0, 42, 2),
+        'max_weight_male': np.arange(0, 260, 10),
+        'max_weight_female': np.arange(0, 260, 10),
+        'average_size': np.arange(0, 105, 5),
+    }
+    GROUP_COLUMNS = ['breed_group', 'size_category']
+
+    def __init__(self):
+        """
+        Initializes an empty summary.
+        """
+        self.stats = {}
+        self.sketches = {}
+        self.histograms = {column: StreamingHistogram(edges)
+                           for column, edges in self.HISTOGRAM_EDGES.items()}
+        self.groups = {}
+        self.chunk_count = 0
+        self.rows = 0
+
+    def update(self, chunk):
+        """
+        Updates the statistics, histograms, sketches and group aggregates with a chunk.
+        """
+        numeric = [column for column in chunk.columns
+                   if pd.api.types.is_numeric_dtype(chunk[column].dtype)
+                   and not isinstance(chunk[column].dtype, pd.CategoricalDtype)]
+        for column in numeric:
+            self.stats.setdefault(column, RunningStats()).update(chunk[column].to_numpy())
+            self.sketches.setdefault(column, ColumnSketch()).update(chunk[column].to_numpy())
+        for column, histogram in self.histograms.items():
+            if column in chunk:
+                histogram.update(chunk[column].to_numpy())
+        for column in self.GROUP_COLUMNS:
+            if column in chunk:
+                self.groups.setdefault(column, GroupAggregates(column, numeric)).update(chunk)
+        self.chunk_count += 1
+        self.rows += len(chunk)
+
+    def attach(self, snapshot):
+        """
+        Keeps the summary with the snapshot of the data it summarizes.
+        """
+        snapshot.derived(self.KEY, lambda _: self)
+
+    @classmethod
+    def of(cls, snapshot):
+        """
+        Returns the summary kept with a snapshot, None if the snapshot was not
+        loaded with one or was made by an update.
+        """
+        return snapshot.cached(cls.KEY)
+
+
+class StreamingLoader:
+    """
+    Loads a breed CSV file one chunk of rows at a time.
+
+    Derived columns are computed per chunk and the chunk is appended to a
+    ColumnStore, so memory holds the compact data plus a single chunk in the
+    CSV's own types, whatever the size of the file. An IngestSummary is
+    updated with every chunk, and an optional CorrelationService is fed the
+    chunks as they arrive.
+    """
+    CHUNK_ROWS = 100000
+
+    def __init__(self, filepath, chunk_rows=None, correlation=None):
+        """
+        Initializes the loader.
+        :param filepath: Path of the CSV file.
+        :param chunk_rows: Number of rows read at once.
+        :param correlation: Optional CorrelationService receiving the rows as they are read.
+        """
+        self.filepath = filepath
+        self.chunk_rows = chunk_rows or self.CHUNK_ROWS
+        self.correlation = correlation
+        self.summary = IngestSummary()
+
+    def load(self):
+        """
+        Reads the whole file and returns the breed data in compact types.
+        The summary attribute then holds the statistics of the data.
+        """
+        store = ColumnStore()
+        for chunk in pd.read_csv(self.filepath, chunksize=self.chunk_rows):
+            chunk = GraphManage.derive_columns(chunk)
+            self.update(chunk)
+            store.append(chunk)
+        df = store.to_frame()
+        if self.correlation is not None:
+            self.correlation.replace_data(df)
+        return df
+
+    def update(self, chunk):
+        """
+        Updates the summary and the correlations with a chunk.
+        """
+        self.summary.update(chunk)
+        if self.correlation is not None:
+            self.correlation.add_rows(chunk)
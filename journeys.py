@@ -0,0 +1,223 @@
+"""
+Module for the scripted user journeys that exercise the Puppy Picker
+"""
+
+import random
+from types import SimpleNamespace
+
+
+STORY_HISTOGRAMS = ['max_life_expectancy', 'max_height_male', 'max_height_female',
+                    'max_weight_male', 'max_weight_female']
+
+SIZES = ['all', 'small', 'medium', 'big']
+
+# Explore page, its x choices and its y choices
+EXPLORE_PAGES = [
+    ('explore_bar_page', ['breed_group', 'size_category'],
+     ['adaptability', 'all_around_friendliness', 'health_grooming', 'trainability',
+      'exercise_needs', 'average_lifespan']),
+    ('explore_scatter_page', ['max_height_male', 'max_height_female', 'max_weight_male',
+                              'max_weight_female', 'average_lifespan', 'average_size'],
+     ['max_height_male', 'max_height_female', 'max_weight_male',
+      'max_weight_female', 'average_lifespan', 'average_size']),
+    ('explore_hist_page', ['all', 'Sporting Dogs', 'Hound Dogs', 'Working Dogs',
+                           'Companion Dogs', 'Herding Dogs', 'Terrier Dogs'],
+     ['max_height_male', 'max_weight_female', 'average_lifespan', 'adaptability',
+      'trainability', 'exercise_needs']),
+    ('explore_corr_page', ['pearson', 'spearman'],
+     ['all', 'characteristics', 'measurements', 'lifespan']),
+]
+
+
+def set_entry(entry, value):
+    """
+    Types a value in an entry, replacing its content.
+    """
+    entry.delete(0, 'end')
+    entry.insert(0, value)
+
+
+def selected(variable, value, action):
+    """
+    Returns a step action that selects a value in a combobox before acting.
+    """
+    def run():
+        variable.set(value)
+        action()
+    return run
+
+
+def find_matching_breeds(controller, rng):
+    """
+    Pages 1 to 4 of "Find Matching Breeds", then the information of a breed.
+    Yields (step name, action) pairs.
+    """
+    view = controller.view
+    yield 'find_breeds_page1', view.find_breeds_page1
+    yield 'next_button_handler', lambda: controller.next_button_handler(1)
+    yield 'story_combobox_handler', selected(view.selected_story_combo,
+                                             rng.choice(STORY_HISTOGRAMS),
+                                             lambda: controller.story_combobox_handler(None))
+    yield 'next_button_handler', lambda: controller.next_button_handler(2)
+
+    def fill_preferences():
+        for entry in [view.entry_adapt, view.entry_friendly, view.entry_health,
+                      view.entry_train, view.entry_exercise, view.entry_life]:
+            set_entry(entry, str(rng.randint(0, 3)))
+        view.selected_size.set(rng.choice(SIZES))
+        controller.next_button_handler(3)
+    yield 'next_button_handler', fill_preferences
+    yield 'next_button_handler', selected(view.selected_breed_combo, random_breed(controller, rng),
+                                          lambda: controller.next_button_handler(4))
+    for gender in ['Female', 'Male']:
+        yield 'gender_combobox_handler', selected(
+            view.selected_gender_combo, gender, lambda: controller.gender_combobox_handler(None))
+
+
+def breed_information(controller, rng):
+    """
+    Information of a breed from the "Statistical Information" menu with a gender switch.
+    """
+    view = controller.view
+    yield 'statistical_page', view.statistical_page
+    breed = random_breed(controller, rng)
+
+    def type_breed():
+        # Every keystroke of a few letters of the breed asks for suggestions
+        for stop in range(1, min(len(breed), 5) + 1):
+            view.selected_breed_combo.set(breed[:stop].lower())
+            controller.breed_search_handler(SimpleNamespace(widget=view.selected_breed_combo,
+                                                            keysym=breed[stop - 1]))
+    yield 'breed_search_handler', type_breed
+    yield 'show_info_handler', selected(view.selected_breed_combo, breed.lower(),
+                                        controller.show_info_handler)
+    for gender in rng.sample(['Male', 'Female'], 2):
+        yield 'gender_combobox_handler', selected(
+            view.selected_gender_combo, gender, lambda: controller.gender_combobox_handler(None))
+
+
+def data_exploration(controller, rng):
+    """
+    Every graph type of the data exploration page with random attributes.
+    """
+    view = controller.view
+    yield 'statistical_page', view.statistical_page
+    yield 'data_exploration_page', view.data_exploration_page
+    for page, first_choices, second_choices in EXPLORE_PAGES:
+        yield page, getattr(view, page)
+
+        def show_graph(first=rng.choice(first_choices), second=rng.choice(second_choices)):
+            view.selected1_explore.set(first)
+            view.selected2_explore.set(second)
+            controller.ex_show_graph_handler()
+        yield 'ex_show_graph_handler', show_graph
+
+
+def comparison(controller, rng):
+    """
+    Comparison of a breed with its most similar breed, then with a random one.
+    """
+    view = controller.view
+    yield 'comparison_page', view.comparison_page
+    yield 'compare_combobox_handler', selected(view.selected1_breed_compare,
+                                               random_breed(controller, rng),
+                                               lambda: controller.compare_combobox_handler(None))
+    yield 'show_compare_handler', controller.show_compare_handler
+    yield 'show_compare_handler', selected(view.selected2_breed_compare,
+                                           random_breed(controller, rng),
+                                           controller.show_compare_handler)
+    for _ in range(rng.randint(1, 4)):
+        yield 'add_compare_breed_handler', selected(view.selected2_breed_compare,
+                                                    random_breed(controller, rng),
+                                                    controller.add_compare_breed_handler)
+    yield 'show_compare_handler', controller.show_compare_handler
+
+
+def shortlist_comparison(controller, rng):
+    """
+    Matching breeds for random preferences, then the comparison of all of them.
+    """
+    view = controller.view
+    yield 'find_breeds_page1', view.find_breeds_page1
+    yield 'next_button_handler', lambda: controller.next_button_handler(1)
+    yield 'next_button_handler', lambda: controller.next_button_handler(2)
+
+    def fill_preferences():
+        for entry in [view.entry_adapt, view.entry_friendly, view.entry_health,
+                      view.entry_train, view.entry_exercise, view.entry_life]:
+            set_entry(entry, str(rng.randint(0, 3)))
+        view.selected_size.set(rng.choice(SIZES))
+        controller.next_button_handler(3)
+    yield 'next_button_handler', fill_preferences
+    yield 'compare_shortlist_handler', controller.compare_shortlist_handler
+
+
+def trade_offs(controller, rng):
+    """
+    Best trade-offs for random preferences, then the information of one of them.
+    """
+    view = controller.view
+    yield 'find_breeds_page1', view.find_breeds_page1
+    yield 'next_button_handler', lambda: controller.next_button_handler(1)
+    yield 'next_button_handler', lambda: controller.next_button_handler(2)
+
+    def fill_preferences():
+        for entry in [view.entry_adapt, view.entry_friendly, view.entry_health,
+                      view.entry_train, view.entry_exercise, view.entry_life]:
+            set_entry(entry, str(rng.randint(1, 3)))
+        view.selected_size.set(rng.choice(SIZES))
+        controller.skyline_handler()
+    yield 'skyline_handler', fill_preferences
+    yield 'show_info_handler', lambda: selected(view.selected_breed_combo,
+                                                rng.choice(view.skyline),
+                                                controller.show_info_handler)()
+
+
+def live_ranking(controller, rng):
+    """
+    Live mode of page 3: a few slider drags of small steps, a size change,
+    then the matches of the final sliders.
+    """
+    view = controller.view
+    yield 'find_breeds_page1', view.find_breeds_page1
+    yield 'next_button_handler', lambda: controller.next_button_handler(1)
+    yield 'next_button_handler', lambda: controller.next_button_handler(2)
+    yield 'live_mode_handler', controller.live_mode_handler
+    for _ in range(rng.randint(1, 3)):
+        def drag(slider=rng.randrange(len(view.live_weights)), target=rng.uniform(0, 3)):
+            weight = view.live_weights[slider]
+            for step in range(1, 11):
+                weight.set(weight.get() + (target - weight.get()) * step / 10)
+                view.schedule_live_update()
+        yield 'live_weights_handler', drag
+    yield 'live_size_handler', selected(view.selected_size, rng.choice(SIZES),
+                                        lambda: controller.live_size_handler(None))
+    yield 'next_button_handler', lambda: controller.next_button_handler('live')
+
+
+def random_breed(controller, rng):
+    """
+    Returns a random breed name of the model's data.
+    """
+    breeds = controller.model.df['breed']
+    return breeds.iloc[rng.randrange(len(breeds))]
+
+
+JOURNEYS = {'find_matching_breeds': find_matching_breeds,
+            'breed_information': breed_information,
+            'data_exploration': data_exploration,
+            'comparison': comparison,
+            'shortlist_comparison': shortlist_comparison,
+            'live_ranking': live_ranking,
+            'trade_offs': trade_offs}
+
+
+def journey_cycle(seed=0, names=None):
+    """
+    Yields journey names forever, every journey in turn in a random order per round.
+    """
+    rng = random.Random(seed)
+    names = list(JOURNEYS) if names is None else list(names)
+    while True:
+        rng.shuffle(names)
+        yield from names
@@ -0,0 +1,179 @@
+"""
+Module for recommending the breeds closest to an ideal profile in the Puppy Picker
+"""
+
+import heapq
+import threading
+import numpy as np
+
+
+class KDTree:
+    """
+    KD-tree over the rows of a matrix, stored in flat numpy arrays.
+
+    Every node keeps the bounding box of its points, so a query visits nodes
+    in order of their smallest possible distance and stops as soon as no node
+    can hold a closer point than the k found so far.
+    """
+    LEAF_SIZE = 256
+
+    def __init__(self, points, ids):
+        """
+        Builds the tree.
+        :param points: (n, d) float matrix.
+        :param ids: Row number of every point in the original data.
+        """
+        self.points = np.ascontiguousarray(points)
+        self.ids = np.asarray(ids)
+        self.lower = []
+        self.upper = []
+        self.children = []
+        self.ranges = []
+        if len(self.points):
+            self._build(0, len(self.points))
+        self.lower = np.array(self.lower)
+        self.upper = np.array(self.upper)
+
+    def _build(self, start, stop):
+        """
+        Builds the node holding points start:stop and returns its number.
+        Points are reordered in place so every node covers a contiguous range.
+        """
+        node = len(self.ranges)
+        block = self.points[start:stop]
+        self.lower.append(block.min(axis=0))
+        self.upper.append(block.max(axis=0))
+        self.ranges.append((start, stop))
+        self.children.append(None)
+        if stop - start > self.LEAF_SIZE:
+            dim = int(np.argmax(self.upper[node] - self.lower[node]))
+            middle = (stop - start) // 2
+            order = np.argpartition(block[:, dim], middle)
+            self.points[start:stop] = block[order]
+            self.ids[start:stop] = self.ids[start:stop][order]
+            left = self._build(start, start + middle)
+            right = self._build(start + middle, stop)
+            self.children[node] = [left, right]
+        return node
+
+    def box_distances(self, nodes, target, weights):
+        """
+        Returns the smallest squared distance between the target and the boxes of nodes.
+        """
+        gap = np.maximum(self.lower[nodes] - target, 0) + np.maximum(target - self.upper[nodes], 0)
+        return (gap * gap) @ weights
+
+    def search(self, target, weights, best, k):
+        """
+        Adds the points of the tree closer than the current k best to best,
+        a heap of (-squared distance, id).
+        """
+        if not self.ranges:
+            return
+        candidates = [(float(self.box_distances([0], target, weights)[0]), 0)]
+        while candidates:
+            bound, node = heapq.heappop(candidates)
+            if len(best) == k and bound >= -best[0][0]:
+                break
+            children = self.children[node]
+            if children is not None:
+                for child, distance in zip(children,
+                                           self.box_distances(children, target, weights).tolist()):
+                    heapq.heappush(candidates, (distance, child))
+                continue
+            start, stop = self.ranges[node]
+            diff = self.points[start:stop] - target
+            distances = (diff * diff) @ weights
+            if len(best) == k:
+                # Only points closer than the current k-th best can enter the heap
+                closer = np.flatnonzero(distances < -best[0][0])
+            else:
+                closer = np.arange(stop - start)
+            for distance, row in zip(distances[closer].tolist(),
+                                     self.ids[start + closer].tolist()):
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, row))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, row))
+
+
+class NearestBreeds:
+    """
+    Finds the breeds closest to an ideal profile such as
+    "friendliness 5, exercise 2, about 12 years lifespan, around 30 lb".
+
+    Features are scaled to 0-1 and indexed in one KD-tree per size category,
+    so filtering by size only searches the matching tree. Splitting on features
+    the profile leaves out would make every split useless for the query, so a
+    tree is built over exactly the features of the profile the first time that
+    combination is asked for, and kept for the next queries.
+    """
+    FEATURES = ['adaptability', 'all_around_friendliness', 'health_grooming',
+                'trainability', 'exercise_needs', 'average_lifespan', 'average_weight']
+    WEIGHT_COLUMNS = ['min_weight_male', 'max_weight_male',
+                      'min_weight_female', 'max_weight_female']
+    SIZES = ['small', 'medium', 'big']
+    MAX_TREES = 32
+
+    def __init__(self, df):
+        """
+        Builds the index over the breeds of df.
+        """
+        self.breeds = df['breed'].tolist()
+        values = np.column_stack(
+            [df[column].to_numpy(dtype=np.float64) for column in self.FEATURES[:-1]]
+            + [df[self.WEIGHT_COLUMNS].to_numpy(dtype=np.float64).mean(axis=1)])
+        self.low = np.nanmin(values, axis=0)
+        self.spread = np.nanmax(values, axis=0) - self.low
+        self.spread[self.spread == 0] = 1
+        self.features = np.nan_to_num((values - self.low) / self.spread, nan=0.5)
+        sizes = df['size_category'].astype(str).to_numpy()
+        self.rows = {size: np.flatnonzero(sizes == size) for size in self.SIZES}
+        self.rows['all'] = np.arange(len(self.breeds))
+        self.trees = {}
+        self._lock = threading.Lock()
+        self.tree(tuple(range(len(self.FEATURES))), 'all')
+
+    def tree(self, dims, size):
+        """
+        Returns the KD-tree over some feature columns of the breeds of a size.
+        """
+        key = (dims, size)
+        # The index is shared by every reader of the snapshot
+        with self._lock:
+            if key not in self.trees:
+                if len(self.trees) >= self.MAX_TREES:
+                    self.trees.pop(next(iter(self.trees)))
+                rows = self.rows[size]
+                self.trees[key] = KDTree(self.features[np.ix_(rows, dims)], rows.copy())
+            return self.trees[key]
+
+    @classmethod
+    def for_snapshot(cls, snapshot):
+        """
+        Returns the index of a snapshot, built once per snapshot.
+        """
+        return snapshot.derived('nearest_breeds', lambda data: cls(data.df))
+
+    def query(self, target, size='all', k=5):
+        """
+        Returns the k breeds closest to the target profile and their distances.
+        :param target: Dictionary of feature name to ideal value, features left
+            out are ignored. Lifespan is in years and average_weight in pounds.
+        :param size: 'small', 'medium', 'big' or 'all'.
+        """
+        unknown = set(target) - set(self.FEATURES)
+        if unknown:
+            raise ValueError(f'Unknown features: {", ".join(sorted(unknown))}')
+        if size not in self.rows:
+            raise ValueError(f'Unknown size: {size}')
+        dims = tuple(index for index, feature in enumerate(self.FEATURES) if feature in target)
+        if not dims:
+            raise ValueError('The profile needs at least one feature')
+        point = np.array([target[self.FEATURES[index]] for index in dims], dtype=np.float64)
+        point = (point - self.low[list(dims)]) / self.spread[list(dims)]
+        best = []
+        self.tree(dims, size).search(point, np.ones(len(dims)), best, k)
+        best.sort(reverse=True)
+        return [self.breeds[row] for _, row in best], [float(np.sqrt(-distance))
+                                                       for distance, _ in best]
@@ -0,0 +1,91 @@
+"""
+Module for re-ranking breeds while the user drags the preference sliders in the Puppy Picker
+"""
+
+import numpy as np
+from sharded_scoring import top_rows
+
+
+class LiveRanking:
+    """
+    Keeps the best breeds for weights that change one small step at a time.
+
+    A pool of the best rows is kept with their scores. When a weight changes
+    by delta, the pool scores move by delta times that column, which costs
+    one operation per pool row instead of rescoring every breed. The rows
+    outside the pool scored at most `bound` when the pool was built; the
+    weight changes since then can raise them by at most the change times the
+    column's largest (or smallest) value. While the k-th best pool score stays
+    above that limit the top-k is exact; otherwise everything is rescored and
+    the pool rebuilt.
+    """
+    POOL_SIZE = 64
+
+    def __init__(self, matrix, names, rows, weights, k=5):
+        """
+        Scores every row once and builds the pool.
+        :param matrix: (breeds, columns) feature matrix of the whole data.
+        :param names: Name of every breed of the matrix.
+        :param rows: Rows of the matrix that can be ranked, for example one size.
+        :param weights: Initial weight of every column.
+        """
+        self.matrix = matrix
+        self.names = names
+        self.rows = np.asarray(rows)
+        self.weights = np.asarray(weights, dtype=np.float64).copy()
+        self.k = k
+        features = matrix[self.rows]
+        self.column_max = features.max(axis=0) if len(features) else np.zeros(matrix.shape[1])
+        self.column_min = features.min(axis=0) if len(features) else np.zeros(matrix.shape[1])
+        self.rebuilds = 0
+        self.updates = 0
+        self._rebuild()
+
+    def _rebuild(self):
+        """
+        Rescores every row and keeps the best ones in the pool.
+        """
+        scores = self.matrix[self.rows] @ self.weights
+        size = min(self.POOL_SIZE, len(scores))
+        pool, pool_scores = top_rows(scores[None, :], size)
+        self.pool = pool[0]
+        self.pool_scores = pool_scores[0]
+        self.pool_features = self.matrix[self.rows[self.pool]]
+        outside = np.ones(len(scores), dtype=bool)
+        outside[self.pool] = False
+        self.bound = float(scores[outside].max()) if outside.any() else -np.inf
+        self.drift = np.zeros_like(self.weights)
+        self.rebuilds += 1
+
+    def set_weights(self, weights):
+        """
+        Moves to new weights, usually differing from the current ones in one column.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        delta = weights - self.weights
+        for column in np.flatnonzero(delta):
+            self.pool_scores += delta[column] * self.pool_features[:, column]
+        self.drift += delta
+        self.weights = weights.copy()
+        self.updates += 1
+        if not self._pool_holds_top():
+            self._rebuild()
+
+    def _pool_holds_top(self):
+        """
+        Returns whether no row outside the pool can be among the k best.
+        """
+        if not np.isfinite(self.bound):
+            return True
+        raised = np.maximum(self.drift * self.column_max, self.drift * self.column_min).sum()
+        count = min(self.k, len(self.pool_scores))
+        kth = np.partition(self.pool_scores, len(self.pool_scores) - count)[-count]
+        return kth > self.bound + raised
+
+    def top(self):
+        """
+        Returns the names and scores of the k best breeds, ties by row order.
+        """
+        order = np.lexsort((self.pool, -self.pool_scores))[:self.k]
+        rows = self.rows[self.pool[order]]
+        return [self.names[row] for row in rows], self.pool_scores[order].tolist()
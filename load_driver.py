@@ -0,0 +1,136 @@
+"""
+Module for measuring the latency of user journeys in the Puppy Picker
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from journeys import JOURNEYS, journey_cycle
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return 0.0
+    rank = max(int(fraction * len(values) + 0.999999) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class LoadDriver:
+    """
+    Replays user journeys against headless controllers and reports latencies.
+
+    Every session has its own headless controller and replays journeys one
+    after another on its own thread, like a kiosk with one user; sessions run
+    at the same time to measure how the hardware copes with several kiosks or
+    background work. A step is timed from the user action until its graphs are
+    rendered, and a journey from its first step until its last one.
+    """
+    def __init__(self, controller_factory, sessions=1, journeys=20, names=None, seed=0):
+        """
+        Initializes the driver.
+        :param controller_factory: Function returning a new headless PuppyPickerController.
+        :param sessions: Number of sessions replaying journeys concurrently.
+        :param journeys: Number of journeys replayed by every session.
+        :param names: Journeys to replay in turn, all of them in a random order by default.
+        :param seed: Seed of the random journeys, each session uses seed + its number.
+        """
+        unknown = set(names or []) - set(JOURNEYS)
+        if unknown:
+            raise ValueError(f'Unknown journeys: {", ".join(sorted(unknown))}')
+        self.controller_factory = controller_factory
+        self.sessions = sessions
+        self.journeys = journeys
+        self.names = names
+        self.seed = seed
+        self.steps = defaultdict(list)
+        self.journey_times = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def run_session(self, number):
+        """
+        Replays the journeys of one session and records their latencies.
+        """
+        controller = self.controller_factory()
+        rng = random.Random(self.seed + number)
+        if self.names:
+            names = iter(self.names * self.journeys)
+        else:
+            names = journey_cycle(self.seed + number)
+        try:
+            for _ in range(self.journeys):
+                name = next(names)
+                steps = []
+                journey_start = time.perf_counter()
+                for step, action in JOURNEYS[name](controller, rng):
+                    start = time.perf_counter()
+                    try:
+                        action()
+                    except Exception:  # pylint: disable=broad-except
+                        with self._lock:
+                            self.errors[step] += 1
+                    steps.append((step, time.perf_counter() - start))
+                elapsed = time.perf_counter() - journey_start
+                with self._lock:
+                    for step, seconds in steps:
+                        self.steps[step].append(seconds)
+                    self.journey_times[name].append(elapsed)
+        finally:
+            controller.view.destroy()
+
+    def run(self):
+        """
+        Runs every session and returns the report.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.sessions,
+                                thread_name_prefix='puppy-picker-session') as executor:
+            for future in [executor.submit(self.run_session, number)
+                           for number in range(self.sessions)]:
+                future.result()
+        return self.report(time.perf_counter() - start)
+
+    @staticmethod
+    def summarize(durations):
+        """
+        Returns the count and the p50, p95, p99 and maximum latency in milliseconds.
+        """
+        values = sorted(duration * 1000 for duration in durations)
+        return {'count': len(values), 'p50': percentile(values, 0.50),
+                'p95': percentile(values, 0.95), 'p99': percentile(values, 0.99),
+                'max': values[-1] if values else 0.0}
+
+    def report(self, seconds):
+        """
+        Returns the latency statistics per handler and per journey.
+        """
+        journeys = sum(len(times) for times in self.journey_times.values())
+        return {'sessions': self.sessions, 'seconds': seconds,
+                'journeys_per_second': journeys / seconds if seconds else 0.0,
+                'handlers': {step: self.summarize(times)
+                             for step, times in sorted(self.steps.items())},
+                'journeys': {name: self.summarize(times)
+                             for name, times in sorted(self.journey_times.items())},
+                'errors': dict(self.errors)}
+
+    @staticmethod
+    def format_report(report):
+        """
+        Returns the report as a text table.
+        """
+        lines = [f'{report["sessions"]} sessions, {report["seconds"]:.1f} s, '
+                 f'{report["journeys_per_second"]:.2f} journeys/s']
+        for title, rows in [('Handler', report['handlers']), ('Journey', report['journeys'])]:
+            lines.append(f'{title:<26}{"count":>7}{"p50 ms":>10}{"p95 ms":>10}'
+                         f'{"p99 ms":>10}{"max ms":>10}')
+            for name, stats in rows.items():
+                lines.append(f'{name:<26}{stats["count"]:>7}{stats["p50"]:>10.1f}'
+                             f'{stats["p95"]:>10.1f}{stats["p99"]:>10.1f}{stats["max"]:>10.1f}')
+        for step, count in sorted(report['errors'].items()):
+            lines.append(f'{count} errors in {step}')
+        return '\n'.join(lines)
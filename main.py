@@ -1,7 +1,239 @@
 """File to launch the Puppy Picker application."""
 
+import argparse
+import json
+import sys
+
+from batch_recommend import BatchRecommender
+from catalog import DEFAULT_CATALOG, catalogs
+from chart_export import ChartExporter
 from controller import PuppyPickerController
+from journeys import JOURNEYS
+from load_driver import LoadDriver
+from merge_sources import SourceMerger
+from model import PuppyPickerModel
+from profiling import HandlerProfiler
+from soak import SoakTest
+from stall_monitor import StallMonitor
 
-if __name__ == '__main__':
-    puppy_picker = PuppyPickerController()
+
+def parse_args():
+    """
+    Parses the command line options of the application.
+    """
+    parser = argparse.ArgumentParser(description='Puppy Picker')
+    parser.add_argument('--profile-dir',
+                        help='save profiles of slow interactions to this directory')
+    parser.add_argument('--profile-threshold-ms', type=float, default=500,
+                        help='only save profiles of handlers slower than this (default: 500)')
+    parser.add_argument('--profile-format', choices=['pstats', 'collapsed'], default='pstats',
+                        help='pstats (cProfile) or collapsed stacks for flamegraphs')
+    parser.add_argument('--profile-keep', type=int, default=50,
+                        help='number of saved profiles kept on disk (default: 50)')
+    parser.add_argument('--stall-threshold-ms', type=float,
+                        help='watch the event loop and report stalls longer than this')
+    parser.add_argument('--catalog', action='append', default=[], metavar='NAME=PATH',
+                        help='register a breed catalog read from a CSV file (can be repeated)')
+    parser.add_argument('--use-catalog', default=DEFAULT_CATALOG,
+                        help=f'catalog to open (default: {DEFAULT_CATALOG}, breeds.csv)')
+    parser.add_argument('--catalog-budget-mb', type=float,
+                        help='unload the least recently used catalogs beyond this memory')
+    commands = parser.add_subparsers(dest='command')
+
+    export = commands.add_parser('export', help='export the graphs of every breed to images')
+    export.add_argument('output_dir', help='directory receiving the images and manifest')
+    export.add_argument('--breed', action='append', dest='breeds',
+                        help='only export this breed (can be repeated)')
+    export.add_argument('--group', help='only export breeds of this breed group')
+    export.add_argument('--size', choices=['small', 'medium', 'big'],
+                        help='only export breeds of this size')
+    export.add_argument('--compare', action='append', default=[], metavar='BREED1:BREED2[:...]',
+                        help='also export the comparison of two or more breeds (can be repeated)')
+    export.add_argument('--format', action='append', dest='formats', choices=['png', 'svg'],
+                        help='image format (can be repeated, default: png)')
+    export.add_argument('--workers', type=int, help='number of processes (default: all cores)')
+    export.add_argument('--force', action='store_true',
+                        help='render every graph even if its inputs did not change')
+
+    soak = commands.add_parser('soak', help='replay user journeys and check memory stays bounded')
+    soak.add_argument('--interactions', type=int, default=3000,
+                      help='number of interactions to replay (default: 3000)')
+    soak.add_argument('--sample-every', type=int, default=100,
+                      help='interactions between two memory samples (default: 100)')
+    soak.add_argument('--warmup', type=int, default=2000,
+                      help='interactions before memory is compared (default: 2000)')
+    soak.add_argument('--max-growth-mb', type=float, default=25,
+                      help='allowed memory growth after the warm-up (default: 25)')
+    soak.add_argument('--max-slope-kb', type=float, default=1024,
+                      help='allowed memory trend in KB per 1000 interactions (default: 1024)')
+    soak.add_argument('--trace', action='store_true',
+                      help='also trace allocations to list the lines that allocated the most')
+    soak.add_argument('--seed', type=int, default=0, help='seed of the random journeys')
+    soak.add_argument('--headless', action='store_true',
+                      help='run without a window, rendering graphs off-screen')
+
+    load = commands.add_parser('load', help='measure handler and journey latencies headless')
+    load.add_argument('--sessions', type=int, default=1,
+                      help='number of concurrent sessions (default: 1)')
+    load.add_argument('--journeys', type=int, default=20,
+                      help='journeys replayed by every session (default: 20)')
+    load.add_argument('--journey', action='append', dest='names', choices=sorted(JOURNEYS),
+                      help='replay this journey instead of random ones (can be repeated)')
+    load.add_argument('--seed', type=int, default=0, help='seed of the random journeys')
+    load.add_argument('--json', help='also write the report to this file')
+
+    merge = commands.add_parser('merge', help='merge breed data sources described by a spec')
+    merge.add_argument('spec', help='JSON spec of the sources, see merge_sources.SourceMerger')
+    merge.add_argument('output', help='CSV file receiving the merged data')
+
+    recommend = commands.add_parser('recommend',
+                                    help='recommend breeds for every row of a preference file')
+    recommend.add_argument('input', help='CSV or JSON lines file with the columns '
+                                         f'{", ".join(PuppyPickerModel.COLUMNS)} (0-3) and size')
+    recommend.add_argument('output', help='CSV or JSON lines file receiving the recommendations')
+    recommend.add_argument('--top', type=int, default=5,
+                           help='breeds recommended per row (default: 5)')
+    recommend.add_argument('--chunk-rows', type=int, default=BatchRecommender.CHUNK_ROWS,
+                           help='rows read at once (default: %(default)s)')
+    recommend.add_argument('--rejected', help='write the rejected rows and reasons to this file')
+    recommend.add_argument('--workers', type=int,
+                           help='score on this many processes, for very large breed data')
+    return parser.parse_args()
+
+
+def configure_catalogs(args):
+    """
+    Registers the catalogs given on the command line.
+    """
+    for entry in args.catalog:
+        name, separator, path = entry.partition('=')
+        if not separator or not name or not path:
+            sys.exit(f'Invalid catalog {entry}, expected NAME=PATH')
+        catalogs.register(name, path)
+    if args.catalog_budget_mb is not None:
+        catalogs.budget_bytes = int(args.catalog_budget_mb * 1024 * 1024)
+    if args.use_catalog not in catalogs.catalogs:
+        sys.exit(f'Unknown catalog {args.use_catalog}, known: {", ".join(catalogs.names())}')
+
+
+def run_export(args):
+    """
+    Exports breed graphs to image files from the command line.
+    """
+    exporter = ChartExporter(args.output_dir, df=catalogs.open(args.use_catalog).df,
+                             formats=args.formats or ['png'],
+                             workers=args.workers)
+    breeds = exporter.select_breeds(args.breeds, args.group, args.size)
+    pairs = [tuple(pair.split(':')) for pair in args.compare]
+    result = exporter.export(breeds, pairs, force=args.force)
+    print(f'Rendered {result["rendered"]} graphs, skipped {result["skipped"]} unchanged '
+          f'in {result["seconds"]:.1f} s')
+
+
+def run_soak(args):
+    """
+    Runs the soak test and exits with an error status if memory kept growing.
+    """
+    puppy_picker = PuppyPickerController(headless=args.headless, catalog=args.use_catalog)
+    soak = SoakTest(puppy_picker, interactions=args.interactions,
+                    sample_every=args.sample_every, warmup=args.warmup,
+                    max_growth_mb=args.max_growth_mb, max_slope_kb=args.max_slope_kb,
+                    seed=args.seed, trace=args.trace)
+    report = soak.run()
+    puppy_picker.view.chart_renderer.shutdown()
+    puppy_picker.view.destroy()
+    print(soak.format_report(report))
+    if report['failures']:
+        sys.exit(1)
+
+
+def run_load(args):
+    """
+    Replays journeys on headless sessions and prints latency percentiles.
+    """
+    driver = LoadDriver(lambda: PuppyPickerController(headless=True, catalog=args.use_catalog),
+                        sessions=args.sessions, journeys=args.journeys, names=args.names,
+                        seed=args.seed)
+    report = driver.run()
+    print(driver.format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+
+def run_merge(args):
+    """
+    Merges the sources of a spec, or takes the cached merge, and writes it to a CSV file.
+    """
+    try:
+        merger = SourceMerger(args.spec)
+        merged = merger.load()
+    except (OSError, ValueError, KeyError) as error:
+        sys.exit(f'Cannot merge {args.spec}: {error}')
+    merged.to_csv(args.output, index=False)
+    report = merger.report
+    if report.get('cached'):
+        print(f'Sources unchanged, {len(merged)} breeds taken from the cache')
+        return
+    print(f'{report["rows"]} breeds merged, matched per source: '
+          + ', '.join(f'{name} {count}' for name, count in report['matched'].items()))
+    for name, count in report['duplicates'].items():
+        if count:
+            print(f'{name}: {count} repeated breed names ignored')
+    for column, count in report['conflicts'].items():
+        print(f'{column}: sources disagree for {count} breeds')
+
+
+def run_recommend(args):
+    """
+    Recommends breeds for a file of preferences and prints the throughput.
+    """
+    model = catalogs.open(args.use_catalog).model
+    scorer = model.sharded_scorer(args.workers) if args.workers else None
+    try:
+        recommender = BatchRecommender(model, k=args.top, chunk_rows=args.chunk_rows,
+                                       scorer=scorer)
+        report = recommender.run(args.input, args.output, args.rejected)
+    except ValueError as error:
+        sys.exit(f'Cannot read {args.input}: {error}')
+    finally:
+        if scorer is not None:
+            scorer.close()
+    print(recommender.format_report(report))
+
+
+def run_app(args):
+    """
+    Launches the application window.
+    """
+    profiler = None
+    if args.profile_dir:
+        profiler = HandlerProfiler(args.profile_dir, threshold_ms=args.profile_threshold_ms,
+                                   max_files=args.profile_keep,
+                                   profile_format=args.profile_format)
+    puppy_picker = PuppyPickerController(profiler, catalog=args.use_catalog)
+    monitor = None
+    if args.stall_threshold_ms:
+        monitor = StallMonitor(puppy_picker.view, threshold_ms=args.stall_threshold_ms)
+        monitor.start()
     puppy_picker.run()
+    if monitor is not None:
+        monitor.stop()
+        print(monitor.format_report())
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    configure_catalogs(arguments)
+    if arguments.command == 'export':
+        run_export(arguments)
+    elif arguments.command == 'soak':
+        run_soak(arguments)
+    elif arguments.command == 'load':
+        run_load(arguments)
+    elif arguments.command == 'merge':
+        run_merge(arguments)
+    elif arguments.command == 'recommend':
+        run_recommend(arguments)
+    else:
+        run_app(arguments)
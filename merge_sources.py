@@ -0,0 +1,258 @@
+"""
+Module for merging several breed data sources into one dataset in the Puppy Picker
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from breed_search import BreedSearch
+
+
+class SourceMerger:
+    """
+    Joins breed data files on their breed names and resolves conflicting fields.
+
+    The merge is described by a JSON spec:
+
+        {"sources": [{"name": "dogtime", "path": "dogtime.csv", "key": "Breed",
+                      "columns": {"Friendliness": "all_around_friendliness"}},
+                     {"name": "details", "path": "details.csv", "key": "breed"}],
+         "how": "inner",
+         "rules": {"max_weight_male": "max", "breed_group": ["details", "dogtime"]},
+         "aliases": {"Poodle (Standard)": "Standard Poodle"}}
+
+    Breed names are normalized (case, spaces and punctuation ignored, aliases
+    applied) and every source is hash joined with the first one: a dictionary
+    from normalized name to row is built once per source and probed once per
+    breed. `how` keeps the breeds of every source ('inner'), of the first
+    source ('left') or of any source ('outer'). A field found in several
+    sources takes, by default, the first value present in source order; a rule
+    can give another source order or take the 'max', 'min' or 'mean' value.
+
+    The merged data is cached under cache_dir, keyed by the content hashes of
+    the spec and the source files, so an unchanged set of sources is not merged
+    again. File hashes are remembered with the size and modification time of
+    the file, so unchanged files are not read either.
+    """
+    KEY_COLUMN = 'breed'
+    AGGREGATES = {'max': np.nanmax, 'min': np.nanmin, 'mean': np.nanmean}
+    FINGERPRINTS_FILE = 'fingerprints.json'
+
+    def __init__(self, spec_path, cache_dir=None):
+        """
+        Reads the spec of the merge.
+        :param spec_path: Path of the JSON spec, source paths are relative to it.
+        :param cache_dir: Directory of the merged data cache, '.merge_cache' next to
+            the spec by default.
+        """
+        self.spec_path = spec_path
+        with open(spec_path, encoding='utf-8') as file:
+            self.spec = json.load(file)
+        base = os.path.dirname(os.path.abspath(spec_path))
+        self.sources = []
+        for source in self.spec['sources']:
+            source = dict(source)
+            source['path'] = os.path.join(base, source['path'])
+            source.setdefault('name', os.path.splitext(os.path.basename(source['path']))[0])
+            source.setdefault('key', self.KEY_COLUMN)
+            self.sources.append(source)
+        if not self.sources:
+            raise ValueError('A merge needs at least one source')
+        self.how = self.spec.get('how', 'inner')
+        if self.how not in ('inner', 'left', 'outer'):
+            raise ValueError(f'Unknown join: {self.how}')
+        self.rules = self.spec.get('rules', {})
+        self.aliases = {self.normalize(name): self.normalize(canonical)
+                        for name, canonical in self.spec.get('aliases', {}).items()}
+        self.cache_dir = cache_dir or os.path.join(base, '.merge_cache')
+        self.cache_name = os.path.splitext(os.path.basename(spec_path))[0]
+        self.report = {}
+
+    @staticmethod
+    def normalize(names):
+        """
+        Returns breed names normalized like the breed search, see BreedSearch.normalize.
+        Accepts a name or a Series, whose repeated names are normalized once.
+        """
+        if isinstance(names, pd.Series):
+            names = names.astype(str)
+            return names.map({name: BreedSearch.normalize(name) for name in names.unique()})
+        return BreedSearch.normalize(names)
+
+    def keys(self, names):
+        """
+        Returns the join keys of a Series of breed names.
+        """
+        keys = self.normalize(names)
+        if self.aliases:
+            keys = keys.replace(self.aliases)
+        return keys
+
+    def read_source(self, source):
+        """
+        Returns the rows of a source with renamed columns and the join key of every row.
+        """
+        df = pd.read_csv(source['path'], encoding='utf-8-sig')
+        df = df.rename(columns=source.get('columns', {}))
+        if source['key'] not in df.columns:
+            raise ValueError(f'Source {source["name"]} has no column {source["key"]}')
+        df = df.rename(columns={source['key']: self.KEY_COLUMN})
+        return df, self.keys(df[self.KEY_COLUMN]).to_numpy()
+
+    def merge(self):
+        """
+        Joins the sources and returns the merged DataFrame. The report
+        attribute then holds the matches and conflicts of the merge.
+        """
+        frames = []
+        tables = []
+        duplicates = {}
+        for source in self.sources:
+            df, keys = self.read_source(source)
+            # Build side of the hash join, the first row of a repeated name wins
+            table = {}
+            for row, key in enumerate(keys):
+                table.setdefault(key, row)
+            duplicates[source['name']] = len(keys) - len(table)
+            frames.append(df)
+            tables.append(table)
+
+        keys = list(tables[0])
+        if self.how == 'outer':
+            known = set(keys)
+            for table in tables[1:]:
+                for key in table:
+                    if key not in known:
+                        known.add(key)
+                        keys.append(key)
+        # Probe side: the row of every merged breed in every source, -1 if absent
+        positions = np.array([[table.get(key, -1) for key in keys] for table in tables],
+                             dtype=np.int64).reshape(len(tables), len(keys))
+        if self.how == 'inner':
+            kept = (positions >= 0).all(axis=0)
+            positions = positions[:, kept]
+
+        columns = [self.KEY_COLUMN]
+        for df in frames:
+            columns += [column for column in df.columns if column not in columns]
+        merged = {}
+        conflicts = {}
+        for column in columns:
+            merged[column], conflicts[column] = self.resolve(column, frames, positions)
+        self.report = {'rows': positions.shape[1],
+                       'matched': {source['name']: int((rows >= 0).sum())
+                                   for source, rows in zip(self.sources, positions)},
+                       'duplicates': duplicates,
+                       'conflicts': {column: count for column, count in conflicts.items()
+                                     if count and column != self.KEY_COLUMN}}
+        return pd.DataFrame(merged)
+
+    def source_order(self, column):
+        """
+        Returns the source positions in the order their values of a column are preferred.
+        """
+        rule = self.rules.get(column)
+        names = [source['name'] for source in self.sources]
+        if isinstance(rule, list):
+            unknown = set(rule) - set(names)
+            if unknown:
+                raise ValueError(f'Unknown sources in the rule of {column}: {sorted(unknown)}')
+            return [names.index(name) for name in rule] \
+                + [position for position, name in enumerate(names) if name not in rule]
+        return list(range(len(names)))
+
+    def resolve(self, column, frames, positions):
+        """
+        Returns the merged values of a column and the number of breeds whose
+        sources disagree on it.
+        """
+        sources = [(frames[position][column], positions[position])
+                   for position in self.source_order(column) if column in frames[position]]
+        numeric = all(pd.api.types.is_numeric_dtype(series.dtype) for series, _ in sources)
+        values = np.stack([series.to_numpy(dtype=np.float64 if numeric else object)
+                           [np.maximum(rows, 0)] for series, rows in sources])
+        present = np.stack([rows >= 0 for _, rows in sources]) & ~pd.isna(values)
+        any_present = present.any(axis=0)
+        rule = self.rules.get(column, 'first')
+
+        if isinstance(rule, str) and rule in self.AGGREGATES:
+            if not numeric:
+                raise ValueError(f'Rule {rule} of {column} needs a numeric column')
+            result = np.full(values.shape[1], np.nan)
+            result[any_present] = self.AGGREGATES[rule](
+                np.where(present, values, np.nan)[:, any_present], axis=0)
+        elif isinstance(rule, list) or rule == 'first':
+            # First value present in source order
+            result = values[np.argmax(present, axis=0), np.arange(values.shape[1])]
+            result[~any_present] = np.nan
+        else:
+            raise ValueError(f'Unknown rule for {column}: {rule}')
+
+        if numeric:
+            differs = ~np.isclose(values, result[None, :])
+        else:
+            differs = values != result[None, :]
+        conflicts = int(((present & differs).any(axis=0) & (present.sum(axis=0) > 1)).sum())
+        if numeric and any_present.all() \
+                and all(pd.api.types.is_integer_dtype(series.dtype) for series, _ in sources):
+            result = result.astype(np.int64)
+        return result, conflicts
+
+    def file_fingerprint(self, path, known):
+        """
+        Returns the SHA-256 of a file, reusing the known hash when its size and
+        modification time did not change.
+        """
+        stat = os.stat(path)
+        entry = known.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        known[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                       'sha256': digest.hexdigest()}
+        return known[path]['sha256']
+
+    def fingerprint(self):
+        """
+        Returns the hash identifying the merge: its spec and the content of its sources.
+        """
+        fingerprints_path = os.path.join(self.cache_dir, self.FINGERPRINTS_FILE)
+        try:
+            with open(fingerprints_path, encoding='utf-8') as file:
+                known = json.load(file)
+        except (OSError, ValueError):
+            known = {}
+        digest = hashlib.sha256(json.dumps(self.spec, sort_keys=True).encode('utf-8'))
+        for source in self.sources:
+            digest.update(self.file_fingerprint(source['path'], known).encode('ascii'))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(fingerprints_path, 'w', encoding='utf-8') as file:
+            json.dump(known, file)
+        return digest.hexdigest()
+
+    def load(self):
+        """
+        Returns the merged data, from the cache when the spec and the sources
+        did not change since it was merged.
+        """
+        key = self.fingerprint()
+        prefix = f'{self.cache_name}-merged-'
+        cache_path = os.path.join(self.cache_dir, f'{prefix}{key}.pkl')
+        if os.path.exists(cache_path):
+            self.report = {'cached': True}
+            return pd.read_pickle(cache_path)
+        merged = self.merge()
+        for name in os.listdir(self.cache_dir):
+            # Older merges of this spec can no longer be used
+            if name.startswith(prefix) and name.endswith('.pkl'):
+                os.remove(os.path.join(self.cache_dir, name))
+        temporary = cache_path + '.tmp'
+        merged.to_pickle(temporary)
+        os.replace(temporary, cache_path)
+        self.report['cached'] = False
+        return merged
@@ -1,5 +1,16 @@
 """  Model for Puppy Picker"""
-from graph_manage import GraphManage
+import numpy as np
+from catalog import catalogs
+from filters import FilterIndex
+from ingest import IngestSummary
+from knn import NearestBreeds
+from live_ranking import LiveRanking
+from breed_search import BreedSearch
+from sharded_scoring import ShardedScorer
+from similarity import BreedSimilarity
+from skyline import Skyline
+from sketches import ColumnSketch
+from threshold_topk import ThresholdTopK
 
 
 class PuppyPickerModel:
@@ -7,52 +18,144 @@ class PuppyPickerModel:
     Model class for the Puppy Picker.
 
     This class provides functions to find matching breeds
-    based on user preferences and to compute descriptive
-    statistics about breed lifespans.
+    based on user preferences, to find breeds similar to a breed
+    and to compute descriptive statistics about breed lifespans.
     """
-    def __init__(self):
+    COLUMNS = ['adaptability', 'all_around_friendliness', 'health_grooming',
+               'trainability', 'exercise_needs', 'average_lifespan']
+
+    def __init__(self, store=None):
+        """
+        Initializes the PuppyPickerModel instance with the breed data.
+        :param store: SnapshotStore of a catalog, the default catalog if not given.
+        """
+        self.store = store if store is not None else catalogs.open().store
+
+    @property
+    def df(self):
         """
-        Initializes the PuppyPickerModel instance by loading breed data into
-        a DataFrame from a CSV file.
+        The current immutable snapshot of the breed data as a DataFrame.
         """
-        self.df = GraphManage.load_data('breeds.csv')
+        return self.store.current().df
 
-    def find_matching_breeds(self, preference: list):
+    @df.setter
+    def df(self, df):
+        self.store.replace(df)
+
+    def find_matching_breeds(self, preference: list, predicates=None):
         """
         Finds and returns the top 5 matching puppy breeds based on user preferences.
+        :param predicates: Optional extra filters as (column, operator, value), for example
+            [('breed_group', 'in', ['Herding Dogs', 'Working Dogs']),
+            ('average_weight', '<', 50), ('average_lifespan', '>=', 12)].
+            See FilterIndex.select.
         """
-        columns = ['adaptability', 'all_around_friendliness', 'health_grooming',
-                   'trainability', 'exercise_needs', 'average_lifespan']
-        if preference[6] == 'all':
-            df_temp = self.df.copy()
+        # Every call works on one snapshot, other threads may publish new ones meanwhile
+        snapshot = self.store.current()
+        predicates = list(predicates or [])
+        if preference[6] != 'all':
+            predicates.append(('size_category', '==', preference[6]))
+        mask = FilterIndex.for_snapshot(snapshot).select(predicates).mask() \
+            if predicates else None
+
+        # Best scores for the user's preferences, large catalogs stop before scoring every breed
+        weights = np.array([int(value) for value in preference[:6]], dtype=np.float64)
+        top_k = ThresholdTopK.for_snapshot(snapshot, self.COLUMNS)
+        rows, scores, _ = top_k.top_k(weights, 5, mask)
+        top_name = [snapshot.columns['breed'][row] for row in rows]
+        top_score = scores.tolist()
+        return top_name, top_score
+
+    def live_ranking(self, weights, size='all', k=5):
+        """
+        Returns a LiveRanking of the breeds of a size, re-ranked incrementally
+        as the weights of COLUMNS change.
+        """
+        snapshot = self.store.current()
+        if size == 'all':
+            rows = np.arange(len(snapshot))
         else:
-            df_temp = self.df[self.df['size_category'] == preference[6]].copy()
+            rows = FilterIndex.for_snapshot(snapshot).equals('size_category', size).rows()
+        return LiveRanking(snapshot.matrix(self.COLUMNS), snapshot.columns['breed'], rows,
+                           weights, k)
 
-        # Calculate the scores for each breed based on the user's preferences.
-        for index in range(6):
-            df_temp['score_' + columns[index]] = df_temp[columns[index]] * int(preference[index])
+    def sharded_scorer(self, workers=None):
+        """
+        Returns a ShardedScorer over the current data, to rank many profiles on all cores.
+        Close it when done.
+        """
+        snapshot = self.store.current()
+        return ShardedScorer(snapshot.matrix(self.COLUMNS), snapshot.columns['size_category'],
+                             workers=workers)
 
-        df_temp['sum_score'] = df_temp['adaptability'] + df_temp['all_around_friendliness'] \
-                               + df_temp['health_grooming'] + df_temp['trainability'] \
-                               + df_temp['exercise_needs'] + df_temp['average_lifespan']
+    def find_matching_breeds_batch(self, preferences, scorer, k=5):
+        """
+        Same as find_matching_breeds for many preference lists at once,
+        scored by a ShardedScorer. Returns a (top names, top scores) pair per preference.
+        """
+        weights = [[int(value) for value in preference[:6]] for preference in preferences]
+        sizes = [preference[6] for preference in preferences]
+        rows, scores = scorer.top_k(weights, sizes, k)
+        breeds = self.store.current().columns['breed']
+        return [([breeds[row] for row in profile_rows if row >= 0],
+                 [score for row, score in zip(profile_rows, profile_scores) if row >= 0])
+                for profile_rows, profile_scores in zip(rows.tolist(), scores.tolist())]
 
-        top_rows = df_temp.sort_values(by='sum_score', ascending=False).head(5)
-        top_name = top_rows['breed'].tolist()
-        top_score = top_rows['sum_score'].tolist()
-        return top_name, top_score
+    def skyline_breeds(self, criteria, size='all'):
+        """
+        Returns the breeds no other breed of the size beats on every criterion,
+        for example {'all_around_friendliness': 'max', 'exercise_needs': 'min',
+        'average_lifespan': 'max'}. Computed once per criteria, size and data version.
+        """
+        skyline = Skyline.for_snapshot(self.store.current(), criteria, size)
+        return list(dict.fromkeys(skyline.names))
+
+    def find_nearest_breeds(self, target: dict, size='all', k=5):
+        """
+        Finds the k breeds closest to an ideal profile, for example
+        {'all_around_friendliness': 5, 'exercise_needs': 2,
+        'average_lifespan': 12, 'average_weight': 30}.
+        Returns the breed names and their distances to the profile.
+        """
+        return NearestBreeds.for_snapshot(self.store.current()).query(target, size, k)
 
     def descriptive_lifespan(self):
         """
-        Computes and returns basic descriptive statistics for the lifespans of breeds.
+        Computes and returns basic descriptive statistics for the lifespans of breeds:
+        minimum, maximum, mean, mode, 10th percentile, median and 90th percentile.
+        Percentiles and mode come from the sketch built while the data was loaded,
+        or once per version of the data after an update. They are exact for
+        small catalogs and approximate for very large ones.
         """
-        min_lifespan = self.df['average_lifespan'].min()
-        max_lifespan = self.df['average_lifespan'].max()
-        average_lifespan = self.df['average_lifespan'].mean()
-        mode_lifespan = self.df['average_lifespan'].mode()
+        snapshot = self.store.current()
+        summary = IngestSummary.of(snapshot)
+        if summary is not None and 'average_lifespan' in summary.sketches:
+            sketch = summary.sketches['average_lifespan']
+        else:
+            # Data changed since it was loaded
+            sketch = ColumnSketch.for_snapshot(snapshot, 'average_lifespan')
+        low, median, high = sketch.percentiles([10, 50, 90])
+        list_data = [int(sketch.minimum), int(sketch.maximum), int(sketch.mean),
+                     int(sketch.mode()), int(low), int(median), int(high)]
+        return list_data
 
-        if not mode_lifespan.empty:
-            mode_lifespan = mode_lifespan.iloc[0]
+    def search_breeds(self, text, limit=None):
+        """
+        Returns the breed names matching text typed in a breed selection box, best first.
+        See BreedSearch.search.
+        """
+        return BreedSearch.for_snapshot(self.store.current()).search(text, limit)
 
-        list_data = [int(min_lifespan), int(max_lifespan),
-                     int(average_lifespan), int(mode_lifespan)]
-        return list_data
+    def resolve_breed(self, text):
+        """
+        Returns the breed name typed, written as in the data, or None for an unknown name.
+        """
+        return BreedSearch.for_snapshot(self.store.current()).resolve(text)
+
+    def most_similar_breeds(self, breed, k=3):
+        """
+        Returns the k breeds whose characteristics, lifespan and size
+        are the closest to the given breed, closest first.
+        """
+        names, _ = BreedSimilarity.for_snapshot(self.store.current()).most_similar(breed, k)
+        return names
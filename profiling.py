@@ -0,0 +1,198 @@
+"""
+Module for capturing profiles of slow user interactions in the Puppy Picker
+"""
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class HandlerProfiler:
+    """
+    Runs controller handlers under a profiler and writes the profile to disk
+    only when a handler takes longer than the latency threshold.
+
+    Two formats are supported: 'pstats' uses the deterministic cProfile
+    profiler, 'collapsed' samples the handler's thread and writes
+    collapsed stacks that flamegraph tools can read directly.
+    """
+    HANDLERS = ['next_button_handler', 'story_combobox_handler', 'show_info_handler',
+                'gender_combobox_handler', 'ex_show_graph_handler', 'show_compare_handler',
+                'compare_combobox_handler', 'add_compare_breed_handler',
+                'compare_shortlist_handler', 'live_mode_handler', 'live_size_handler',
+                'live_weights_handler', 'breed_search_handler', 'skyline_handler']
+
+    # View variables that describe what the user had selected
+    SELECTIONS = ['selected_story_combo', 'selected_size', 'selected_breed_combo',
+                  'selected_gender_combo', 'selected1_explore', 'selected2_explore',
+                  'selected1_breed_compare', 'selected2_breed_compare']
+
+    def __init__(self, output_dir, threshold_ms=500, max_files=50,
+                 profile_format='pstats', sample_interval_ms=5):
+        """
+        Initializes the profiler.
+        :param output_dir: Directory where slow profiles are saved.
+        :param threshold_ms: Handlers faster than this are not saved.
+        :param max_files: Number of profiles kept before the oldest are removed.
+        :param profile_format: Either 'pstats' or 'collapsed'.
+        :param sample_interval_ms: Sampling interval for the 'collapsed' format.
+        """
+        if profile_format not in ('pstats', 'collapsed'):
+            raise ValueError(f'Unknown profile format: {profile_format}')
+        self.output_dir = output_dir
+        self.threshold_ms = threshold_ms
+        self.max_files = max_files
+        self.profile_format = profile_format
+        self.sample_interval = sample_interval_ms / 1000
+        self._active = threading.local()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def install(self, controller):
+        """
+        Replaces the handler methods of a controller instance with profiled versions.
+        """
+        for name in self.HANDLERS:
+            handler = getattr(controller, name, None)
+            if handler is not None:
+                setattr(controller, name, self.wrap(name, handler, controller))
+
+    def wrap(self, name, handler, controller):
+        """
+        Returns a version of the handler that is profiled on every call.
+        """
+        @functools.wraps(handler)
+        def profiled(*args, **kwargs):
+            # Handlers can be nested, only the outermost one is profiled
+            if getattr(self._active, 'running', False):
+                return handler(*args, **kwargs)
+            self._active.running = True
+            try:
+                if self.profile_format == 'pstats':
+                    return self._run_cprofile(name, handler, controller, args, kwargs)
+                return self._run_sampled(name, handler, controller, args, kwargs)
+            finally:
+                self._active.running = False
+        return profiled
+
+    def _run_cprofile(self, name, handler, controller, args, kwargs):
+        """
+        Runs a handler under cProfile.
+        """
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                path = self._profile_path(name, controller, args, elapsed_ms)
+                profile.dump_stats(path)
+                self._write_metadata(path, name, controller, args, elapsed_ms)
+                self._rotate()
+
+    def _run_sampled(self, name, handler, controller, args, kwargs):
+        """
+        Runs a handler while a helper thread samples its call stack.
+        """
+        stacks = Counter()
+        thread_id = threading.get_ident()
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.sample_interval):
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    stacks[self.collapse_stack(frame)] += 1
+
+        sampler = threading.Thread(target=sample, name='puppy-picker-sampler', daemon=True)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            done.set()
+            sampler.join()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                path = self._profile_path(name, controller, args, elapsed_ms)
+                with open(path, 'w', encoding='utf-8') as file:
+                    for stack, count in stacks.most_common():
+                        file.write(f'{stack} {count}\n')
+                self._write_metadata(path, name, controller, args, elapsed_ms)
+                self._rotate()
+
+    @staticmethod
+    def collapse_stack(frame):
+        """
+        Converts a frame and its callers into a single collapsed stack line,
+        outermost frame first.
+        """
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def handler_context(self, controller, args):
+        """
+        Collects the page number and the user's current selections
+        at the time a handler was called.
+        """
+        view = getattr(controller, 'view', None)
+        page = args[0] if args and isinstance(args[0], int) else \
+            getattr(view, 'page_find_breeds', None)
+        selections = {}
+        for attribute in self.SELECTIONS:
+            variable = getattr(view, attribute, None)
+            try:
+                value = variable.get()
+            except Exception:  # pylint: disable=broad-except
+                continue
+            if value:
+                selections[attribute] = value
+        return {'page': page, 'explore_page': getattr(view, 'explore_page', None),
+                'selections': selections}
+
+    def _profile_path(self, name, controller, args, elapsed_ms):
+        """
+        Builds a unique file name tagged with the handler and page number.
+        """
+        page = self.handler_context(controller, args)['page']
+        extension = 'pstats' if self.profile_format == 'pstats' else 'collapsed'
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        filename = f'{stamp}-{time.perf_counter_ns() % 1000000:06d}_{name}' \
+                   f'_page{page}_{int(elapsed_ms)}ms.{extension}'
+        return os.path.join(self.output_dir, filename)
+
+    def _write_metadata(self, path, name, controller, args, elapsed_ms):
+        """
+        Writes a JSON file next to the profile describing the interaction.
+        """
+        metadata = {'handler': name, 'elapsed_ms': round(elapsed_ms, 2),
+                    'threshold_ms': self.threshold_ms, 'format': self.profile_format,
+                    'arguments': [repr(arg) for arg in args]}
+        metadata.update(self.handler_context(controller, args))
+        with open(path + '.json', 'w', encoding='utf-8') as file:
+            json.dump(metadata, file, indent=2, default=str)
+
+    def _rotate(self):
+        """
+        Removes the oldest profiles so that at most max_files are kept.
+        """
+        profiles = [os.path.join(self.output_dir, name) for name in os.listdir(self.output_dir)
+                    if name.endswith(('.pstats', '.collapsed'))]
+        profiles.sort(key=os.path.getmtime)
+        for path in profiles[:max(0, len(profiles) - self.max_files)]:
+            for stale in (path, path + '.json'):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,235 @@
+"""
+Module for rendering independent graphs in parallel worker processes in the Puppy Picker
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from PIL import Image
+from snapshot import SnapshotStore
+
+
+class SharedDataset:
+    """
+    Copies the columns of a DataFrame into one shared memory block once,
+    so worker processes can map the data instead of receiving a pickled DataFrame.
+
+    Numeric columns keep their dtype. Text and categorical columns are stored
+    as integer codes, only their (small) list of distinct values is sent to workers.
+    """
+    ALIGNMENT = 64
+
+    def __init__(self, df):
+        """
+        Creates the shared memory block and copies the DataFrame into it.
+        """
+        self.rows = len(df)
+        self.layout = []
+        arrays = []
+        offset = 0
+        for column in df.columns:
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series.dtype) and \
+                    not isinstance(series.dtype, pd.CategoricalDtype):
+                array = series.to_numpy()
+                entry = {'name': column, 'kind': 'numeric', 'dtype': array.dtype.str}
+            else:
+                categorical = pd.Categorical(series)
+                array = categorical.codes.astype(np.int32)
+                entry = {'name': column, 'dtype': array.dtype.str,
+                         'categories': categorical.categories.tolist(),
+                         'ordered': bool(categorical.ordered),
+                         'kind': 'category' if isinstance(series.dtype, pd.CategoricalDtype)
+                         else 'object'}
+            entry['offset'] = offset
+            self.layout.append(entry)
+            arrays.append(array)
+            offset += -(-array.nbytes // self.ALIGNMENT) * self.ALIGNMENT
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for entry, array in zip(self.layout, arrays):
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf,
+                              offset=entry['offset'])
+            view[:] = array
+
+    @property
+    def name(self):
+        """
+        Name of the shared memory block, used by workers to attach to it.
+        """
+        return self.shm.name
+
+    @staticmethod
+    def attach(name, rows, layout):
+        """
+        Maps a shared memory block created by another process and rebuilds the
+        DataFrame. Numeric columns are views on the shared memory, not copies.
+        Returns the shared memory handle and the DataFrame.
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        columns = {}
+        for entry in layout:
+            array = np.ndarray((rows,), dtype=np.dtype(entry['dtype']), buffer=shm.buf,
+                               offset=entry['offset'])
+            array.flags.writeable = False
+            if entry['kind'] == 'numeric':
+                columns[entry['name']] = array
+            elif entry['kind'] == 'category':
+                columns[entry['name']] = pd.Categorical.from_codes(
+                    array, categories=entry['categories'], ordered=entry['ordered'])
+            else:
+                columns[entry['name']] = np.asarray(entry['categories'], dtype=object)[array]
+        return shm, pd.DataFrame(columns, copy=False)
+
+    def close(self):
+        """
+        Releases the shared memory block.
+        """
+        self.shm.close()
+        self.shm.unlink()
+
+
+# State of a worker process, set once by the pool initializer
+_worker_shm = None
+_worker_graph = None
+
+
+def _init_worker(name, rows, layout):
+    """
+    Attaches a worker process to the shared dataset.
+    """
+    global _worker_shm, _worker_graph  # pylint: disable=global-statement
+    from graph_manage import GraphManage  # pylint: disable=import-outside-toplevel
+    _worker_shm, df = SharedDataset.attach(name, rows, layout)
+    _worker_graph = GraphManage(df)
+
+
+def worker_graph():
+    """
+    Returns the GraphManage of the current worker process, built on the shared dataset.
+    """
+    return _worker_graph
+
+
+def render_in_worker(method, args, size=None):
+    """
+    Builds a graph with a GraphManage method in a worker process and copies its
+    RGBA pixels into a new shared memory block instead of returning them, so
+    they are not pickled. Returns the width, the height and the name of the
+    block, which take_pixels releases in the window's process.
+    """
+    from chart_renderer import rasterize_rgba  # pylint: disable=import-outside-toplevel
+    blocks = []
+
+    def allocate(size_bytes):
+        """
+        Creates the shared block the pixels are drawn into.
+        """
+        blocks.append(shared_memory.SharedMemory(create=True, size=max(size_bytes, 1)))
+        return blocks[-1].buf
+
+    width, height, pixels = rasterize_rgba(getattr(_worker_graph, method)(*args), size,
+                                           allocate)
+    del pixels
+    blocks[0].close()
+    return width, height, blocks[0].name
+
+
+def take_pixels(width, height, name):
+    """
+    Returns the pixels shared by render_in_worker as a PIL image and releases their block.
+    The pixels are decoded once into the image, Tk copies them again to show them anyway.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        with block.buf[:width * height * 4] as pixels:
+            return Image.frombytes('RGBA', (width, height), pixels)
+    finally:
+        block.close()
+        block.unlink()
+
+
+class RenderPool:
+    """
+    Pool of worker processes that render GraphManage graphs in parallel.
+
+    Matplotlib holds the GIL while rendering, so pages showing several graphs
+    render them in separate processes to use every core. Workers are started
+    with the first render. When the store publishes a new snapshot, the next
+    render shares it and starts new workers on it; the previous workers finish
+    their renders before they stop and their shared block is released.
+    """
+    def __init__(self, data, workers=None, start_method='spawn'):
+        """
+        Prepares the pool, no process is started yet.
+        :param data: SnapshotStore followed by the workers, or a DataFrame that does not change.
+        :param workers: Number of processes, defaults to the number of cores.
+        :param start_method: Multiprocessing start method. Forking a process that
+            runs Tk and threads is unsafe, so the window uses clean spawned workers.
+        """
+        self.store = data if isinstance(data, SnapshotStore) else SnapshotStore(data, copy=False)
+        self.workers = workers or os.cpu_count() or 1
+        self.context = multiprocessing.get_context(start_method)
+        self.dataset = None
+        self.executor = None
+        self.version = None
+        self._lock = threading.Lock()
+
+    def _current_executor(self):
+        """
+        Returns the executor of the current snapshot, sharing it and starting
+        an executor first if the snapshot changed since the last render.
+        """
+        with self._lock:
+            snapshot = self.store.current()
+            if self.executor is None or self.version != snapshot.version:
+                self._retire()
+                self.dataset = SharedDataset(snapshot.df)
+                self.version = snapshot.version
+                # Processes are spawned as renders need them, up to max_workers
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=self.context,
+                    initializer=_init_worker,
+                    initargs=(self.dataset.name, self.dataset.rows, self.dataset.layout))
+            return self.executor
+
+    def _retire(self):
+        """
+        Stops the executor of the previous snapshot once its renders are done,
+        then releases its shared block. Called with the lock held.
+        """
+        if self.executor is None:
+            return
+        executor, dataset = self.executor, self.dataset
+        self.executor = self.dataset = None
+
+        def stop():
+            executor.shutdown(wait=True)
+            dataset.close()
+        threading.Thread(target=stop, name='puppy-picker-render-retire', daemon=True).start()
+
+    def submit(self, method, args, size=None):
+        """
+        Renders graph_manage.<method>(*args) in a worker process, on the current snapshot.
+        Returns a future of (width, height, pixels).
+        """
+        return self._current_executor().submit(render_in_worker, method, args, size)
+
+    def run(self, function, *args):
+        """
+        Runs a module level function in a worker process, it can use worker_graph().
+        """
+        return self._current_executor().submit(function, *args)
+
+    def close(self):
+        """
+        Stops the workers and releases the shared dataset.
+        """
+        with self._lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True, cancel_futures=True)
+                self.dataset.close()
+            self.executor = self.dataset = None
@@ -0,0 +1,180 @@
+"""
+Module for scoring many preference profiles on all cores in the Puppy Picker
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+
+# Shared arrays of a worker process, set once by the pool initializer
+_worker_shm = None
+_worker_matrix = None
+_worker_sizes = None
+
+
+def _init_worker(name, rows, columns):
+    """
+    Maps the shared feature matrix and size codes in a worker process.
+    """
+    global _worker_shm, _worker_matrix, _worker_sizes  # pylint: disable=global-statement
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_matrix, _worker_sizes = ShardedScorer.views(_worker_shm, rows, columns)
+
+
+def top_rows(scores, k, offset=0):
+    """
+    Returns the k best rows of every profile of a (profiles, rows) score block
+    and their scores, as two (profiles, k) arrays. Ties go to the lowest row,
+    missing places are row -1 with score -inf.
+    """
+    profiles, rows = scores.shape
+    best_rows = np.full((profiles, k), -1, dtype=np.int64)
+    best_scores = np.full((profiles, k), -np.inf)
+    if rows == 0:
+        return best_rows, best_scores
+    count = min(k, rows)
+    # k-th best score of every profile
+    thresholds = np.partition(scores, rows - count, axis=1)[:, rows - count]
+    for profile in range(profiles):
+        row_scores = scores[profile]
+        above = np.flatnonzero(row_scores > thresholds[profile])
+        tied = np.flatnonzero(row_scores == thresholds[profile])[:count - len(above)]
+        selected = np.concatenate([above, tied])
+        selected = selected[np.lexsort((selected, -row_scores[selected]))]
+        best_rows[profile, :count] = selected + offset
+        best_scores[profile, :count] = row_scores[selected]
+    best_rows[np.isneginf(best_scores)] = -1
+    return best_rows, best_scores
+
+
+def merge_top(rows, scores, k):
+    """
+    Merges candidate (profiles, n) rows and scores into the k best per profile.
+    """
+    order = np.lexsort((np.where(rows < 0, np.iinfo(np.int64).max, rows), -scores), axis=-1)
+    order = order[:, :k]
+    return np.take_along_axis(rows, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def score_shard(start, stop, weights, sizes, k, block_rows):
+    """
+    Scores the rows start:stop of the shared matrix for a batch of profiles
+    and returns the k best rows of every profile.
+    :param weights: (profiles, columns) weights.
+    :param sizes: Size code every profile is limited to, -1 for all sizes.
+    """
+    best_rows = np.full((len(weights), 0), -1, dtype=np.int64)
+    best_scores = np.full((len(weights), 0), -np.inf)
+    filtered = sizes >= 0
+    for block_start in range(start, stop, block_rows):
+        block_stop = min(block_start + block_rows, stop)
+        scores = weights @ _worker_matrix[block_start:block_stop].T
+        if filtered.any():
+            excluded = (_worker_sizes[None, block_start:block_stop] != sizes[:, None]) \
+                & filtered[:, None]
+            scores[excluded] = -np.inf
+        rows, block_scores = top_rows(scores, k, block_start)
+        best_rows, best_scores = merge_top(np.concatenate([best_rows, rows], axis=1),
+                                           np.concatenate([best_scores, block_scores], axis=1),
+                                           k)
+    return best_rows, best_scores
+
+
+class ShardedScorer:
+    """
+    Ranks breeds for batches of preference profiles on a pool of processes.
+
+    The feature matrix and the size codes are copied once into shared memory,
+    which every worker maps at start. The rows are split in shards; a task is
+    a shard and a batch of profiles, so only the profile weights travel to the
+    workers and only the k best rows of each profile come back. The per-shard
+    lists are then merged into the final top-k, with the same order and ties
+    as PuppyPickerModel.find_matching_breeds.
+    """
+    SIZES = ['small', 'medium', 'big']
+    BLOCK_ROWS = 16384
+    PROFILE_BATCH = 64
+
+    def __init__(self, matrix, size_categories, workers=None, shards=None, start_method=None):
+        """
+        Shares the data and starts the workers.
+        :param matrix: (rows, columns) feature matrix.
+        :param size_categories: Size category of every row.
+        :param workers: Number of processes, defaults to the number of cores.
+        :param shards: Number of row shards, defaults to four per worker.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        self.rows, self.columns = matrix.shape
+        self.workers = workers or os.cpu_count() or 1
+        shard_count = max(1, min(shards or self.workers * 4, self.rows))
+        bounds = np.linspace(0, self.rows, shard_count + 1).astype(int)
+        self.shards = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self.shm = shared_memory.SharedMemory(create=True,
+                                              size=max(self.nbytes(self.rows, self.columns), 1))
+        shared_matrix, shared_sizes = self.views(self.shm, self.rows, self.columns)
+        shared_matrix[:] = matrix
+        codes = {size: code for code, size in enumerate(self.SIZES)}
+        shared_sizes[:] = [codes.get(str(size), -2) for size in size_categories]
+        context = multiprocessing.get_context(start_method)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=_init_worker,
+                                            initargs=(self.shm.name, self.rows, self.columns))
+
+    @staticmethod
+    def nbytes(rows, columns):
+        """
+        Returns the size of the shared block: the matrix then one size code per row.
+        """
+        return rows * columns * 8 + rows
+
+    @staticmethod
+    def views(shm, rows, columns):
+        """
+        Returns the matrix and size code arrays of a shared block.
+        """
+        matrix = np.ndarray((rows, columns), dtype=np.float64, buffer=shm.buf)
+        sizes = np.ndarray((rows,), dtype=np.int8, buffer=shm.buf, offset=rows * columns * 8)
+        return matrix, sizes
+
+    def top_k(self, weights, sizes=None, k=5):
+        """
+        Returns the k best rows and their scores for every profile, as two
+        (profiles, k) arrays, row -1 where fewer than k rows match.
+        :param weights: (profiles, columns) weights.
+        :param sizes: Size of every profile, 'small', 'medium', 'big' or 'all'.
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        if weights.shape[1] != self.columns:
+            raise ValueError(f'Profiles need {self.columns} weights')
+        if sizes is None:
+            sizes = ['all'] * len(weights)
+        unknown = set(sizes) - set(self.SIZES) - {'all'}
+        if unknown:
+            raise ValueError(f'Unknown sizes: {", ".join(sorted(unknown))}')
+        codes = np.array([-1 if size == 'all' else self.SIZES.index(size) for size in sizes],
+                         dtype=np.int8)
+        results = []
+        for first in range(0, len(weights), self.PROFILE_BATCH):
+            batch = slice(first, first + self.PROFILE_BATCH)
+            futures = [self.executor.submit(score_shard, start, stop, weights[batch],
+                                            codes[batch], k, self.BLOCK_ROWS)
+                       for start, stop in self.shards]
+            parts = [future.result() for future in futures]
+            results.append(merge_top(np.concatenate([rows for rows, _ in parts], axis=1),
+                                     np.concatenate([scores for _, scores in parts], axis=1),
+                                     k))
+        if not results:
+            return np.empty((0, k), dtype=np.int64), np.empty((0, k))
+        return (np.concatenate([rows for rows, _ in results]),
+                np.concatenate([scores for _, scores in results]))
+
+    def close(self):
+        """
+        Stops the workers and releases the shared memory.
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.shm.close()
+        self.shm.unlink()
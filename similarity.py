@@ -0,0 +1,122 @@
+"""
+Module for finding the breeds most similar to each other in the Puppy Picker
+"""
+
+import numpy as np
+
+
+class BreedSimilarity:
+    """
+    Precomputes the distances between every pair of breeds.
+
+    Columns are scaled to 0-1 and each group of columns (characteristic scores,
+    lifespan, height and weight) is weighted so it counts as much as the others,
+    whatever the number of columns in it. Distances are stored as float32, for
+    large catalogs only the nearest neighbours of every breed are kept.
+    """
+    COLUMN_GROUPS = [
+        ['adaptability', 'all_around_friendliness', 'health_grooming',
+         'trainability', 'exercise_needs'],
+        ['min_life_expectancy', 'max_life_expectancy'],
+        ['min_height_male', 'max_height_male', 'min_height_female', 'max_height_female'],
+        ['min_weight_male', 'max_weight_male', 'min_weight_female', 'max_weight_female'],
+    ]
+    COLUMNS = [column for group in COLUMN_GROUPS for column in group]
+
+    # Above this many breeds only the neighbours are stored, not the full matrix
+    FULL_MATRIX_LIMIT = 4000
+    NEIGHBOURS = 50
+    # Largest (breeds, breeds) distance block computed at once
+    BLOCK_CELLS = 1 << 22
+
+    def __init__(self, df):
+        """
+        Builds the distance matrix, or the neighbour lists, for the breeds of df.
+        """
+        self.breeds = df['breed'].tolist()
+        self.positions = {breed: position for position, breed in enumerate(self.breeds)}
+        self.features = self.normalize(df)
+        self.squared_norms = np.einsum('ij,ij->i', self.features, self.features)
+        rows = len(self.breeds)
+        self.distances = None
+        self.neighbours = None
+        self.neighbour_distances = None
+        if rows <= self.FULL_MATRIX_LIMIT:
+            self.distances = self._block_distances(0, rows)
+        else:
+            self._build_neighbours(min(self.NEIGHBOURS, rows - 1))
+
+    @classmethod
+    def for_snapshot(cls, snapshot):
+        """
+        Returns the similarity engine of a snapshot, built once per snapshot.
+        """
+        return snapshot.derived('similarity', lambda data: cls(data.df))
+
+    def normalize(self, df):
+        """
+        Returns the feature matrix with columns scaled to 0-1 and weighted by group.
+        """
+        values = df[self.COLUMNS].to_numpy(dtype=np.float64)
+        low = np.nanmin(values, axis=0)
+        spread = np.nanmax(values, axis=0) - low
+        spread[spread == 0] = 1
+        values = np.nan_to_num((values - low) / spread, nan=0.5)
+        weights = np.concatenate([np.full(len(group), 1 / np.sqrt(len(group)))
+                                  for group in self.COLUMN_GROUPS])
+        return (values * weights).astype(np.float32)
+
+    def _block_distances(self, start, stop):
+        """
+        Returns the distances between the breeds start:stop and every breed.
+        """
+        block = self.features[start:stop]
+        squared = block @ self.features.T
+        squared *= -2
+        squared += self.squared_norms[start:stop, None]
+        squared += self.squared_norms[None, :]
+        return np.sqrt(np.maximum(squared, 0, out=squared), out=squared)
+
+    def _build_neighbours(self, count):
+        """
+        Keeps only the nearest breeds of every breed, computed one block at a time.
+        """
+        rows = len(self.breeds)
+        self.neighbours = np.empty((rows, count), dtype=np.int32)
+        self.neighbour_distances = np.empty((rows, count), dtype=np.float32)
+        block_rows = max(1, self.BLOCK_CELLS // rows)
+        for start in range(0, rows, block_rows):
+            stop = min(start + block_rows, rows)
+            distances = self._block_distances(start, stop)
+            distances[np.arange(stop - start), np.arange(start, stop)] = np.inf
+            nearest = np.argpartition(distances, count - 1, axis=1)[:, :count]
+            nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+            order = np.argsort(nearest_distances, axis=1)
+            self.neighbours[start:stop] = np.take_along_axis(nearest, order, axis=1)
+            self.neighbour_distances[start:stop] = np.take_along_axis(nearest_distances,
+                                                                      order, axis=1)
+
+    def most_similar(self, breed, k=5):
+        """
+        Returns the k breeds closest to a breed and their distances, closest first.
+        """
+        position = self.positions[breed]
+        if self.distances is not None:
+            row = self.distances[position].copy()
+            row[position] = np.inf
+            k = min(k, len(row) - 1)
+            nearest = np.argpartition(row, k - 1)[:k] if k > 0 else np.array([], dtype=int)
+            nearest = nearest[np.argsort(row[nearest], kind='stable')]
+            distances = row[nearest]
+        else:
+            nearest = self.neighbours[position, :k]
+            distances = self.neighbour_distances[position, :k]
+        return [self.breeds[index] for index in nearest], distances.tolist()
+
+    def distance(self, breed1, breed2):
+        """
+        Returns the distance between two breeds.
+        """
+        first = self.features[self.positions[breed1]]
+        second = self.features[self.positions[breed2]]
+        return float(np.linalg.norm(first - second))
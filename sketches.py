@@ -0,0 +1,261 @@
+"""
+Module for approximate statistics of large breed columns in the Puppy Picker
+"""
+
+import numpy as np
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch.
+
+    Values are kept in levels of compactors, an item at level h stands for
+    2**h values. When a level is full it is sorted and every other item moves
+    up a level, so memory stays around 3k items whatever the number of values.
+    Quantiles have a rank error of about 1.7 / k. Sketches of different parts
+    of the data can be merged.
+    """
+    def __init__(self, k=200, seed=0):
+        """
+        Initializes an empty sketch.
+        :param k: Size of the top level, larger is more accurate.
+        """
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def capacity(self, level):
+        """
+        Returns the number of items a level holds before it is compacted.
+        """
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        """
+        Adds values, missing ones are skipped.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """
+        Adds the values summarized by another sketch.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        """
+        Compacts every level holding more items than its capacity.
+        """
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays at its level so no weight is lost
+                kept = items[:len(items) % 2]
+                paired = items[len(items) % 2:]
+                promoted = paired[int(self._rng.integers(2))::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, fractions):
+        """
+        Returns the approximate values at some fractions of the data, from 0 to 1.
+        """
+        if self.count == 0:
+            return [np.nan for _ in fractions]
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(fractions) * cumulative[-1])
+        return values[np.minimum(positions, len(values) - 1)].tolist()
+
+    def quantile(self, fraction):
+        """
+        Returns the approximate value at a fraction of the data.
+        """
+        return self.quantiles([fraction])[0]
+
+
+class SpaceSaving:
+    """
+    Space-saving heavy hitter sketch.
+
+    Keeps a counter for at most capacity distinct values. A new value takes
+    the place of the smallest counter and inherits its count as error, so any
+    value more frequent than count / capacity is always kept. Counts are exact
+    while there are fewer distinct values than the capacity.
+    """
+    def __init__(self, capacity=64):
+        """
+        Initializes an empty sketch.
+        :param capacity: Number of values counted.
+        """
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+
+    def update(self, values):
+        """
+        Counts values, missing ones are skipped.
+        """
+        values = np.asarray(values).ravel()
+        if values.dtype.kind == 'f':
+            values = values[~np.isnan(values)]
+        distinct, counts = np.unique(values, return_counts=True)
+        # The most frequent values of the batch come first so they are not evicted
+        for position in np.argsort(-counts, kind='stable'):
+            self._add(distinct[position].item(), int(counts[position]))
+
+    def _add(self, value, count):
+        """
+        Adds count occurrences of a value.
+        """
+        if value in self.counts:
+            self.counts[value] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[value] = count
+            self.errors[value] = 0
+        else:
+            smallest = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(smallest)
+            self.errors.pop(smallest)
+            self.counts[value] = floor + count
+            self.errors[value] = floor
+
+    def merge(self, other):
+        """
+        Adds the counts of another sketch, keeping the largest counters.
+        """
+        merged = {value: self.counts.get(value, 0) + other.counts.get(value, 0)
+                  for value in set(self.counts) | set(other.counts)}
+        errors = {value: self.errors.get(value, 0) + other.errors.get(value, 0)
+                  for value in merged}
+        kept = sorted(merged, key=lambda value: (-merged[value], value))[:self.capacity]
+        self.counts = {value: merged[value] for value in kept}
+        self.errors = {value: errors[value] for value in kept}
+
+    def top(self, n=10):
+        """
+        Returns the n most frequent values and their estimated counts, ties by value.
+        """
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+    def mode(self):
+        """
+        Returns the most frequent value, the smallest one on ties.
+        """
+        top = self.top(1)
+        return top[0][0] if top else np.nan
+
+
+class ColumnSketch:
+    """
+    Exact count, mean, minimum and maximum of a numeric column, with a quantile
+    sketch for medians and percentiles and a heavy hitter sketch for the mode.
+    """
+    def __init__(self, k=200, capacity=64):
+        """
+        Initializes an empty sketch.
+        :param k: Size of the top level of the quantile sketch.
+        :param capacity: Number of values counted by the heavy hitter sketch.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.quantile_sketch = KLLSketch(k)
+        self.frequent = SpaceSaving(capacity)
+
+    def update(self, values):
+        """
+        Adds a chunk of values, missing ones are skipped.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self.quantile_sketch.update(values)
+        self.frequent.update(values)
+
+    def merge(self, other):
+        """
+        Adds the values summarized by another ColumnSketch, for example from another worker.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.quantile_sketch.merge(other.quantile_sketch)
+        self.frequent.merge(other.frequent)
+
+    @property
+    def mean(self):
+        """
+        Exact mean of the values, NaN when there is none.
+        """
+        return self.total / self.count if self.count else np.nan
+
+    def percentiles(self, percents):
+        """
+        Returns approximate percentiles, exact at 0 and 100.
+        """
+        values = self.quantile_sketch.quantiles([percent / 100 for percent in percents])
+        return [self.minimum if percent <= 0 else self.maximum if percent >= 100 else value
+                for percent, value in zip(percents, values)]
+
+    def median(self):
+        """
+        Returns the approximate median.
+        """
+        return self.percentiles([50])[0]
+
+    def mode(self):
+        """
+        Returns the most frequent value, the smallest one on ties.
+        """
+        return self.frequent.mode()
+
+    @classmethod
+    def from_values(cls, values, chunk_rows=100000):
+        """
+        Builds the sketch of a column one chunk at a time, merging partial sketches
+        like partial results of parallel workers.
+        """
+        sketch = cls()
+        for start in range(0, len(values), chunk_rows):
+            partial = cls()
+            partial.update(values[start:start + chunk_rows])
+            sketch.merge(partial)
+        return sketch
+
+    @classmethod
+    def for_snapshot(cls, snapshot, column):
+        """
+        Returns the sketch of a column of a snapshot, built once per snapshot.
+        """
+        return snapshot.derived(('column_sketch', column),
+                                lambda data: cls.from_values(data.columns[column]))
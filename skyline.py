@@ -0,0 +1,111 @@
+"""
+Module for finding the breeds with the best trade-offs between criteria in the Puppy Picker
+"""
+
+import numpy as np
+from filters import FilterIndex
+
+
+class Skyline:
+    """
+    Skyline (Pareto-optimal set) of the breeds for some criteria, such as
+    higher friendliness, lower exercise needs and longer lifespan.
+
+    A breed is in the skyline when no other breed is at least as good on every
+    criterion and better on one. Uses sort-filter-skyline: breeds are sorted by
+    the sum of their criteria, so a breed can only be dominated by breeds
+    before it, and compared in blocks with numpy against the skyline found so
+    far, then with each other. Breeds with the same values are compared once.
+    Results are kept with the snapshot per criteria and size.
+    """
+    BLOCK_ROWS = 256
+    DIRECTIONS = ('max', 'min')
+
+    def __init__(self, snapshot, criteria, size='all'):
+        """
+        Computes the skyline.
+        :param criteria: Dictionary of column to 'max' (higher is better) or 'min'.
+        :param size: Size category of the breeds compared, or 'all'.
+        """
+        index = FilterIndex.for_snapshot(snapshot)
+        self.criteria = dict(criteria)
+        if not self.criteria:
+            raise ValueError('A skyline needs at least one criterion')
+        for column, direction in self.criteria.items():
+            if direction not in self.DIRECTIONS:
+                raise ValueError(f'Unknown direction for {column}: {direction}')
+        rows = np.arange(len(snapshot)) if size == 'all' else \
+            index.equals('size_category', size).rows()
+        values = np.column_stack([
+            np.asarray(index.values(column), dtype=np.float64)[rows]
+            * (1 if direction == 'max' else -1)
+            for column, direction in self.criteria.items()])
+        # Breeds without a value for a criterion cannot be compared
+        complete = ~np.isnan(values).any(axis=1)
+        rows, values = rows[complete], values[complete]
+        distinct, inverse = self.distinct_rows(values)
+        best = self.sort_filter(distinct)
+        self.rows = rows[np.isin(inverse, best)]
+        self.names = [snapshot.columns['breed'][row] for row in self.rows]
+
+    @classmethod
+    def for_snapshot(cls, snapshot, criteria, size='all'):
+        """
+        Returns the skyline of a snapshot, computed once per criteria and size.
+        """
+        key = ('skyline', tuple(sorted(criteria.items())), size)
+        return snapshot.derived(key, lambda data: cls(data, criteria, size))
+
+    @staticmethod
+    def distinct_rows(values):
+        """
+        Returns the distinct rows of a 2D array and the position of every row among them.
+        """
+        if len(values) == 0:
+            return values, np.empty(0, dtype=np.int64)
+        order = np.lexsort(values.T[::-1])
+        ordered = values[order]
+        starts = np.concatenate([[True], (ordered[1:] != ordered[:-1]).any(axis=1)])
+        inverse = np.empty(len(values), dtype=np.int64)
+        inverse[order] = np.cumsum(starts) - 1
+        return ordered[starts], inverse
+
+    @classmethod
+    def sort_filter(cls, values):
+        """
+        Returns the positions of the points of a (points, criteria) array that no
+        other point dominates, higher values being better. Points must be distinct.
+        """
+        order = np.argsort(-values.sum(axis=1), kind='stable')
+        window = np.empty((0, values.shape[1]))
+        kept = []
+        for start in range(0, len(order), cls.BLOCK_ROWS):
+            block = order[start:start + cls.BLOCK_ROWS]
+            points = values[block]
+            # Points dominated by the skyline found so far
+            dominated = cls.dominated(window, points)
+            block, points = block[~dominated], points[~dominated]
+            # Then by the other points of the block
+            dominated = cls.dominated(points, points, same=True)
+            block, points = block[~dominated], points[~dominated]
+            window = np.concatenate([window, points])
+            kept.append(block)
+        return np.sort(np.concatenate(kept)) if kept else np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def dominated(window, points, same=False):
+        """
+        Returns whether each point is dominated by a point of the window:
+        at least as high on every criterion and higher on one. Points are
+        distinct, so a window point at least as high is higher on one, except
+        the point itself when the window is the points (same is True).
+        """
+        if len(window) == 0 or len(points) == 0:
+            return np.zeros(len(points), dtype=bool)
+        # One (points, window) comparison per criterion
+        at_least = points[:, 0, None] <= window[None, :, 0]
+        for column in range(1, points.shape[1]):
+            at_least &= points[:, column, None] <= window[None, :, column]
+        if same:
+            np.fill_diagonal(at_least, False)
+        return at_least.any(axis=1)
@@ -0,0 +1,282 @@
+"""
+Module for sharing the breed data between threads in the Puppy Picker
+"""
+
+import itertools
+import sys
+import threading
+import types
+import weakref
+import numpy as np
+import pandas as pd
+
+
+def _read_only(values, copy=True):
+    """
+    Returns an immutable version of a column's values.
+    """
+    if isinstance(values, pd.Categorical):
+        codes = np.array(values.codes, copy=True)
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, dtype=values.dtype)
+    values = np.asarray(values)
+    if copy and values.flags.writeable:
+        values = values.copy()
+    if values.flags.writeable:
+        values = values.view()
+    values.flags.writeable = False
+    return values
+
+
+def _nbytes(value, seen):
+    """
+    Returns the memory held by a value and everything it references, counting
+    every object and array buffer only once across the calls sharing seen.
+    Snapshots and stores referenced by the value are not followed.
+    """
+    if id(value) in seen or isinstance(value, (DatasetSnapshot, SnapshotStore, type,
+                                                types.ModuleType, types.FunctionType,
+                                                types.MethodType)):
+        return 0
+    # Keeps the value alive so its id is not reused by a later temporary
+    seen[id(value)] = value
+    if isinstance(value, np.ndarray):
+        if isinstance(value.base, np.ndarray):
+            # A view costs the array it looks into
+            return _nbytes(value.base, seen)
+        size = value.nbytes
+        if value.dtype == object:
+            # Interned breed names are shared by many rows
+            items = {id(item): item for item in value.flat}
+            size += sum(_nbytes(item, seen) for item in items.values())
+        return size
+    if isinstance(value, pd.RangeIndex):
+        return sys.getsizeof(value)
+    if isinstance(value, pd.DataFrame):
+        return _nbytes(value.index, seen) + sum(_nbytes(value[column], seen)
+                                                for column in value.columns)
+    if isinstance(value, (pd.Series, pd.Index)):
+        return _nbytes(value.array, seen)
+    if isinstance(value, pd.Categorical):
+        return _nbytes(value.codes, seen) + _nbytes(value.categories, seen)
+    if isinstance(value, pd.api.extensions.ExtensionArray):
+        return _nbytes(np.asarray(value), seen)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_nbytes(key, seen) + _nbytes(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_nbytes(item, seen) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += _nbytes(vars(value), seen)
+    return size
+
+
+class DatasetSnapshot:
+    """
+    Immutable version of the breed data.
+
+    Column arrays are read-only and shared with the snapshots published after
+    this one when their column did not change. The DataFrame and anything
+    derived from the snapshot (feature matrices, indexes) are built once and
+    kept with it. Readers must not add or replace columns of df.
+    """
+    # Keys of derived values that can be updated from the previous snapshot's
+    # value when only some rows changed, see carry_forward
+    CARRIED_KEYS = set()
+
+    def __init__(self, columns, version, changed_rows=None, previous_rows=None, carried=None):
+        """
+        Initializes a snapshot from read-only column arrays.
+        :param changed_rows: Rows whose cells differ from the previous snapshot,
+            None when the snapshot was made otherwise.
+        :param previous_rows: DataFrame of the changed rows before the change.
+        :param carried: Derived values of CARRIED_KEYS built on the previous snapshot.
+        """
+        self.columns = columns
+        self.version = version
+        self.changed_rows = changed_rows
+        self.previous_rows = previous_rows
+        self._carried = carried or {}
+        self._df = None
+        self._derived = {}
+
+    @classmethod
+    def carry_forward(cls, key):
+        """
+        Registers a derived value that snapshots made by changing rows receive
+        from the previous snapshot, to update it instead of building it again.
+        """
+        cls.CARRIED_KEYS.add(key)
+
+    def carried(self, key):
+        """
+        Returns the value of a carried key built on the previous snapshot, None if
+        it was not built or this snapshot was not made by changing rows.
+        """
+        return self._carried.get(key)
+
+    @property
+    def df(self):
+        """
+        The snapshot as a DataFrame whose columns are views on the snapshot's arrays.
+        """
+        if self._df is None:
+            self._df = pd.DataFrame(self.columns, copy=False)
+        return self._df
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def derived(self, key, build):
+        """
+        Returns a value computed from the snapshot, built by build(snapshot) the first time.
+        Two threads may build the same value at once, one of the results is kept.
+        """
+        if key not in self._derived:
+            self._derived.setdefault(key, build(self))
+        return self._derived[key]
+
+    def cached(self, key):
+        """
+        Returns a value derived from the snapshot if it was built, None otherwise.
+        """
+        return self._derived.get(key)
+
+    def memory_usage(self, seen=None):
+        """
+        Returns the bytes held by the columns of the snapshot and every value
+        derived from it, such as indexes, sketches and graph data.
+        :param seen: Dictionary of the objects already counted by id, to count shared arrays once.
+        """
+        seen = {} if seen is None else seen
+        return (sum(_nbytes(values, seen) for values in self.columns.values())
+                + _nbytes(self._df, seen) + _nbytes(dict(self._derived), seen)
+                + _nbytes(self._carried, seen) + _nbytes(self.previous_rows, seen))
+
+    def matrix(self, columns):
+        """
+        Returns a read-only float64 matrix of some numeric columns, built once per snapshot.
+        """
+        def build(snapshot):
+            matrix = np.column_stack([np.asarray(snapshot.columns[column], dtype=np.float64)
+                                      for column in columns])
+            matrix.flags.writeable = False
+            return matrix
+        return self.derived(('matrix', tuple(columns)), build)
+
+
+class SnapshotStore:
+    """
+    Publishes versions of the breed data for concurrent readers.
+
+    Readers call current() and keep the returned snapshot as long as they need
+    a consistent view, without taking any lock. Writers publish a new snapshot
+    atomically; only the columns they change are copied, the others are shared.
+    A snapshot is released as soon as the last reader drops its reference.
+    """
+    def __init__(self, df, copy=True):
+        """
+        Publishes the first snapshot of the data.
+        :param copy: Copy writable columns so later changes to df are not seen.
+        """
+        self._versions = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._alive = weakref.WeakValueDictionary()
+        self._current = None
+        # Measured memory, with the versions it was measured for
+        self._usage = None
+        self.replace(df, copy)
+
+    def current(self):
+        """
+        Returns the latest snapshot.
+        """
+        return self._current
+
+    def _publish(self, columns, changed_rows=None):
+        """
+        Makes a new snapshot the current one. Called with the write lock held.
+        :param changed_rows: Rows whose cells differ from the current snapshot,
+            when no other change was made.
+        """
+        previous_rows = None
+        carried = {}
+        if changed_rows is not None:
+            carried = {key: self._current.cached(key) for key in DatasetSnapshot.CARRIED_KEYS
+                       if self._current.cached(key) is not None}
+            if carried:
+                previous_rows = self._current.df.iloc[changed_rows]
+        snapshot = DatasetSnapshot(columns, next(self._versions), changed_rows, previous_rows,
+                                   carried)
+        self._alive[snapshot.version] = snapshot
+        self._current = snapshot
+        return snapshot
+
+    def replace(self, df, copy=True):
+        """
+        Publishes a snapshot holding all the rows and columns of df.
+        """
+        columns = {column: _read_only(df[column].array if isinstance(df[column].dtype,
+                                                                     pd.CategoricalDtype)
+                                      else df[column].to_numpy(), copy)
+                   for column in df.columns}
+        with self._write_lock:
+            return self._publish(columns)
+
+    def update_columns(self, changes):
+        """
+        Publishes a snapshot where some columns are replaced or added.
+        :param changes: Dictionary of column name to new values, or None to drop a column.
+        """
+        with self._write_lock:
+            columns = dict(self._current.columns)
+            for column, values in changes.items():
+                if values is None:
+                    columns.pop(column, None)
+                else:
+                    if len(values) != len(self._current):
+                        raise ValueError(f'Column {column} does not have one value per row')
+                    columns[column] = _read_only(values)
+            return self._publish(columns)
+
+    def update_rows(self, rows, changes):
+        """
+        Publishes a snapshot where some cells are changed. Only the columns
+        named in changes are copied.
+        :param rows: Row positions to change.
+        :param changes: Dictionary of column name to the new values of those rows.
+        """
+        with self._write_lock:
+            columns = dict(self._current.columns)
+            for column, values in changes.items():
+                old = columns[column]
+                if isinstance(old, pd.Categorical):
+                    new = old.copy()
+                    new[rows] = values
+                else:
+                    new = np.array(old, copy=True)
+                    new[rows] = values
+                columns[column] = _read_only(new, copy=False)
+            return self._publish(columns, np.unique(np.arange(len(self._current))[rows]))
+
+    def memory_usage(self):
+        """
+        Returns the bytes held by the snapshots still referenced, columns shared
+        between versions counted once. Walking every derived value is slow, so the
+        size is measured again only once a snapshot was published or released;
+        values derived in between are counted from the next measure.
+        """
+        snapshots = list(self._alive.values())
+        versions = tuple(sorted(snapshot.version for snapshot in snapshots))
+        usage = self._usage
+        if usage is None or usage[0] != versions:
+            seen = {}
+            usage = (versions, sum(snapshot.memory_usage(seen) for snapshot in snapshots))
+            self._usage = usage
+        return usage[1]
+
+    def live_versions(self):
+        """
+        Returns the versions of the snapshots still referenced by a reader.
+        """
+        return sorted(self._alive.keys())
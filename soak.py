@@ -0,0 +1,217 @@
+"""
+Module for checking that the memory of the Puppy Picker stays bounded over a long session
+"""
+
+import ctypes
+import gc
+import os
+import random
+import time
+import tracemalloc
+from journeys import JOURNEYS, journey_cycle
+
+
+def resident_memory():
+    """
+    Returns the resident memory of the process in bytes.
+    """
+    try:
+        with open('/proc/self/statm', encoding='ascii') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource  # pylint: disable=import-outside-toplevel
+        # Peak rather than current memory, still enough to see steady growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def release_free_memory():
+    """
+    Gives the free pages of the C heap back to the system where glibc can,
+    so resident memory follows the memory in use rather than what the
+    allocator keeps in reserve after rendering a large graph.
+    """
+    try:
+        ctypes.CDLL(None).malloc_trim(0)
+    except (AttributeError, OSError, TypeError):
+        pass
+
+
+class SoakTest:
+    """
+    Replays user journeys through the controller for a long time and watches memory.
+
+    After every step the event loop is pumped until the graphs of the page are
+    rendered and shown, like a user waiting for the page. Every sample_every
+    interactions the garbage collector runs, free heap pages are released and
+    the resident memory is recorded, with the memory traced by tracemalloc when
+    tracing. Samples taken during the warm-up are ignored, caches and pools
+    fill up there: matplotlib's text layout cache is full after about 200
+    interactions and resident memory levels off before 2000. The test fails
+    when memory after the warm-up grows by more than the allowed amount or
+    keeps growing at a steady rate.
+    """
+    def __init__(self, controller, interactions=3000, sample_every=100, warmup=2000,
+                 max_growth_mb=25, max_slope_kb=1024, seed=0, settle_timeout=30, trace=False):
+        """
+        Initializes the test.
+        :param controller: PuppyPickerController whose view is driven.
+        :param interactions: Number of steps to replay.
+        :param sample_every: Steps between two memory samples.
+        :param warmup: Steps before the reference sample.
+        :param max_growth_mb: Allowed growth of resident or traced memory after the warm-up.
+        :param max_slope_kb: Allowed trend of resident memory, in KB per 1000
+            interactions. Resident memory moves by about a megabyte between samples,
+            longer runs can check a smaller trend.
+        :param settle_timeout: Seconds to wait for the graphs of a step.
+        :param trace: Also trace allocations with tracemalloc to list the lines that
+            allocated the most. Steps take about four times as long, and the
+            bookkeeping of tracemalloc slowly adds to the resident memory.
+        """
+        self.controller = controller
+        self.interactions = interactions
+        self.sample_every = sample_every
+        self.warmup = warmup
+        self.max_growth = max_growth_mb * 1024 * 1024
+        self.max_slope = max_slope_kb * 1024
+        self.seed = seed
+        self.settle_timeout = settle_timeout
+        self.trace = trace
+        self.samples = []
+        self.errors = 0
+        self._reference_snapshot = None
+        self._final_snapshot = None
+
+    def settle(self):
+        """
+        Processes Tk events until every requested graph is shown.
+        """
+        view = self.controller.view
+        deadline = time.perf_counter() + self.settle_timeout
+        view.update()
+        while not view.chart_renderer.idle() and time.perf_counter() < deadline:
+            time.sleep(0.002)
+            view.update()
+
+    def sample(self, interactions):
+        """
+        Records the memory after a full garbage collection.
+        """
+        gc.collect()
+        release_free_memory()
+        rss = resident_memory()
+        traced = 0
+        if tracemalloc.is_tracing():
+            traced, _ = tracemalloc.get_traced_memory()
+            # The traces grow with every new call stack seen, they are not the application's
+            rss -= tracemalloc.get_tracemalloc_memory()
+        self.samples.append({'interactions': interactions, 'rss': rss, 'traced': traced})
+        if interactions >= self.warmup and self._reference_snapshot is None \
+                and tracemalloc.is_tracing():
+            self._reference_snapshot = tracemalloc.take_snapshot()
+
+    def steps(self):
+        """
+        Yields the (step name, action) pairs of the journeys, forever.
+        """
+        rng = random.Random(self.seed)
+        for name in journey_cycle(self.seed):
+            yield from JOURNEYS[name](self.controller, rng)
+
+    def run(self):
+        """
+        Replays the interactions and returns the report.
+        """
+        started = self.trace and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            self.sample(0)
+            steps = self.steps()
+            for interaction in range(1, self.interactions + 1):
+                _, action = next(steps)
+                try:
+                    action()
+                except Exception:  # pylint: disable=broad-except
+                    self.errors += 1
+                self.settle()
+                if interaction % self.sample_every == 0 or interaction == self.interactions:
+                    self.sample(interaction)
+            if tracemalloc.is_tracing():
+                self._final_snapshot = tracemalloc.take_snapshot()
+        finally:
+            if started:
+                tracemalloc.stop()
+        return self.report()
+
+    @staticmethod
+    def slope(points):
+        """
+        Returns the least squares slope of (x, y) points.
+        """
+        if len(points) < 2:
+            return 0.0
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        spread = sum((x - mean_x) ** 2 for x, _ in points)
+        if spread == 0:
+            return 0.0
+        return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+    def report(self, top=10):
+        """
+        Returns the memory growth after the warm-up, its trend, the places
+        that allocated the most since the warm-up and the failed checks.
+        """
+        steady = [sample for sample in self.samples if sample['interactions'] >= self.warmup]
+        if not steady:
+            steady = self.samples[-1:]
+        first, last = steady[0], steady[-1]
+        rss_growth = last['rss'] - first['rss']
+        traced_growth = last['traced'] - first['traced']
+        # Bytes per 1000 interactions
+        rss_slope = self.slope([(sample['interactions'] / 1000, sample['rss'])
+                                for sample in steady])
+        failures = []
+        if self.errors:
+            failures.append(f'{self.errors} interactions raised an error')
+        if rss_growth > self.max_growth:
+            failures.append(f'resident memory grew by {rss_growth / 2 ** 20:.1f} MB')
+        if traced_growth > self.max_growth:
+            failures.append(f'traced memory grew by {traced_growth / 2 ** 20:.1f} MB')
+        if len(steady) >= 3 and rss_slope > self.max_slope:
+            failures.append(f'resident memory grows by {rss_slope / 1024:.0f} KB '
+                            f'every 1000 interactions')
+        growth = []
+        if self._reference_snapshot is not None and self._final_snapshot is not None:
+            for stat in self._final_snapshot.compare_to(self._reference_snapshot,
+                                                        'lineno')[:top]:
+                frame = stat.traceback[0]
+                growth.append({'location': f'{os.path.basename(frame.filename)}:{frame.lineno}',
+                               'size_diff': stat.size_diff, 'count_diff': stat.count_diff})
+        return {'interactions': self.samples[-1]['interactions'] if self.samples else 0,
+                'errors': self.errors,
+                'rss_start': first['rss'], 'rss_end': last['rss'],
+                'rss_growth': rss_growth, 'traced_growth': traced_growth,
+                'rss_slope_per_1000': rss_slope, 'traced': self._final_snapshot is not None,
+                'top_growth': growth,
+                'samples': self.samples, 'failures': failures}
+
+    @staticmethod
+    def format_report(report):
+        """
+        Returns the report as text for the console.
+        """
+        lines = [f'{report["interactions"]} interactions, {report["errors"]} errors',
+                 f'Resident memory after warm-up: {report["rss_start"] / 2 ** 20:.1f} MB -> '
+                 f'{report["rss_end"] / 2 ** 20:.1f} MB '
+                 f'({report["rss_slope_per_1000"] / 1024:+.0f} KB per 1000 interactions)']
+        if report['traced']:
+            lines.append(f'Traced memory growth: {report["traced_growth"] / 2 ** 20:+.2f} MB')
+        if report['top_growth']:
+            lines.append('Largest allocation growth since the warm-up:')
+            for entry in report['top_growth']:
+                lines.append(f'  {entry["size_diff"] / 1024:+10.1f} KB '
+                             f'{entry["count_diff"]:+8d} blocks  {entry["location"]}')
+        lines.append('FAILED: ' + '; '.join(report['failures']) if report['failures']
+                     else 'PASSED')
+        return '\n'.join(lines)
@@ -0,0 +1,165 @@
+"""
+Module for detecting stalls of the Tk event loop in the Puppy Picker
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class StallMonitor:
+    """
+    Watchdog for the Tk main loop.
+
+    A heartbeat is scheduled with after() on the Tk thread and the drift between
+    the expected and the actual time of each beat is measured. A helper thread
+    notices when the heartbeat is late and captures the main thread's stack while
+    the stall is still happening, so the report shows which code blocked the UI.
+    """
+    # Modules of the Puppy Picker, whose frames are reported as app code
+    APP_FILES = frozenset(name for name in os.listdir(os.path.dirname(os.path.abspath(__file__)))
+                          if name.endswith('.py'))
+
+    def __init__(self, root, interval_ms=50, threshold_ms=200, max_stalls=1000):
+        """
+        Initializes the monitor.
+        :param root: The Tk window whose event loop is watched.
+        :param interval_ms: Time between two heartbeats.
+        :param threshold_ms: Heartbeats later than this are reported as stalls.
+        :param max_stalls: Number of individual stalls kept for the report.
+        """
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.max_stalls = max_stalls
+        self.stalls = []
+        self.stall_count = 0
+        self.leaf_frames = Counter()
+        self.app_frames = Counter()
+        self._lock = threading.Lock()
+        self._main_thread_id = threading.get_ident()
+        self._expected = None
+        self._last_beat = None
+        self._current_stacks = []
+        self._after_id = None
+        self._running = False
+        self._watcher = None
+
+    def start(self):
+        """
+        Starts the heartbeat and the helper thread. Must be called from the Tk thread.
+        """
+        self._main_thread_id = threading.get_ident()
+        self._running = True
+        self._last_beat = time.perf_counter()
+        self._expected = self._last_beat + self.interval
+        self._after_id = self.root.after(int(self.interval * 1000), self._beat)
+        self._watcher = threading.Thread(target=self._watch, name='puppy-picker-stall-watch',
+                                         daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """
+        Stops the heartbeat and the helper thread.
+        """
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:  # pylint: disable=broad-except
+                pass
+            self._after_id = None
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _beat(self):
+        """
+        Heartbeat run on the Tk thread, records a stall when it arrives late.
+        """
+        now = time.perf_counter()
+        drift = now - self._expected
+        with self._lock:
+            stacks, self._current_stacks = self._current_stacks, []
+            self._last_beat = now
+        if drift >= self.threshold:
+            self._record(drift, stacks)
+        self._expected = now + self.interval
+        if self._running:
+            self._after_id = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _watch(self):
+        """
+        Helper thread that samples the main thread's stack while a heartbeat is late.
+        """
+        poll = min(self.interval, self.threshold) / 2
+        while self._running:
+            time.sleep(poll)
+            with self._lock:
+                late = time.perf_counter() - self._last_beat - self.interval
+                if late < self.threshold:
+                    continue
+                frame = sys._current_frames().get(self._main_thread_id)
+                if frame is not None:
+                    self._current_stacks.append(self.describe_stack(frame))
+
+    @staticmethod
+    def describe_stack(frame):
+        """
+        Returns the frames of a stack as 'file:function:line' strings, innermost first.
+        """
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+            frame = frame.f_back
+        return stack
+
+    def _record(self, drift, stacks):
+        """
+        Stores a stall together with the stacks sampled while it was happening.
+        """
+        self.stall_count += 1
+        if len(self.stalls) < self.max_stalls:
+            self.stalls.append({'duration_ms': drift * 1000,
+                                'stack': stacks[0] if stacks else []})
+        for stack in stacks:
+            self.leaf_frames[stack[0]] += 1
+            for entry in stack:
+                if entry.split(':')[0] in self.APP_FILES:
+                    self.app_frames[entry.rsplit(':', 1)[0]] += 1
+                    break
+
+    def report(self, top=10):
+        """
+        Returns the stall count, duration statistics and the most frequent frames.
+        """
+        durations = sorted(stall['duration_ms'] for stall in self.stalls)
+        summary = {'stall_count': self.stall_count,
+                   'threshold_ms': self.threshold * 1000,
+                   'total_ms': sum(durations),
+                   'max_ms': durations[-1] if durations else 0,
+                   'mean_ms': sum(durations) / len(durations) if durations else 0,
+                   'p95_ms': durations[int(0.95 * (len(durations) - 1))] if durations else 0,
+                   'top_app_frames': self.app_frames.most_common(top),
+                   'top_leaf_frames': self.leaf_frames.most_common(top)}
+        return summary
+
+    def format_report(self, top=10):
+        """
+        Returns the report as readable text.
+        """
+        summary = self.report(top)
+        lines = [f'Event loop stalls over {summary["threshold_ms"]:.0f} ms: '
+                 f'{summary["stall_count"]}',
+                 f'Total {summary["total_ms"]:.0f} ms, max {summary["max_ms"]:.0f} ms, '
+                 f'mean {summary["mean_ms"]:.0f} ms, p95 {summary["p95_ms"]:.0f} ms']
+        if summary['top_app_frames']:
+            lines.append('Application frames seen during stalls:')
+            lines += [f'  {count:6d}  {frame}' for frame, count in summary['top_app_frames']]
+        if summary['top_leaf_frames']:
+            lines.append('Innermost frames seen during stalls:')
+            lines += [f'  {count:6d}  {frame}' for frame, count in summary['top_leaf_frames']]
+        return '\n'.join(lines)
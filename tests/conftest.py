@@ -0,0 +1,50 @@
+"""
+Shared data of the tests of the Puppy Picker
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from graph_manage import GraphManage  # pylint: disable=wrong-import-position
+from snapshot import SnapshotStore  # pylint: disable=wrong-import-position
+
+
+@pytest.fixture(scope='session')
+def breeds():
+    """
+    The breeds of breeds.csv with their derived columns.
+    """
+    return GraphManage.load_data(os.path.join(ROOT, 'breeds.csv'))
+
+
+@pytest.fixture(scope='session')
+def many_breeds(breeds):
+    """
+    20000 breeds made from the real ones with random ratings and measurements,
+    some of them missing, so the data has many distinct rows and ties.
+    """
+    rng = np.random.default_rng(7)
+    rows = 20000
+    df = breeds.iloc[rng.integers(0, len(breeds), rows)].reset_index(drop=True).copy()
+    df['breed'] = [f'Breed {row}' for row in range(rows)]
+    for column in ['adaptability', 'all_around_friendliness', 'health_grooming',
+                   'trainability', 'exercise_needs']:
+        df[column] = rng.integers(1, 6, rows)
+    for column in ['min_weight_male', 'max_weight_male', 'min_weight_female',
+                   'max_weight_female']:
+        df[column] = rng.integers(5, 150, rows).astype(np.float64)
+    df['average_lifespan'] = rng.integers(16, 32, rows) / 2
+    df.loc[rng.random(rows) < 0.01, 'max_weight_male'] = np.nan
+    return df
+
+
+def snapshot_of(df):
+    """
+    Returns the snapshot of a DataFrame.
+    """
+    return SnapshotStore(df).current()
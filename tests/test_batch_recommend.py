@@ -0,0 +1,35 @@
+"""
+Tests of the batch recommender against finding the matching breeds row by row
+"""
+
+import numpy as np
+import pandas as pd
+from batch_recommend import BatchRecommender
+from model import PuppyPickerModel
+from snapshot import SnapshotStore
+
+
+def test_batch_matches_find_matching_breeds(breeds, tmp_path):
+    model = PuppyPickerModel(store=SnapshotStore(breeds))
+    rng = np.random.default_rng(3)
+    rows = 500
+    preferences = pd.DataFrame(rng.integers(0, 4, (rows, len(model.COLUMNS))).astype(str),
+                               columns=model.COLUMNS)
+    preferences['size'] = rng.choice(['all', 'small', 'medium', 'big'], rows)
+    preferences.loc[3, 'adaptability'] = '7'
+    preferences.loc[5, 'size'] = 'huge'
+    preferences.loc[8, 'trainability'] = ''
+    input_path, output_path = tmp_path / 'prefs.csv', tmp_path / 'out.csv'
+    preferences.to_csv(input_path, index=False)
+
+    report = BatchRecommender(model, chunk_rows=64).run(str(input_path), str(output_path))
+    assert report['rows'] == rows
+    assert report['rejected_by_reason'] == {'missing': 1, 'invalid_weight': 1,
+                                            'invalid_size': 1}
+
+    output = pd.read_csv(output_path).set_index('row')
+    assert sorted(output.index) == sorted(set(range(rows)) - {3, 5, 8})
+    for row, result in output.iterrows():
+        names, scores = model.find_matching_breeds(preferences.iloc[row].tolist())
+        assert result[[f'breed_{place}' for place in range(1, 6)]].tolist() == names
+        assert np.allclose(result[[f'score_{place}' for place in range(1, 6)]].tolist(), scores)
@@ -0,0 +1,21 @@
+"""
+Tests of the search-as-you-type index of the breed names
+"""
+
+from breed_search import BreedSearch
+
+
+def test_empty_text_gives_a_capped_list(many_breeds):
+    search = BreedSearch(many_breeds['breed'])
+    names = sorted(set(many_breeds['breed']), key=BreedSearch.normalize)
+    assert search.search('') == names[:BreedSearch.LIMIT]
+    assert search.search('', limit=5) == names[:5]
+
+
+def test_typed_text_finds_names_beyond_the_first_page(breeds):
+    search = BreedSearch(breeds['breed'])
+    assert 'Yorkshire Terrier' not in search.search('')
+    assert search.search('york')[0] == 'Yorkshire Terrier'
+    assert 'Golden Retriever' in search.search('retr')
+    assert 'Golden Retriever' in search.search('retreiver')
+    assert search.resolve('golden retriever') == 'Golden Retriever'
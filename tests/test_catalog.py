@@ -0,0 +1,51 @@
+"""
+Tests of the catalogs kept in memory under a budget
+"""
+
+import numpy as np
+from catalog import CatalogRegistry
+from snapshot import SnapshotStore
+
+
+def registry_of(tmp_path, breeds, names, budget_bytes=None):
+    """
+    Returns a registry of catalogs written from the breed data, one file each.
+    """
+    registry = CatalogRegistry(budget_bytes)
+    for name in names:
+        path = tmp_path / f'{name}.csv'
+        breeds.to_csv(path, index=False)
+        registry.register(name, str(path))
+    return registry
+
+
+def test_least_recently_used_catalogs_are_unloaded_over_budget(tmp_path, breeds):
+    size = registry_of(tmp_path, breeds, ['one']).open('one').memory_usage()
+    registry = registry_of(tmp_path, breeds, ['a', 'b', 'c'], budget_bytes=int(size * 2.5))
+    registry.open('a')
+    registry.open('b')
+    assert registry.loaded() == ['a', 'b']
+    registry.open('c')
+    assert registry.loaded() == ['b', 'c']
+    assert not registry.catalogs['a'].loaded
+    registry.open('b')
+    registry.open('a')
+    assert registry.loaded() == ['b', 'a']
+    assert registry.memory_usage() <= registry.budget_bytes
+
+
+def test_catalog_being_opened_is_kept_over_budget(tmp_path, breeds):
+    registry = registry_of(tmp_path, breeds, ['a', 'b'], budget_bytes=1)
+    registry.open('a')
+    registry.open('b')
+    assert registry.loaded() == ['b']
+
+
+def test_memory_is_measured_again_once_a_version_is_published(breeds):
+    store = SnapshotStore(breeds)
+    first = store.current()
+    size = store.memory_usage()
+    first.derived('large', lambda data: np.zeros(100000))
+    assert store.memory_usage() == size
+    store.update_rows([0], {'average_lifespan': [20.0]})
+    assert store.memory_usage() >= size + 800000
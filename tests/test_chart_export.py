@@ -0,0 +1,34 @@
+"""
+Tests of exporting the breed graphs, skipping the unchanged ones
+"""
+
+import os
+from chart_export import BREED_CHARTS, ChartExporter
+
+
+def test_only_changed_graphs_are_rendered_again(tmp_path, breeds):
+    df = breeds.copy()
+    selected = ['Beagle', 'Pug']
+    compared = [('Beagle', 'Pug')]
+    charts = len(selected) * len(BREED_CHARTS) + len(compared)
+    output = str(tmp_path)
+
+    first = ChartExporter(output, df, workers=1).export(selected, compared)
+    assert (first['rendered'], first['skipped']) == (charts, 0)
+    assert os.path.exists(os.path.join(output, 'beagle', 'char_bar.png'))
+    assert os.path.exists(os.path.join(output, 'compare', 'beagle__pug.png'))
+
+    again = ChartExporter(output, df, workers=1).export(selected, compared)
+    assert (again['rendered'], again['skipped']) == (0, charts)
+
+    # A change to one breed only renders its graphs and the comparisons it is in
+    df.loc[df['breed'] == 'Pug', 'trainability'] = 1
+    changed = ChartExporter(output, df, workers=1).export(selected, compared)
+    assert changed['rendered'] == len(BREED_CHARTS) + 1
+
+    os.remove(os.path.join(output, 'beagle', 'male_bar.png'))
+    missing = ChartExporter(output, df, workers=1).export(selected, compared)
+    assert missing['rendered'] == 1
+
+    forced = ChartExporter(output, df, workers=1).export(selected, compared, force=True)
+    assert forced['rendered'] == charts
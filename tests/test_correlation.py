@@ -0,0 +1,49 @@
+"""
+Tests of the correlation matrices kept up to date as the breed data changes
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from correlation import CorrelationService
+from snapshot import SnapshotStore
+
+
+def expected(df, columns, method='pearson'):
+    """
+    Returns the correlations pandas computes on the complete rows of df.
+    """
+    return df[columns].dropna().corr(method=method)
+
+
+def test_matrices_match_pandas(breeds):
+    service = CorrelationService(breeds)
+    complete = breeds[service.columns].dropna()
+    for method in CorrelationService.METHODS:
+        pd.testing.assert_frame_equal(service.matrix(method), expected(breeds, service.columns,
+                                                                       method))
+    first, second = service.columns[:2]
+    assert service.pair(first, second) == pytest.approx(complete[first].corr(complete[second]))
+
+
+def test_row_updates_match_a_fresh_computation(many_breeds):
+    store = SnapshotStore(many_breeds)
+    CorrelationService.for_snapshot(store.current())
+    rng = np.random.default_rng(0)
+    columns = ['average_lifespan', 'max_weight_male', 'min_weight_female']
+    for _ in range(5):
+        rows = rng.choice(len(many_breeds), size=50, replace=False)
+        values = rng.uniform(1, 60, size=50)
+        # Missing values are added and removed as well
+        values[:5] = np.nan
+        snapshot = store.update_rows(rows, {columns[rng.integers(3)]: values})
+        service = CorrelationService.for_snapshot(snapshot)
+        assert snapshot.carried('correlations') is not None
+        fresh = CorrelationService(snapshot.df)
+        assert service.count == fresh.count
+        np.testing.assert_allclose(service.pearson(), fresh.pearson(), atol=1e-9)
+        np.testing.assert_allclose(service.pearson(), expected(snapshot.df, service.columns),
+                                   atol=1e-9)
+        np.testing.assert_allclose(service.spearman(),
+                                   expected(snapshot.df, service.columns, 'spearman'),
+                                   atol=1e-9)
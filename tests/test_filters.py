@@ -0,0 +1,111 @@
+"""
+Tests of the bitmaps and the filter index against filtering every row
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import ROOT, snapshot_of
+from filters import Bitmap, FilterIndex
+
+
+@pytest.mark.parametrize('size', [1, 7, 8, 13, 1000])
+def test_bitmap_operations(size):
+    rng = np.random.default_rng(size)
+    first, second = rng.random(size) < 0.5, rng.random(size) < 0.3
+    left, right = Bitmap.from_mask(first), Bitmap.from_mask(second)
+    assert np.array_equal((left & right).mask(), first & second)
+    assert np.array_equal((left | right).mask(), first | second)
+    assert np.array_equal((~left).mask(), ~first)
+    assert (~left).count() == int((~first).sum())
+    assert np.array_equal(left.rows(), np.flatnonzero(first))
+    assert np.array_equal(Bitmap.from_rows(np.flatnonzero(second), size).mask(), second)
+    assert Bitmap.full(size).count() == size
+
+
+def brute_force(df, predicates):
+    """
+    Returns the rows matching every predicate by testing every row.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, operator, value in predicates:
+        if column == 'average_weight':
+            values = df[['min_weight_male', 'max_weight_male', 'min_weight_female',
+                         'max_weight_female']].to_numpy(dtype=np.float64).mean(axis=1)
+        else:
+            values = df[column].to_numpy()
+        if operator in ('==', 'in', '!='):
+            wanted = [value] if isinstance(value, str) else value
+            matches = np.isin(values.astype(object), wanted)
+            mask &= ~(matches | pd.isna(values)) if operator == '!=' else matches
+        else:
+            values = values.astype(np.float64)
+            with np.errstate(invalid='ignore'):
+                if operator == 'between':
+                    mask &= (values >= value[0]) & (values <= value[1])
+                else:
+                    mask &= {'<': values < value, '<=': values <= value,
+                             '>': values > value, '>=': values >= value}[operator]
+    return np.flatnonzero(mask)
+
+
+PREDICATES = [
+    [],
+    [('breed_group', '==', 'Herding Dogs')],
+    [('breed_group', 'in', ['Herding Dogs', 'Working Dogs']), ('average_weight', '<', 50),
+     ('average_lifespan', '>=', 12)],
+    [('breed_group', '!=', 'Toy Dogs'), ('size_category', '!=', 'big')],
+    [('max_weight_male', 'between', (20, 60)), ('adaptability', '>', 2)],
+    [('average_lifespan', '<=', 11), ('trainability', '<', 4), ('size_category', 'in', ['small'])],
+    [('max_weight_male', '>=', 1000)],
+    [('max_weight_male', '!=', 60), ('adaptability', '==', 3)],
+    [('max_weight_male', 'in', [40, 60, 80])],
+]
+
+
+@pytest.mark.parametrize('predicates', PREDICATES)
+def test_select_matches_brute_force(breeds, many_breeds, predicates):
+    for df in (breeds, many_breeds):
+        index = FilterIndex.for_snapshot(snapshot_of(df))
+        assert np.array_equal(index.select(predicates).rows(), brute_force(df, predicates))
+
+
+def test_unknown_column_and_operator(breeds):
+    index = FilterIndex.for_snapshot(snapshot_of(breeds))
+    with pytest.raises(ValueError):
+        index.select([('colour', '==', 'black')])
+    with pytest.raises(ValueError):
+        index.select([('adaptability', '~', 3)])
+
+
+@pytest.mark.parametrize('column', ['max_weight_male', 'min_weight_male', 'max_height_female',
+                                    'min_height_male'])
+def test_bounds_match_the_file_values(breeds, column):
+    """
+    Measurements are stored as float32, bounds typed as in the file must
+    select the same breeds as the file's values.
+    """
+    raw = pd.read_csv(os.path.join(ROOT, 'breeds.csv'), encoding='utf-8-sig')[column]
+    index = FilterIndex.for_snapshot(snapshot_of(breeds))
+    for value in raw.dropna().unique().tolist():
+        for operator, expected in [('<=', raw <= value), ('<', raw < value),
+                                   ('>=', raw >= value), ('>', raw > value),
+                                   ('==', raw == value), ('!=', raw.notna() & (raw != value)),
+                                   ('in', raw == value)]:
+            rows = index.select([(column, operator, value)]).rows()
+            assert np.array_equal(rows, np.flatnonzero(expected)), (operator, value)
+        rows = index.select([(column, 'between', (value, value + 1))]).rows()
+        assert np.array_equal(rows, np.flatnonzero(raw.between(value, value + 1)))
+
+
+def test_missing_values_match_no_predicate():
+    df = pd.DataFrame({'breed': ['a', 'b', 'c', 'd'],
+                       'weight': np.array([10.5, np.nan, 20.25, 10.5], dtype=np.float32),
+                       'group': pd.Categorical(['Toy', None, 'Hound', 'Toy'])})
+    index = FilterIndex.for_snapshot(snapshot_of(df))
+    assert index.select([('weight', '!=', 10.5)]).rows().tolist() == [2]
+    assert index.select([('weight', '==', 10.5)]).rows().tolist() == [0, 3]
+    assert index.select([('weight', '<', 100)]).rows().tolist() == [0, 2, 3]
+    assert index.select([('group', '!=', 'Toy')]).rows().tolist() == [2]
+    assert index.select([('group', 'in', ['Toy', 'Hound'])]).rows().tolist() == [0, 2, 3]
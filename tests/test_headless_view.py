@@ -0,0 +1,29 @@
+"""
+Tests of the pages of the headless view
+"""
+
+from controller import PuppyPickerController
+
+
+def test_breed_information_follows_data_updates():
+    controller = PuppyPickerController(headless=True)
+    view = controller.view
+    view.selected_breed_combo.set('Beagle')
+    view.dog_info_page()
+    group = view.breed_info['breed_group']
+    store = controller.model.store
+    row = controller.graph_manage.breed_positions(store.current())['Beagle']
+    other = 'Working Dogs' if group != 'Working Dogs' else 'Hound Dogs'
+    store.update_rows([row], {'breed_group': other})
+    view.dog_info_page()
+    assert view.breed_info['breed_group'] == other
+
+
+def test_no_matching_breed():
+    controller = PuppyPickerController(headless=True)
+    names, scores = controller.model.find_matching_breeds(['1'] * 6 + ['all'],
+                                                          [('average_lifespan', '>', 100)])
+    controller.view.find_breeds_page4(names, scores)
+    assert controller.view.shortlist == []
+    controller.next_button_handler(4)
+    assert controller.view.errors
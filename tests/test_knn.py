@@ -0,0 +1,54 @@
+"""
+Tests of the nearest breeds against measuring the distance to every breed
+"""
+
+import numpy as np
+import pytest
+from conftest import snapshot_of
+from knn import NearestBreeds
+
+
+def brute_force(index, target, size, k):
+    """
+    Returns the k smallest distances from the target to the breeds of a size.
+    """
+    dims = [position for position, feature in enumerate(NearestBreeds.FEATURES)
+            if feature in target]
+    point = np.array([target[NearestBreeds.FEATURES[position]] for position in dims])
+    point = (point - index.low[dims]) / index.spread[dims]
+    rows = index.rows[size]
+    distances = np.sqrt(((index.features[np.ix_(rows, dims)] - point) ** 2).sum(axis=1))
+    return np.sort(distances)[:k]
+
+
+TARGETS = [
+    {'all_around_friendliness': 5, 'exercise_needs': 2, 'average_lifespan': 12,
+     'average_weight': 30},
+    {'adaptability': 4},
+    {'trainability': 1, 'health_grooming': 5, 'average_weight': 120},
+    dict(zip(NearestBreeds.FEATURES, [3, 3, 3, 3, 3, 13, 60])),
+]
+
+
+@pytest.mark.parametrize('target', TARGETS)
+@pytest.mark.parametrize('size', ['all', 'small', 'medium', 'big'])
+@pytest.mark.parametrize('k', [1, 5, 30])
+def test_query_matches_brute_force(breeds, many_breeds, target, size, k):
+    for df in (breeds, many_breeds):
+        index = NearestBreeds.for_snapshot(snapshot_of(df))
+        names, distances = index.query(target, size, k)
+        expected = brute_force(index, target, size, k)
+        assert np.allclose(distances, expected)
+        assert len(set(names)) == len(names) == len(expected)
+        rows = index.rows[size]
+        assert set(names) <= {index.breeds[row] for row in rows}
+
+
+def test_invalid_queries(breeds):
+    index = NearestBreeds.for_snapshot(snapshot_of(breeds))
+    with pytest.raises(ValueError):
+        index.query({'colour': 3})
+    with pytest.raises(ValueError):
+        index.query({'adaptability': 3}, size='huge')
+    with pytest.raises(ValueError):
+        index.query({})
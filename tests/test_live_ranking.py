@@ -0,0 +1,47 @@
+"""
+Tests of the ranking kept while the preference sliders are dragged
+"""
+
+import numpy as np
+import pytest
+from live_ranking import LiveRanking
+
+
+def full_ranking(matrix, names, rows, weights, k):
+    """
+    Returns the k best breeds by scoring and sorting every row, ties by row order.
+    """
+    scores = matrix[rows] @ weights
+    order = np.lexsort((np.arange(len(rows)), -scores))[:k]
+    return [names[rows[position]] for position in order], scores[order]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_slider_steps_keep_the_exact_top(seed):
+    rng = np.random.default_rng(seed)
+    matrix = rng.integers(1, 6, size=(3000, 6)).astype(np.float64)
+    names = [f'Breed {row}' for row in range(len(matrix))]
+    rows = np.flatnonzero(rng.random(len(matrix)) < 0.7)
+    weights = rng.integers(0, 6, size=6).astype(np.float64)
+    ranking = LiveRanking(matrix, names, rows, weights, k=5)
+    for _ in range(300):
+        weights = weights.copy()
+        column = rng.integers(6)
+        weights[column] = np.clip(weights[column] + rng.choice([-1, 1]), 0, 5)
+        ranking.set_weights(weights)
+        top, scores = ranking.top()
+        expected, expected_scores = full_ranking(matrix, names, rows, weights, 5)
+        assert top == expected
+        assert np.allclose(scores, expected_scores)
+    # Most steps are answered from the pool
+    assert ranking.rebuilds < ranking.updates
+
+
+def test_fewer_rows_than_the_pool(breeds):
+    columns = ['all_around_friendliness', 'exercise_needs', 'average_lifespan']
+    matrix = breeds[columns].to_numpy(dtype=np.float64)
+    names = breeds['breed'].tolist()
+    rows = np.arange(10)
+    ranking = LiveRanking(matrix, names, rows, [1, 0, 0], k=3)
+    ranking.set_weights([0, 0, 1])
+    assert ranking.top()[0] == full_ranking(matrix, names, rows, np.array([0, 0, 1.0]), 3)[0]
@@ -0,0 +1,88 @@
+"""
+Tests of merging several breed data sources
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from merge_sources import SourceMerger
+
+
+def write_sources(tmp_path, how='inner', rules=None):
+    """
+    Writes two small sources and the spec merging them, returns the spec path.
+    """
+    pd.DataFrame({'Breed': ['Golden Retriever', 'beagle', 'Poodle (Standard)', 'Pug', 'Pug'],
+                  'Friendliness': [5, 4, 4, 3, 1],
+                  'max_weight_male': [34.0, 11.0, np.nan, 8.0, 9.0],
+                  'breed_group': ['Sporting Dogs', 'Hound Dogs', 'Non-Sporting Dogs',
+                                  'Toy Dogs', 'Toy Dogs']}).to_csv(tmp_path / 'dogtime.csv',
+                                                                    index=False)
+    pd.DataFrame({'breed': ['Beagle', 'GOLDEN  retriever', 'Standard Poodle', 'Akita'],
+                  'max_weight_male': [12.0, 32.0, 32.0, 59.0],
+                  'breed_group': ['Hounds', 'Sporting Dogs', 'Non-Sporting Dogs',
+                                  'Working Dogs']}).to_csv(tmp_path / 'details.csv', index=False)
+    spec = {'sources': [{'name': 'dogtime', 'path': 'dogtime.csv', 'key': 'Breed',
+                         'columns': {'Friendliness': 'all_around_friendliness'}},
+                        {'name': 'details', 'path': 'details.csv'}],
+            'how': how, 'rules': rules or {},
+            'aliases': {'Poodle (Standard)': 'Standard Poodle'}}
+    path = tmp_path / 'spec.json'
+    path.write_text(json.dumps(spec), encoding='utf-8')
+    return str(path)
+
+
+def test_names_are_joined_after_normalization_and_aliases(tmp_path):
+    merger = SourceMerger(write_sources(tmp_path))
+    merged = merger.merge().set_index('breed')
+    assert list(merged.index) == ['Golden Retriever', 'beagle', 'Poodle (Standard)']
+    assert merged['all_around_friendliness'].tolist() == [5, 4, 4]
+    # First value present in source order
+    assert merged['max_weight_male'].tolist() == [34.0, 11.0, 32.0]
+    assert merged.loc['beagle', 'breed_group'] == 'Hound Dogs'
+    assert merger.report['duplicates'] == {'dogtime': 1, 'details': 0}
+    assert merger.report['conflicts'] == {'max_weight_male': 2, 'breed_group': 1}
+
+
+@pytest.mark.parametrize('how, names', [
+    ('left', ['Golden Retriever', 'beagle', 'Poodle (Standard)', 'Pug']),
+    ('outer', ['Golden Retriever', 'beagle', 'Poodle (Standard)', 'Pug', 'Akita'])])
+def test_joins_keep_the_breeds_of_their_sources(tmp_path, how, names):
+    merged = SourceMerger(write_sources(tmp_path, how)).merge()
+    assert merged['breed'].tolist() == names
+    assert merged['max_weight_male'].tolist()[3] == 8.0
+    assert np.isnan(merged['all_around_friendliness'].tolist()[-1]) == (how == 'outer')
+
+
+def test_rules_pick_the_source_order_or_an_aggregate(tmp_path):
+    rules = {'max_weight_male': 'max', 'breed_group': ['details', 'dogtime']}
+    merged = SourceMerger(write_sources(tmp_path, rules=rules)).merge()
+    assert merged['max_weight_male'].tolist() == [34.0, 12.0, 32.0]
+    assert merged['breed_group'].tolist()[1] == 'Hounds'
+    with pytest.raises(ValueError):
+        SourceMerger(write_sources(tmp_path, rules={'breed_group': 'max'})).merge()
+    with pytest.raises(ValueError):
+        SourceMerger(write_sources(tmp_path, rules={'breed_group': ['other']})).merge()
+
+
+def test_unchanged_sources_are_loaded_from_the_cache(tmp_path):
+    spec = write_sources(tmp_path, rules={'max_weight_male': 'max'})
+    merger = SourceMerger(spec)
+    merged = merger.load()
+    assert merger.report['cached'] is False
+    again = SourceMerger(spec)
+    pd.testing.assert_frame_equal(again.load(), merged)
+    assert again.report == {'cached': True}
+
+    details = pd.read_csv(tmp_path / 'details.csv')
+    details.loc[0, 'max_weight_male'] = 14.5
+    details.to_csv(tmp_path / 'details.csv', index=False)
+    changed = SourceMerger(spec)
+    reloaded = changed.load()
+    assert changed.report['cached'] is False
+    assert reloaded['max_weight_male'].tolist() == [34.0, 14.5, 32.0]
+    cached = [name for name in os.listdir(tmp_path / '.merge_cache') if name.endswith('.pkl')]
+    # The merge of the previous sources was removed
+    assert len(cached) == 1
@@ -0,0 +1,30 @@
+"""
+Tests of the matching breeds ranking of the model
+"""
+
+import numpy as np
+from model import PuppyPickerModel
+from snapshot import SnapshotStore
+
+
+def test_breeds_are_ranked_by_the_weighted_score(breeds):
+    model = PuppyPickerModel(store=SnapshotStore(breeds))
+    preference = ['0', '3', '0', '1', '0', '2', 'all']
+    names, scores = model.find_matching_breeds(preference)
+    weighted = (breeds[model.COLUMNS].to_numpy(dtype=np.float64)
+                @ np.array([0, 3, 0, 1, 0, 2], dtype=np.float64))
+    order = np.lexsort((np.arange(len(breeds)), -weighted))[:5]
+    assert names == breeds['breed'].iloc[order].tolist()
+    assert np.allclose(scores, weighted[order])
+
+
+def test_weights_change_the_ranking(breeds):
+    model = PuppyPickerModel(store=SnapshotStore(breeds))
+    lifespan, _ = model.find_matching_breeds(['0', '0', '0', '0', '0', '3', 'all'])
+    friendly, scores = model.find_matching_breeds(['0', '3', '0', '0', '0', '0', 'all'])
+    assert lifespan != friendly
+    assert breeds.set_index('breed').loc[lifespan[0], 'average_lifespan'] \
+        == breeds['average_lifespan'].max()
+    assert scores[0] == 3 * breeds['all_around_friendliness'].max()
+    _, doubled = model.find_matching_breeds(['0', '6', '0', '0', '0', '0', 'all'])
+    assert np.allclose(doubled, 2 * np.array(scores))
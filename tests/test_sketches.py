@@ -0,0 +1,85 @@
+"""
+Tests of the approximate statistics of large breed columns
+"""
+
+import numpy as np
+import pytest
+from sketches import ColumnSketch, KLLSketch, SpaceSaving
+from snapshot import SnapshotStore
+
+
+def rank_error(values, estimate, fraction):
+    """
+    Returns how far the rank of an estimated quantile is from the wanted rank, as a fraction.
+    """
+    ordered = np.sort(values)
+    low = np.searchsorted(ordered, estimate, side='left') / len(values)
+    high = np.searchsorted(ordered, estimate, side='right') / len(values)
+    return max(low - fraction, fraction - high, 0.0)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_kll_quantiles_are_within_the_rank_error(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(size=200000)
+    sketch = KLLSketch(k=200, seed=seed)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+    assert sketch.count == len(values)
+    assert sum(len(items) for items in sketch.levels) < 3 * 200 + 64
+    fractions = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+    for fraction, estimate in zip(fractions, sketch.quantiles(fractions)):
+        assert rank_error(values, estimate, fraction) <= 1.7 / 200
+
+
+def test_merged_kll_sketches_summarize_all_values():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=100000)
+    merged = KLLSketch(seed=1)
+    for chunk in np.array_split(values, 10):
+        part = KLLSketch(seed=2)
+        part.update(chunk)
+        merged.merge(part)
+    assert merged.count == len(values)
+    assert rank_error(values, merged.quantile(0.5), 0.5) <= 1.7 / 200
+
+
+def test_space_saving_counts_are_bounded():
+    rng = np.random.default_rng(0)
+    values = rng.zipf(1.3, size=100000) % 5000
+    sketch = SpaceSaving(capacity=64)
+    for chunk in np.array_split(values, 13):
+        sketch.update(chunk)
+    distinct, counts = np.unique(values, return_counts=True)
+    exact = dict(zip(distinct.tolist(), counts.tolist()))
+    bound = len(values) / sketch.capacity
+    for value, count in sketch.counts.items():
+        assert exact.get(value, 0) <= count <= exact.get(value, 0) + sketch.errors[value]
+        assert sketch.errors[value] <= bound
+    # Every value more frequent than n / capacity is kept
+    for value, count in exact.items():
+        if count > bound:
+            assert value in sketch.counts
+    assert sketch.mode() == distinct[np.argmax(counts)]
+
+
+def test_space_saving_is_exact_below_capacity():
+    values = np.array([3.0, 1.0, 3.0, np.nan, 2.0, 3.0, 1.0])
+    sketch = SpaceSaving(capacity=8)
+    sketch.update(values)
+    assert sketch.top() == [(3.0, 3), (1.0, 2), (2.0, 1)]
+    assert all(error == 0 for error in sketch.errors.values())
+
+
+def test_column_sketches_are_kept_with_their_snapshot(many_breeds):
+    store = SnapshotStore(many_breeds)
+    snapshot = store.current()
+    sketch = ColumnSketch.for_snapshot(snapshot, 'average_lifespan')
+    assert ColumnSketch.for_snapshot(snapshot, 'average_lifespan') is sketch
+    assert snapshot.cached(('column_sketch', 'average_lifespan')) is sketch
+    lifespan = many_breeds['average_lifespan']
+    assert sketch.count == lifespan.count()
+    assert sketch.minimum == lifespan.min() and sketch.maximum == lifespan.max()
+    assert sketch.mean == pytest.approx(lifespan.mean())
+    updated = store.update_rows([0], {'average_lifespan': [100.0]})
+    assert ColumnSketch.for_snapshot(updated, 'average_lifespan').maximum == 100.0
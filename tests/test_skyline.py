@@ -0,0 +1,55 @@
+"""
+Tests of the skyline against comparing every pair of breeds
+"""
+
+import numpy as np
+import pytest
+from conftest import snapshot_of
+from skyline import Skyline
+
+
+def brute_force(df, criteria, size):
+    """
+    Returns the rows no other row of the same size dominates, rows with a
+    missing value left out.
+    """
+    values = np.column_stack([
+        df[column].to_numpy(dtype=np.float64) * (1 if direction == 'max' else -1)
+        for column, direction in criteria.items()])
+    rows = np.arange(len(df))
+    if size != 'all':
+        rows = rows[(df['size_category'] == size).to_numpy()]
+    rows = rows[~np.isnan(values[rows]).any(axis=1)]
+    kept = []
+    for row in rows:
+        others = values[rows]
+        dominated = ((others >= values[row]).all(axis=1)
+                     & (others > values[row]).any(axis=1)).any()
+        if not dominated:
+            kept.append(row)
+    return np.array(kept, dtype=np.int64)
+
+
+CRITERIA = [
+    {'all_around_friendliness': 'max', 'exercise_needs': 'min'},
+    {'adaptability': 'max', 'trainability': 'max', 'average_lifespan': 'max'},
+    {'all_around_friendliness': 'max', 'health_grooming': 'max', 'max_weight_male': 'min',
+     'average_lifespan': 'max'},
+]
+
+
+@pytest.mark.parametrize('criteria', CRITERIA)
+@pytest.mark.parametrize('size', ['all', 'small', 'big'])
+def test_skyline_matches_brute_force(breeds, many_breeds, criteria, size):
+    for df in (breeds, many_breeds.iloc[:3000]):
+        skyline = Skyline.for_snapshot(snapshot_of(df), criteria, size)
+        assert np.array_equal(np.sort(skyline.rows), brute_force(df, criteria, size))
+        assert skyline.names == [df['breed'].iloc[row] for row in skyline.rows]
+
+
+def test_invalid_criteria(breeds):
+    snapshot = snapshot_of(breeds)
+    with pytest.raises(ValueError):
+        Skyline(snapshot, {})
+    with pytest.raises(ValueError):
+        Skyline(snapshot, {'adaptability': 'most'})
@@ -0,0 +1,85 @@
+"""
+Tests of the versioned snapshots of the breed data
+"""
+
+import gc
+import numpy as np
+import pandas as pd
+import pytest
+from snapshot import DatasetSnapshot, SnapshotStore
+
+
+def frame():
+    """
+    Returns a small breed frame with a numeric and a categorical column.
+    """
+    return pd.DataFrame({'breed': ['a', 'b', 'c'], 'weight': [1.0, 2.0, 3.0],
+                         'size_category': pd.Categorical(['small', 'big', 'small'])})
+
+
+def test_columns_are_read_only_copies():
+    df = frame()
+    store = SnapshotStore(df)
+    snapshot = store.current()
+    df.loc[0, 'weight'] = 100
+    assert snapshot.columns['weight'][0] == 1.0
+    with pytest.raises(ValueError):
+        snapshot.columns['weight'][0] = 5
+    with pytest.raises(ValueError):
+        snapshot.columns['size_category'].codes[0] = 1
+
+
+def test_updates_publish_new_versions_and_share_unchanged_columns():
+    store = SnapshotStore(frame())
+    first = store.current()
+    second = store.update_rows([1], {'weight': [20.0]})
+    assert second.version > first.version
+    assert store.current() is second
+    assert first.columns['weight'].tolist() == [1.0, 2.0, 3.0]
+    assert second.columns['weight'].tolist() == [1.0, 20.0, 3.0]
+    assert second.columns['breed'] is first.columns['breed']
+    assert second.changed_rows.tolist() == [1]
+    third = store.update_columns({'weight': None, 'height': np.arange(3)})
+    assert list(third.columns) == ['breed', 'size_category', 'height']
+    with pytest.raises(ValueError):
+        store.update_columns({'height': np.arange(4)})
+
+
+def test_released_versions_are_forgotten():
+    store = SnapshotStore(frame())
+    kept = store.current()
+    store.update_rows([0], {'weight': [5.0]})
+    store.update_rows([0], {'weight': [6.0]})
+    gc.collect()
+    assert store.live_versions() == [kept.version, store.current().version]
+
+
+def test_derived_values_are_built_once_per_snapshot():
+    store = SnapshotStore(frame())
+    snapshot = store.current()
+    calls = []
+
+    def build(data):
+        calls.append(data.version)
+        return data.columns['weight'].sum()
+
+    assert snapshot.cached('total') is None
+    assert snapshot.derived('total', build) == 6.0
+    assert snapshot.derived('total', build) == 6.0
+    assert snapshot.cached('total') == 6.0
+    assert snapshot.matrix(['weight']) is snapshot.matrix(['weight'])
+    updated = store.update_rows([2], {'weight': [10.0]})
+    assert updated.cached('total') is None
+    assert updated.derived('total', build) == 13.0
+    assert calls == [snapshot.version, updated.version]
+
+
+def test_carried_values_reach_the_next_snapshot_of_a_row_update(monkeypatch):
+    monkeypatch.setattr(DatasetSnapshot, 'CARRIED_KEYS', {'total'})
+    store = SnapshotStore(frame())
+    store.current().derived('total', lambda data: 6.0)
+    updated = store.update_rows([0], {'weight': [4.0]})
+    assert updated.carried('total') == 6.0
+    assert updated.previous_rows['weight'].tolist() == [1.0]
+    replaced = store.update_columns({'weight': np.zeros(3)})
+    assert replaced.carried('total') is None
@@ -0,0 +1,79 @@
+"""
+Tests of the threshold top-k and the matching breeds against scoring every breed
+"""
+
+import numpy as np
+import pytest
+from conftest import snapshot_of
+from model import PuppyPickerModel
+from snapshot import SnapshotStore
+from threshold_topk import ThresholdTopK
+
+COLUMNS = PuppyPickerModel.COLUMNS
+
+
+def brute_force(df, weights, k, mask=None):
+    """
+    Returns the k best rows and their scores, ties to the lowest row.
+    """
+    scores = df[COLUMNS].to_numpy(dtype=np.float64) @ np.asarray(weights, dtype=np.float64)
+    rows = np.arange(len(df)) if mask is None else np.flatnonzero(mask)
+    top = np.lexsort((rows, -scores[rows]))[:k]
+    return rows[top], scores[rows][top]
+
+
+WEIGHTS = [[1, 1, 1, 1, 1, 1], [3, 0, 0, 0, 0, 0], [0, 2, 3, 1, 0, 2], [0, 0, 0, 0, 0, 0],
+           [3, 3, 3, 3, 3, 3], [0, 0, 1, 0, 3, 0], [2, -1, 0, 1, 0, 1]]
+
+
+@pytest.mark.parametrize('weights', WEIGHTS)
+@pytest.mark.parametrize('k', [1, 5, 40])
+def test_top_k_matches_brute_force(breeds, many_breeds, weights, k):
+    for df in (breeds, many_breeds):
+        top_k = ThresholdTopK.for_snapshot(snapshot_of(df), COLUMNS)
+        rows, scores, touched = top_k.top_k(weights, k)
+        expected_rows, expected_scores = brute_force(df, weights, k)
+        assert np.array_equal(rows, expected_rows)
+        assert np.allclose(scores, expected_scores)
+        assert 0 < touched <= len(df)
+
+
+def test_threshold_stops_early(many_breeds, monkeypatch):
+    monkeypatch.setattr(ThresholdTopK, 'MIN_ROWS', 100)
+    top_k = ThresholdTopK.for_snapshot(snapshot_of(many_breeds), COLUMNS)
+    assert top_k.orders is not None
+    rows, _, touched = top_k.top_k([3, 0, 0, 0, 0, 1], 5)
+    assert np.array_equal(rows, brute_force(many_breeds, [3, 0, 0, 0, 0, 1], 5)[0])
+    assert touched < len(top_k.values) * ThresholdTopK.SCAN_FRACTION
+
+
+@pytest.mark.parametrize('weights', WEIGHTS)
+def test_masked_top_k_matches_brute_force(many_breeds, monkeypatch, weights):
+    monkeypatch.setattr(ThresholdTopK, 'MIN_ROWS', 100)
+    mask = (many_breeds['size_category'] == 'small').to_numpy()
+    top_k = ThresholdTopK.for_snapshot(snapshot_of(many_breeds), COLUMNS)
+    rows, scores, _ = top_k.top_k(weights, 5, mask)
+    expected_rows, expected_scores = brute_force(many_breeds, weights, 5, mask)
+    assert np.array_equal(rows, expected_rows)
+    assert np.allclose(scores, expected_scores)
+
+
+def test_missing_values_are_scanned(many_breeds):
+    df = many_breeds.copy()
+    df.loc[::97, 'trainability'] = np.nan
+    top_k = ThresholdTopK.for_snapshot(snapshot_of(df), COLUMNS)
+    assert top_k.values is None
+    rows, _, touched = top_k.top_k([1, 1, 1, 1, 0, 1], 5)
+    assert np.array_equal(rows, brute_force(df, [1, 1, 1, 1, 0, 1], 5)[0])
+    assert touched == len(df)
+
+
+@pytest.mark.parametrize('size', ['all', 'small', 'medium', 'big'])
+def test_find_matching_breeds(breeds, size):
+    model = PuppyPickerModel(store=SnapshotStore(breeds))
+    preference = ['3', '1', '0', '2', '1', '3', size]
+    names, scores = model.find_matching_breeds(preference)
+    mask = None if size == 'all' else (breeds['size_category'] == size).to_numpy()
+    rows, expected_scores = brute_force(breeds, [3, 1, 0, 2, 1, 3], 5, mask)
+    assert names == breeds['breed'].iloc[rows].tolist()
+    assert np.allclose(scores, expected_scores)
@@ -0,0 +1,159 @@
+"""
+Module for finding the best scored breeds without scoring every breed in the Puppy Picker
+"""
+
+import numpy as np
+from skyline import Skyline
+
+
+class ThresholdTopK:
+    """
+    Top-k of weighted sums of some columns with Fagin's threshold algorithm.
+
+    Breeds with the same values in every column score the same, so the
+    distinct value rows are scored instead of the breeds, then the best ones
+    are expanded to their breeds. Catalogs with many distinct value rows also
+    keep one list per column of the value rows sorted by decreasing value,
+    built once per snapshot. A query reads the lists of its weighted columns
+    in parallel, one batch of depths at a time, and scores the value rows it
+    meets. A value row never met scores at most the weighted sum of the values
+    at the current depth, so the search stops as soon as the k-th best breed
+    scores above that threshold. Batches double in depth, so queries stopping
+    early read few rows. Queries with negative weights and queries that would
+    read more than SCAN_FRACTION of the lists score every value row instead,
+    and catalogs with missing values score every breed.
+    Ties are broken by the lowest row, like a full scan.
+    """
+    MIN_ROWS = 20000
+    SCAN_FRACTION = 0.25
+    FIRST_DEPTH = 64
+
+    def __init__(self, snapshot, columns):
+        """
+        Groups the rows of a snapshot by their values in some columns and
+        sorts the groups by every column when there are many of them.
+        """
+        self.matrix = snapshot.matrix(columns)
+        self.values = None
+        self.orders = None
+        self.sorted_values = None
+        # Missing values have no place in a sorted list, such data is scanned
+        if np.isnan(self.matrix).any():
+            return
+        self.values, groups = Skyline.distinct_rows(self.matrix)
+        # Rows of group g in increasing order: group_rows[starts[g]:starts[g + 1]]
+        self.group_rows = np.argsort(groups, kind='stable')
+        self.starts = np.searchsorted(groups[self.group_rows], np.arange(len(self.values) + 1))
+        if len(self.values) >= self.MIN_ROWS:
+            dtype = np.int32 if len(self.values) < 2 ** 31 else np.int64
+            orders = np.argsort(-self.values, axis=0, kind='stable')
+            self.sorted_values = np.take_along_axis(self.values, orders, axis=0).T.copy()
+            self.orders = orders.T.astype(dtype)
+
+    @classmethod
+    def for_snapshot(cls, snapshot, columns):
+        """
+        Returns the sorted lists of some columns of a snapshot, built once per snapshot.
+        """
+        return snapshot.derived(('threshold_topk', tuple(columns)),
+                                lambda data: cls(data, columns))
+
+    def top_k(self, weights, k=5, mask=None):
+        """
+        Returns the k best rows, their scores, fewer if fewer rows match, and
+        the number of rows or value rows scored to find them. The instance is
+        shared by the queries on a snapshot and is not changed by them.
+        :param weights: Weight of every column.
+        :param mask: Optional boolean array of the rows that can be returned.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if self.values is None:
+            return self.scan(weights, k, mask)
+        if mask is None:
+            counts = np.diff(self.starts)
+        elif len(self.group_rows):
+            counts = np.add.reduceat(mask[self.group_rows].astype(np.int64), self.starts[:-1])
+        else:
+            counts = np.zeros(0, dtype=np.int64)
+        lists = np.flatnonzero(weights > 0)
+        groups = None
+        if self.orders is not None and not (weights < 0).any() and len(lists):
+            groups, touched = self.threshold_groups(weights, lists, counts, k)
+        if groups is None:
+            groups = np.flatnonzero(counts)
+            touched = len(self.values)
+        rows, scores = self.expand(groups, self.values[groups] @ weights, counts, k, mask)
+        return rows, scores, touched
+
+    def threshold_groups(self, weights, lists, counts, k):
+        """
+        Returns the value rows met in the sorted lists until the k-th best
+        breed scores above the best score of the value rows not met, None
+        when that takes more than SCAN_FRACTION of the value rows, and the
+        number of value rows met.
+        """
+        groups_count = len(self.values)
+        limit = int(groups_count * self.SCAN_FRACTION)
+        seen = np.zeros(groups_count, dtype=bool)
+        best = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0)
+        depth, batch, touched = 0, self.FIRST_DEPTH, 0
+        while depth < groups_count:
+            stop = min(depth + batch, groups_count)
+            candidates = np.unique(self.orders[lists, depth:stop])
+            candidates = candidates[~seen[candidates]]
+            seen[candidates] = True
+            touched += len(candidates)
+            candidates = candidates[counts[candidates] > 0]
+            best = np.concatenate([best, candidates])
+            best_scores = np.concatenate([best_scores, self.values[candidates] @ weights])
+            order = np.argsort(-best_scores, kind='stable')
+            # Value rows of the k best breeds met so far, with the value rows tied to the last
+            needed = np.searchsorted(np.cumsum(counts[best[order]]), k)
+            if needed < len(order):
+                order = order[best_scores[order] >= best_scores[order[needed]]]
+            best, best_scores = best[order], best_scores[order]
+            # Best score a value row not met yet can have
+            threshold = weights[lists] @ self.sorted_values[lists, stop - 1]
+            if counts[best].sum() >= k and best_scores[-1] > threshold:
+                break
+            if touched > limit:
+                return None, touched
+            depth, batch = stop, batch * 2
+        return best, touched
+
+    def expand(self, groups, scores, counts, k, mask):
+        """
+        Returns the k best rows of some value rows and their scores, ties to the lowest row.
+        """
+        if len(groups) > k:
+            # Every value row has a breed, so the k best breeds are in the k best value rows
+            kept = scores >= np.partition(scores, len(scores) - k)[len(scores) - k]
+            groups, scores = groups[kept], scores[kept]
+        order = np.argsort(-scores, kind='stable')
+        groups, scores = groups[order], scores[order]
+        needed = np.searchsorted(np.cumsum(counts[groups]), k)
+        if needed < len(groups):
+            # Value rows tied with the k-th best breed can give it a lower row
+            kept = scores >= scores[needed]
+            groups, scores = groups[kept], scores[kept]
+        lengths = self.starts[groups + 1] - self.starts[groups]
+        # Positions in group_rows of the rows of every kept group
+        offsets = np.repeat(self.starts[groups] - np.cumsum(lengths) + lengths, lengths)
+        rows = self.group_rows[offsets + np.arange(lengths.sum())]
+        row_scores = np.repeat(scores, lengths)
+        if mask is not None:
+            kept = mask[rows]
+            rows, row_scores = rows[kept], row_scores[kept]
+        top = np.lexsort((rows, -row_scores))[:k]
+        return rows[top], row_scores[top]
+
+    def scan(self, weights, k=5, mask=None):
+        """
+        Returns the k best rows, their scores and the number of rows scored,
+        by scoring every row.
+        """
+        rows = np.arange(len(self.matrix)) if mask is None else np.flatnonzero(mask)
+        scores = self.matrix[rows] @ weights
+        top = np.argsort(-scores, kind='stable')[:k]
+        return rows[top], scores[top], len(rows)
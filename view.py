@@ -3,12 +3,18 @@
 import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from graph_manage import GraphManage
+from chart_renderer import ChartRenderer
+from render_pool import RenderPool
 
 
 class PuppyPickerView(tk.Tk):
     """ Graphical user interface for Puppy Picker """
+    # Comparisons of more breeds are drawn as one small graph per breed
+    GROUPED_COMPARE_BREEDS = 4
+    # Slider moves are applied at most once per frame, about 60 per second
+    LIVE_REFRESH_MS = 16
+    LIVE_TRAITS = ['Adaptability', 'Friendliness', 'Health grooming', 'Trainability',
+                   'Exercise needs', 'Long lifespan']
 
     def __init__(self, controller):
         """
@@ -20,12 +26,21 @@ class PuppyPickerView(tk.Tk):
         self.controller = controller
         self.title('Puppy Picker')
         self.minsize(width=1060, height=750)
-        self.df = GraphManage.load_data('breeds.csv')
-        self.graph_manage = GraphManage()
+        # Graphs and breed data of the controller's catalog
+        self.graph_manage = controller.graph_manage
+        # Graphs rendered on worker threads, one label per place in the window.
+        # Pages with several graphs render them in parallel worker processes,
+        # started on first use and following the updates of the catalog's data.
+        self.chart_renderer = ChartRenderer(self,
+                                            process_pool=RenderPool(self.graph_manage.store))
+        self.chart_labels = {}
         # Find Matching Breed
         self.page_find_breeds = 0
         self.selected_story_combo = tk.StringVar()
         self.selected_size = tk.StringVar()
+        self.live_weights = []
+        self.live_after_id = None
+        self.skyline = []
         # Statistical Information
         self.selected_breed_combo = tk.StringVar()
         self.selected_gender_combo = tk.StringVar()
@@ -36,6 +51,8 @@ class PuppyPickerView(tk.Tk):
         # Characteristic Comparison
         self.selected1_breed_compare = tk.StringVar()
         self.selected2_breed_compare = tk.StringVar()
+        self.compare_breeds = []
+        self.shortlist = []
         self.init_component()
 
     def init_component(self):
@@ -154,9 +171,82 @@ class PuppyPickerView(tk.Tk):
         """
         Clears all widgets in the right frame to prepare for new content.
         """
+        self.release_charts()
+        if self.live_after_id is not None:
+            self.after_cancel(self.live_after_id)
+            self.live_after_id = None
         for widget in self.right_frame.winfo_children():
             widget.destroy()
 
+    def release_charts(self):
+        """
+        Cancels the graphs still being rendered and frees the images of every
+        graph label, so nothing from the previous page stays in memory.
+        """
+        self.chart_renderer.cancel()
+        for label in self.chart_labels.values():
+            label.image = None
+        self.chart_labels.clear()
+
+    def show_chart(self, slot, master, build, *args, size=None, parallel=False, **pack_options):
+        """
+        Shows a graph without blocking the window.
+
+        The figure returned by build(*args) is drawn on a worker thread, or in a worker
+        process for parallel graphs which are rendered right away instead of debounced.
+        Until it is ready, a placeholder text is shown on top of the previous graph of the slot.
+        """
+        label = self.chart_labels.get(slot)
+        if label is None or not label.winfo_exists() or label.master is not master:
+            if label is not None:
+                # The previous label of the slot was destroyed with its page
+                label.image = None
+            label = tk.Label(master, text='Loading graph...', compound='center',
+                             background='white', foreground='#9C661F',
+                             font=('Times New Roman', 15), borderwidth=0)
+            self.chart_labels[slot] = label
+        else:
+            label.configure(text='Loading graph...')
+        label.pack(**pack_options)
+        self.chart_renderer.request(slot, lambda image: self.place_chart(label, image),
+                                    build, *args, size=size, debounce=not parallel,
+                                    parallel=parallel)
+
+    @staticmethod
+    def place_chart(label, image):
+        """
+        Replaces the placeholder of a graph label with the rendered image.
+        """
+        if not label.winfo_exists():
+            return
+        photo = ImageTk.PhotoImage(image)
+        label.configure(image=photo, text='')
+        # Replacing the reference frees the previous image of the label
+        label.image = photo
+
+    def bind_breed_search(self, combobox):
+        """
+        Lets a breed combobox be typed in, its list then shows the matching breeds.
+        The placeholder text is cleared when the box gets the focus.
+        """
+        combobox.bind('<KeyRelease>', self.controller.breed_search_handler)
+        combobox.bind('<FocusIn>', self.clear_breed_placeholder, add='+')
+
+    @staticmethod
+    def clear_breed_placeholder(event):
+        """
+        Clears the placeholder of a breed combobox.
+        """
+        if event.widget.get() in ('Select', 'Select Dog Breed'):
+            event.widget.set('')
+
+    @staticmethod
+    def show_breed_suggestions(combobox, names):
+        """
+        Replaces the list of a breed combobox with the breeds matching the typed text.
+        """
+        combobox.configure(values=names)
+
     def clear_default_text(self, event=None):
         """
         Clear default text on the combo box
@@ -216,7 +306,9 @@ class PuppyPickerView(tk.Tk):
                                           f'Min: {data[0]}\n'
                                           f'Max: {data[1]}\n'
                                           f'Mean: {data[2]}\n'
-                                          f'Mode: {data[3]}',
+                                          f'Mode: {data[3]}\n'
+                                          f'Median: {data[5]}\n'
+                                          f'80% of breeds: {data[4]}-{data[6]}',
                                      style='Small.TLabel')
         descriptive_stat.pack(side="right", fill="both", expand=True, padx=15)
 
@@ -237,37 +329,25 @@ class PuppyPickerView(tk.Tk):
         story_combobox.bind('<<ComboboxSelected>>', self.controller.story_combobox_handler)
 
         # Graph 1: default histogram
-        self.story_hist = self.graph_manage.create_histogram('max_life_expectancy', 'small')
-        canvas = FigureCanvasTkAgg(self.story_hist, master=self.story_top_left_frame)
-        canvas.draw()
-        self.canvas_widget_story = canvas.get_tk_widget()
-        self.canvas_widget_story.config(width=240, height=210)
-        self.canvas_widget_story.pack(side="top", fill="both", expand=True, padx=(20, 40))
+        self.show_chart('story_hist', self.story_top_left_frame,
+                        self.graph_manage.create_histogram, 'max_life_expectancy', 'small',
+                        size=(240, 210), parallel=True, side="top", fill="both", expand=True, padx=(20, 40))
 
         # Graph 2: Bar graph represent size and lifespan
-        fig_bar = self.graph_manage.story_bar()
-        canvas = FigureCanvasTkAgg(fig_bar, master=self.top_sub_frame)
-        canvas_widget_bar = canvas.get_tk_widget()
-        canvas_widget_bar.pack(side="left", fill="both", expand=True)
-        canvas.draw()
+        self.show_chart('story_bar', self.top_sub_frame, self.graph_manage.story_bar,
+                        parallel=True, side="left", fill="both", expand=True)
 
         # Middle sub frame for Graph 3 and Graph 4
         self.story_middle_frame = tk.Frame(self.right_frame)
         self.story_middle_frame.pack(side="top", fill="both", expand=True)
 
         # Graph 3: scatter plot
-        story_scatter = self.graph_manage.story_scatter()
-        canvas = FigureCanvasTkAgg(story_scatter, master=self.story_middle_frame)
-        canvas_widget_heatmap = canvas.get_tk_widget()
-        canvas_widget_heatmap.pack(side="left", fill="both", expand=True)
-        canvas.draw()
+        self.show_chart('story_scatter', self.story_middle_frame, self.graph_manage.story_scatter,
+                        parallel=True, side="left", fill="both", expand=True)
 
         # Graph 4: correlation heat map
-        story_heatmap = self.graph_manage.story_heatmap()
-        canvas = FigureCanvasTkAgg(story_heatmap, master=self.story_middle_frame)
-        canvas_widget_heatmap = canvas.get_tk_widget()
-        canvas_widget_heatmap.pack(side="left", fill="both", expand=True)
-        canvas.draw()
+        self.show_chart('story_heatmap', self.story_middle_frame, self.graph_manage.story_heatmap,
+                        parallel=True, side="left", fill="both", expand=True)
 
         # Bottom sub frame for label 2
         story_bottom_frame = tk.Frame(self.right_frame)
@@ -286,13 +366,9 @@ class PuppyPickerView(tk.Tk):
         Update the histogram in the storytelling section
         by retrieving data from a combobox.
         """
-        self.canvas_widget_story.destroy()
-        self.story_hist = self.graph_manage.create_histogram(selected_var, 'small')
-        canvas = FigureCanvasTkAgg(self.story_hist, master=self.story_top_left_frame)
-        canvas.draw()
-        self.canvas_widget_story = canvas.get_tk_widget()
-        self.canvas_widget_story.config(width=240, height=210)
-        self.canvas_widget_story.pack(fill=tk.BOTH, expand=True, padx=(20, 70))
+        self.show_chart('story_hist', self.story_top_left_frame,
+                        self.graph_manage.create_histogram, selected_var, 'small',
+                        size=(240, 210), side="top", fill=tk.BOTH, expand=True, padx=(20, 40))
 
     def find_breeds_page3(self):
         """
@@ -355,6 +431,108 @@ class PuppyPickerView(tk.Tk):
         size_combobox.pack(side="top", anchor='ne', padx=20, pady=(20, 25))
         size_combobox.set('Select')
 
+        live_button = ttk.Button(right_frame, text='Live Mode', style='TButton', cursor='heart',
+                                 command=self.controller.live_mode_handler)
+        live_button.pack(side="top", anchor='ne', padx=20, pady=(20, 25))
+
+        skyline_button = ttk.Button(right_frame, text='Best Trade-offs', style='TButton',
+                                    cursor='heart', command=self.controller.skyline_handler)
+        skyline_button.pack(side="top", anchor='ne', padx=20, pady=(0, 25))
+
+    def live_ranking_page(self):
+        """
+        Displays the live mode of the third page of the "Find Matching Breeds" menu.
+
+        Every characteristic has a slider from 0 to 3 and the best matches
+        are ranked again while a slider is dragged.
+        """
+        self.clear_right_frame()
+        self.page_find_breeds = 'live'
+        top_label = ttk.Label(self.right_frame, style='TLabel',
+                              text="Drag the sliders, the best matches follow your preferences.")
+        top_label.pack(side="top", padx=10, pady=30)
+
+        left_frame = ttk.Frame(self.right_frame, style='TFrame')
+        right_frame = ttk.Frame(self.right_frame, style='TFrame')
+        left_frame.pack(side="left", fill="y", expand=True, padx=10, pady=10)
+        right_frame.pack(side="right", fill="y", expand=True, padx=10, pady=10)
+
+        self.live_weights = []
+        for trait in self.LIVE_TRAITS:
+            trait_label = ttk.Label(left_frame, text=trait, style='Medium.TLabel')
+            trait_label.pack(side="top", anchor='w', padx=20, pady=(10, 0))
+            weight = tk.DoubleVar(value=1)
+            slider = ttk.Scale(left_frame, from_=0, to=3, variable=weight, length=250,
+                               command=self.schedule_live_update)
+            slider.pack(side="top", anchor='w', padx=20, pady=(0, 10))
+            self.live_weights.append(weight)
+
+        size_combobox = ttk.Combobox(left_frame, textvariable=self.selected_size,
+                                     values=['all', 'small', 'medium', 'big'], width=10,
+                                     state='readonly', style='Custom.TCombobox')
+        size_combobox.pack(side="top", anchor='w', padx=20, pady=(10, 10))
+        size_combobox.set('all')
+        size_combobox.bind('<<ComboboxSelected>>', self.controller.live_size_handler)
+
+        self.live_result = ttk.Label(right_frame, style='Medium.TLabel', text='')
+        self.live_result.pack(side="top", anchor='n', padx=10, pady=20)
+
+    def schedule_live_update(self, _value=None):
+        """
+        Asks for the ranking to follow the sliders on the next frame, so a fast
+        drag re-ranks once per frame instead of once per slider event.
+        """
+        if self.live_after_id is None:
+            self.live_after_id = self.after(self.LIVE_REFRESH_MS, self.flush_live_update)
+
+    def flush_live_update(self):
+        """
+        Re-ranks the breeds with the current slider values.
+        """
+        self.live_after_id = None
+        self.controller.live_weights_handler()
+
+    def get_live_weights(self):
+        """
+        Returns the weight of every slider.
+        """
+        return [weight.get() for weight in self.live_weights]
+
+    def show_live_ranking(self, name_list, score_list):
+        """
+        Shows the best matches of the live mode with their scores.
+        """
+        lines = [f'{place}. {name}  ({score:.1f})'
+                 for place, (name, score) in enumerate(zip(name_list, score_list), start=1)]
+        self.live_result.configure(text='Your Best Matches\n\n' + '\n\n'.join(lines))
+
+    def skyline_page(self, name_list):
+        """
+        Displays the breeds with the best trade-offs between the characteristics
+        the user cares about, whatever their weights, and lets the user pick one
+        to see more information.
+        """
+        self.clear_right_frame()
+        self.page_find_breeds = 'skyline'
+        self.skyline = list(name_list)
+        top_label = ttk.Label(self.right_frame, style='TLabel',
+                              text="No other breed is at least as good on everything you\n\n"
+                                   "rated and better on one of them:")
+        top_label.pack(side="top", padx=10, pady=30)
+        breeds_label = ttk.Label(self.right_frame, style='Medium.TLabel',
+                                 text='\n'.join(name_list))
+        breeds_label.pack(side="top", padx=10, pady=10)
+
+        self.combobox_breed1 = ttk.Combobox(self.right_frame,
+                                            textvariable=self.selected_breed_combo,
+                                            values=name_list, state='readonly',
+                                            style='Custom.TCombobox')
+        self.combobox_breed1.pack(side="top", padx=10, pady=10)
+        self.combobox_breed1.set('Select')
+        info_button = ttk.Button(self.right_frame, text='Show Information', style='TButton',
+                                 cursor='heart', command=self.controller.show_info_handler)
+        info_button.pack(side="top", padx=10, pady=10)
+
     def find_breeds_page4(self, name_list, score_list):
         """
         Displays the fourth page of the "Find Matching Breeds" menu.
@@ -366,6 +544,12 @@ class PuppyPickerView(tk.Tk):
         """
         self.clear_right_frame()
         self.page_find_breeds = 4
+        self.shortlist = list(name_list)
+        if not name_list:
+            no_match = ttk.Label(self.right_frame, text='No breed matches your preferences',
+                                 style='TLabel')
+            no_match.pack(side="top", padx=10, pady=30)
+            return
 
         # Create frames for left and right columns
         left_frame = ttk.Frame(self.right_frame, style='TFrame')
@@ -373,11 +557,8 @@ class PuppyPickerView(tk.Tk):
         left_frame.pack(side="left", fill="y", expand=True, padx=10, pady=10)
         right_frame.pack(side="right", fill="y", expand=True, padx=10, pady=10)
 
-        score_graph = self.graph_manage.score_bar(name_list, score_list)
-        canvas = FigureCanvasTkAgg(score_graph, master=left_frame)
-        canvas_widget_score = canvas.get_tk_widget()
-        canvas_widget_score.pack(side="left", expand=True)
-        canvas.draw()
+        self.show_chart('score', left_frame, self.graph_manage.score_bar, name_list, score_list,
+                        parallel=True, side="left", expand=True)
 
         best_match = ttk.Label(right_frame, text=f'Your Best Match\n\n'
                                                  f': {name_list[0]}\n\n\n\n\n\n\n'
@@ -391,6 +572,12 @@ class PuppyPickerView(tk.Tk):
         self.combobox_breed1.pack(anchor='n', padx=10, expand=True)
         self.combobox_breed1.set('Select')
 
+        # Comparison of every matching breed
+        shortlist_button = ttk.Button(right_frame, text='Compare Matches', style='TButton',
+                                      cursor='heart',
+                                      command=self.controller.compare_shortlist_handler)
+        shortlist_button.pack(anchor='n', padx=10, pady=(0, 10), expand=True)
+
     def get_user_prefer(self):
         """
         Collects and returns the user's preferences from input fields.
@@ -418,9 +605,6 @@ class PuppyPickerView(tk.Tk):
             pass
         self.clear_right_frame()
 
-        sorted_df = self.df.sort_values(by='breed')
-        sorted_breed_list = sorted_df['breed'].tolist()
-
         self.menu_label = ttk.Label(self.top_frame, text='Statistical Information',
                                     style='TLabel', padding=(55, 0))
         self.menu_label.pack()
@@ -438,10 +622,11 @@ class PuppyPickerView(tk.Tk):
         self.label_choose_breed.grid(row=0, column=0, padx=170, pady=(70, 0), sticky='ew')
         self.combobox_breed2 = ttk.Combobox(self.right_frame, width=30,
                                             textvariable=self.selected_breed_combo,
-                                            values=sorted_breed_list, state='readonly',
+                                            values=self.controller.suggest_breeds(),
                                             style='Custom.TCombobox')
         self.combobox_breed2.grid(row=1, column=0, padx=170, pady=(20, 0), sticky='ew')
         self.combobox_breed2.set('Select')
+        self.bind_breed_search(self.combobox_breed2)
 
         # Button to show information
         self.show_info_button = ttk.Button(self.right_frame, text='Show Information',
@@ -477,10 +662,13 @@ class PuppyPickerView(tk.Tk):
         self.clear_right_frame()
 
         breed = self.selected_breed_combo.get()
-        breed_group = self.df[self.df['breed'] == breed]['breed_group'].iloc[0]
-        breed_size = self.df[self.df['breed'] == breed]['size_category'].iloc[0]
-        min_lifespan = self.df[self.df['breed'] == breed]['min_life_expectancy'].iloc[0]
-        max_lifespan = self.df[self.df['breed'] == breed]['max_life_expectancy'].iloc[0]
+        # Read from the current snapshot, updates may have replaced the data since start-up
+        info = self.graph_manage.breed_info(breed, ['breed_group', 'size_category',
+                                                    'min_life_expectancy', 'max_life_expectancy'])
+        breed_group = info['breed_group']
+        breed_size = info['size_category']
+        min_lifespan = info['min_life_expectancy']
+        max_lifespan = info['max_life_expectancy']
 
         self.info_left_frame = ttk.Frame(self.right_frame, style='TFrame')
         right_frame = ttk.Frame(self.right_frame, style='TFrame')
@@ -499,8 +687,9 @@ class PuppyPickerView(tk.Tk):
         gender_combobox.set('Select Gender')
         gender_combobox.bind('<<ComboboxSelected>>', self.controller.gender_combobox_handler)
 
-        # Default gender graph (Male)
-        self.draw_male_graph(breed)
+        # Default gender graph (Male), rendered in parallel with the characteristic graph
+        self.show_chart('gender', self.info_left_frame, self.graph_manage.male_bar, breed,
+                        parallel=True, side='top', pady=10, anchor='n', expand=True)
 
         # Right sub frame
         info_label = ttk.Label(right_frame, text=f'Breed Group: {breed_group}         Size: {breed_size}\n\n'
@@ -508,33 +697,24 @@ class PuppyPickerView(tk.Tk):
                                style='Medium.TLabel')
         info_label.pack(expand=True, pady=10)
 
-        char_bar = self.graph_manage.char_bar(breed)
-        canvas = FigureCanvasTkAgg(char_bar, master=right_frame)
-        canvas_widget_score = canvas.get_tk_widget()
-        canvas_widget_score.pack(side='top', anchor='n', expand=True)
-        canvas.draw()
+        self.show_chart('char_bar', right_frame, self.graph_manage.char_bar, breed,
+                        parallel=True, side='top', anchor='n', expand=True)
 
     def draw_male_graph(self, breed):
         """
         Draws a graph displaying the height and weight statistics
         for male dogs of a selected breed.
         """
-        gender_bar = self.graph_manage.male_bar(breed)
-        canvas = FigureCanvasTkAgg(gender_bar, master=self.info_left_frame)
-        self.canvas_widget_gender = canvas.get_tk_widget()
-        self.canvas_widget_gender.pack(side='top', pady=10, anchor='n', expand=True)
-        canvas.draw()
+        self.show_chart('gender', self.info_left_frame, self.graph_manage.male_bar, breed,
+                        side='top', pady=10, anchor='n', expand=True)
 
     def draw_female_graph(self, breed):
         """
         Draws a graph displaying the height and weight statistics
         for female dogs of a selected breed.
         """
-        gender_bar = self.graph_manage.female_bar(breed)
-        canvas = FigureCanvasTkAgg(gender_bar, master=self.info_left_frame)
-        self.canvas_widget_gender = canvas.get_tk_widget()
-        self.canvas_widget_gender.pack(side='top', pady=10, anchor='n', expand=True)
-        canvas.draw()
+        self.show_chart('gender', self.info_left_frame, self.graph_manage.female_bar, breed,
+                        side='top', pady=10, anchor='n', expand=True)
 
     # Data Exploration
     def data_exploration_page(self):
@@ -564,6 +744,10 @@ class PuppyPickerView(tk.Tk):
                                        , cursor='heart', command=self.explore_hist_page)
         ex_scatter_button.pack(side='left', anchor='nw', padx=15, pady=50, expand=True)
 
+        ex_corr_button = ttk.Button(top_frame_explore, text='Correlation', style='TButton',
+                                    cursor='heart', command=self.explore_corr_page)
+        ex_corr_button.pack(side='left', anchor='nw', padx=15, pady=50, expand=True)
+
         show_graph_button = ttk.Button(top_frame_explore, text='Show Graph',
                                        style='TButton', cursor='heart',
                                        command=self.controller.ex_show_graph_handler)
@@ -596,11 +780,8 @@ class PuppyPickerView(tk.Tk):
         bar_combobox2.set('Select Attribute (y)')
 
         # Default graph
-        default = self.graph_manage.explore_bar('breed_group', 'adaptability')
-        canvas = FigureCanvasTkAgg(default, master=self.bottom_frame_explore)
-        canvas_widget_test = canvas.get_tk_widget()
-        canvas_widget_test.pack(side='top', anchor='n', pady=20, expand=True)
-        canvas.draw()
+        self.show_chart('explore', self.bottom_frame_explore, self.graph_manage.explore_bar,
+                        'breed_group', 'adaptability', side='top', anchor='n', pady=20, expand=True)
 
     def explore_scatter_page(self):
         """
@@ -634,11 +815,9 @@ class PuppyPickerView(tk.Tk):
         bar_combobox2.set('Select Attribute (y)')
 
         # Default graph
-        default = self.graph_manage.explore_scatter('max_height_male', 'average_lifespan')
-        canvas = FigureCanvasTkAgg(default, master=self.bottom_frame_explore)
-        canvas_widget_test = canvas.get_tk_widget()
-        canvas_widget_test.pack(side='top', anchor='n', pady=20, expand=True)
-        canvas.draw()
+        self.show_chart('explore', self.bottom_frame_explore, self.graph_manage.explore_scatter,
+                        'max_height_male', 'average_lifespan',
+                        side='top', anchor='n', pady=20, expand=True)
 
     def explore_hist_page(self):
         """
@@ -669,64 +848,85 @@ class PuppyPickerView(tk.Tk):
         bar_combobox2.set('Select Attribute')
 
         # Default graph
-        default = self.graph_manage.create_histogram('max_height_male', 'big')
-        canvas = FigureCanvasTkAgg(default, master=self.bottom_frame_explore)
-        canvas_widget_test = canvas.get_tk_widget()
-        canvas_widget_test.pack(side='top', anchor='n', pady=20, expand=True)
-        canvas.draw()
+        self.show_chart('explore', self.bottom_frame_explore, self.graph_manage.create_histogram,
+                        'max_height_male', 'big', side='top', anchor='n', pady=20, expand=True)
 
-    def draw_explore_bar(self):
+    def explore_corr_page(self):
         """
-        Draws a bar graph based on selected attributes for the data exploration page.
+        The interface for plotting correlation heatmaps on the data exploration page.
         """
+        self.explore_page = 'correlation'
         for widget in self.bottom_frame_explore.winfo_children():
             widget.destroy()
-        explore_bar = self.graph_manage.explore_bar(self.selected1_explore.get(),
-                                                    self.selected2_explore.get())
-        canvas = FigureCanvasTkAgg(explore_bar, master=self.bottom_frame_explore)
-        canvas_widget = canvas.get_tk_widget()
-        canvas_widget.pack(side='top', anchor='n', pady=20, expand=True)
-        canvas.draw()
+        for widget in self.middle_frame_explore.winfo_children():
+            widget.destroy()
+        # Correlation method
+        corr_combobox1 = ttk.Combobox(self.middle_frame_explore,
+                                      textvariable=self.selected1_explore,
+                                      values=['pearson', 'spearman'], state='readonly',
+                                      style='Custom.TCombobox')
+        corr_combobox1.pack(side='left', anchor='ne', padx=30, expand=True)
+        corr_combobox1.set('Select Method')
+
+        # Group of attributes
+        corr_combobox2 = ttk.Combobox(self.middle_frame_explore,
+                                      textvariable=self.selected2_explore,
+                                      values=list(self.graph_manage.CORRELATION_GROUPS),
+                                      state='readonly', style='Custom.TCombobox')
+        corr_combobox2.pack(side='left', anchor='nw', padx=30, expand=True)
+        corr_combobox2.set('Select Attributes')
+
+        # Default graph
+        self.show_chart('explore', self.bottom_frame_explore,
+                        self.graph_manage.explore_correlation, 'pearson', 'characteristics',
+                        side='top', anchor='n', pady=20, expand=True)
+
+    def draw_explore_corr(self):
+        """
+        Draws a correlation heatmap based on selected options for the data exploration page.
+        """
+        self.show_chart('explore', self.bottom_frame_explore,
+                        self.graph_manage.explore_correlation,
+                        self.selected1_explore.get(), self.selected2_explore.get(),
+                        side='top', anchor='n', pady=20, expand=True)
+
+    def draw_explore_bar(self):
+        """
+        Draws a bar graph based on selected attributes for the data exploration page.
+        """
+        self.show_chart('explore', self.bottom_frame_explore, self.graph_manage.explore_bar,
+                        self.selected1_explore.get(), self.selected2_explore.get(),
+                        side='top', anchor='n', pady=20, expand=True)
 
     def draw_explore_scatter(self):
         """
         Draws a scatter plot based on selected attributes for the data exploration page.
         """
-        for widget in self.bottom_frame_explore.winfo_children():
-            widget.destroy()
-        explore_scatter = self.graph_manage.explore_scatter(self.selected1_explore.get(),
-                                                            self.selected2_explore.get())
-        canvas = FigureCanvasTkAgg(explore_scatter, master=self.bottom_frame_explore)
-        canvas_widget_test = canvas.get_tk_widget()
-        canvas_widget_test.pack(side='top', anchor='n', pady=20, expand=True)
-        canvas.draw()
+        self.show_chart('explore', self.bottom_frame_explore, self.graph_manage.explore_scatter,
+                        self.selected1_explore.get(), self.selected2_explore.get(),
+                        side='top', anchor='n', pady=20, expand=True)
 
     def draw_explore_hist(self):
         """
         Draws a histogram based on selected attributes for the data exploration page.
         """
-        for widget in self.bottom_frame_explore.winfo_children():
-            widget.destroy()
         selected_group = self.selected1_explore.get()
         if selected_group == 'all':
-            explore_hist = self.graph_manage.create_histogram(self.selected2_explore.get(), 'big')
-            canvas = FigureCanvasTkAgg(explore_hist, master=self.bottom_frame_explore)
-            canvas_widget_test = canvas.get_tk_widget()
-            canvas_widget_test.pack(side='top', anchor='n', pady=20, expand=True)
-            canvas.draw()
+            self.show_chart('explore', self.bottom_frame_explore,
+                            self.graph_manage.create_histogram, self.selected2_explore.get(), 'big',
+                            side='top', anchor='n', pady=20, expand=True)
         else:
-            explore_hist = self.graph_manage.explore_breed_group_histgram(self.selected1_explore.get(),
-                                                                          self.selected2_explore.get())
-            canvas = FigureCanvasTkAgg(explore_hist, master=self.bottom_frame_explore)
-            canvas_widget_test = canvas.get_tk_widget()
-            canvas_widget_test.pack(side='top', anchor='n', pady=20, expand=True)
-            canvas.draw()
+            self.show_chart('explore', self.bottom_frame_explore,
+                            self.graph_manage.explore_breed_group_histgram,
+                            self.selected1_explore.get(), self.selected2_explore.get(),
+                            side='top', anchor='n', pady=20, expand=True)
 
     # Characteristic Comparison
-    def comparison_page(self):
+    def comparison_page(self, breeds=None):
         """
-        Displays a page for comparing the characteristics of two selected
+        Displays a page for comparing the characteristics of selected
         dog breeds using a multiple bar graph.
+        :param breeds: Breeds compared when the page opens, such as the matching breeds.
         """
         self.menu_label.destroy()
         try:
@@ -740,54 +940,83 @@ class PuppyPickerView(tk.Tk):
 
         top_frame_compare = ttk.Frame(self.right_frame, style='TFrame')
         top_frame_compare.pack(side='top', fill='both', expand=True)
+        self.similar_label = ttk.Label(self.right_frame, text='', style='Medium.TLabel')
+        self.similar_label.pack(side='top')
+        self.compare_label = ttk.Label(self.right_frame, text='', style='Medium.TLabel')
+        self.compare_label.pack(side='top')
         self.bottom_frame_compare = ttk.Frame(self.right_frame, style='TFrame')
         self.bottom_frame_compare.pack(side='top', fill='both', expand=True)
 
-        sorted_df = self.df.sort_values(by='breed')
-        sorted_breed_list = sorted_df['breed'].tolist()
         self.combobox_breed_cp1 = ttk.Combobox(top_frame_compare, width=20,
                                                textvariable=self.selected1_breed_compare,
-                                               values=sorted_breed_list, state='readonly',
+                                               values=self.controller.suggest_breeds(),
                                                style='Custom.TCombobox')
         self.combobox_breed_cp1.pack(side='left', anchor='ne', padx=10, pady=70, expand=True)
+        self.combobox_breed_cp1.bind('<<ComboboxSelected>>',
+                                     self.controller.compare_combobox_handler)
 
         self.combobox_breed_cp2 = ttk.Combobox(top_frame_compare, width=20,
                                                textvariable=self.selected2_breed_compare,
-                                               values=sorted_breed_list, state='readonly',
+                                               values=self.controller.suggest_breeds(),
                                                style='Custom.TCombobox')
         self.combobox_breed_cp2.pack(side='left', anchor='nw', padx=10, pady=70, expand=True)
+        self.bind_breed_search(self.combobox_breed_cp1)
+        self.bind_breed_search(self.combobox_breed_cp2)
+
+        add_button = ttk.Button(top_frame_compare, text='Add Breed', cursor='heart',
+                                command=self.controller.add_compare_breed_handler)
+        add_button.pack(side='left', anchor='nw', padx=(10, 0), pady=65, expand=True)
 
         self.compare_button = ttk.Button(top_frame_compare, text='Show Comparison', cursor='heart',
                                          command=self.controller.show_compare_handler)
-        self.compare_button.pack(side='left', anchor='nw', padx=(30, 0), pady=65, expand=True)
+        self.compare_button.pack(side='left', anchor='nw', padx=(10, 0), pady=65, expand=True)
         self.combobox_breed_cp1.set('Select Dog Breed')
         self.combobox_breed_cp2.set('Select Dog Breed')
+        self.compare_breeds = []
 
-        compare_list = ['all_around_friendliness', 'trainability',
-                        'health_grooming', 'exercise_needs', 'adaptability']
-        # Default graph
-        char_compare_bar = self.graph_manage.compare_bar('Chihuahua',
-                                                         'Golden Retriever', compare_list)
-        canvas = FigureCanvasTkAgg(char_compare_bar, master=self.bottom_frame_compare)
-        canvas_widget_test = canvas.get_tk_widget()
-        canvas_widget_test.pack(side='top', anchor='n', expand=True)
-        canvas.draw()
+        if breeds:
+            self.combobox_breed_cp1.set(breeds[0])
+            for breed in breeds[1:]:
+                self.add_compare_breed(breed)
+            self.draw_compare_graph(list(breeds))
+        else:
+            # Default graph of the first two breeds of the open catalog
+            defaults = self.controller.suggest_breeds()[:2]
+            if defaults:
+                self.draw_compare_graph(defaults)
 
-    def draw_compare_graph(self):
+    def add_compare_breed(self, breed):
         """
-        Draws a multiple bar graph comparing the characteristics of two selected dog breeds.
+        Adds a breed to the comparison and lists the breeds added so far.
+        """
+        if breed not in self.compare_breeds and breed != self.selected1_breed_compare.get():
+            self.compare_breeds.append(breed)
+        self.combobox_breed_cp2.set('Select Dog Breed')
+        self.compare_label.configure(text=f'Also comparing: {", ".join(self.compare_breeds)}')
+
+    def draw_compare_graph(self, breeds):
+        """
+        Draws a graph comparing the characteristics of the selected dog breeds,
+        grouped bars for a few breeds and one small graph per breed for more.
         """
-        for widget in self.bottom_frame_compare.winfo_children():
-            widget.destroy()
         compare_list = ['all_around_friendliness', 'trainability',
                         'health_grooming', 'exercise_needs', 'adaptability']
-        breed1 = self.combobox_breed_cp1.get()
-        breed2 = self.combobox_breed_cp2.get()
-        char_compare_bar = self.graph_manage.compare_bar(breed1, breed2, compare_list)
-        canvas = FigureCanvasTkAgg(char_compare_bar, master=self.bottom_frame_compare)
-        canvas_widget_test = canvas.get_tk_widget()
-        canvas_widget_test.pack(side='top', anchor='n', expand=True)
-        canvas.draw()
+        if len(breeds) <= self.GROUPED_COMPARE_BREEDS:
+            build = self.graph_manage.compare_bar
+        else:
+            build = self.graph_manage.compare_multiples
+        self.show_chart('compare', self.bottom_frame_compare, build,
+                        breeds, compare_list, side='top', anchor='n', expand=True)
+
+    def show_similar_breeds(self, breed, similar_breeds):
+        """
+        Displays the breeds most similar to the selected breed on the comparison page
+        and offers the closest one as the second breed to compare.
+        """
+        self.similar_label.configure(text=f'Most similar to {breed}: '
+                                          f'{", ".join(similar_breeds)}')
+        if similar_breeds and self.selected2_breed_compare.get() == 'Select Dog Breed':
+            self.combobox_breed_cp2.set(similar_breeds[0])
 
     def report_error(self, inform_text):
         """
@@ -808,3 +1037,4 @@ class PuppyPickerView(tk.Tk):
         Starts the tkinter main event loop to run the application.
         """
         self.mainloop()
+        self.chart_renderer.shutdown()